@@ -1,18 +1,36 @@
-import os
-from groq import Groq
-from dotenv import load_dotenv
-from utils.parser import parse_json
+from functools import lru_cache
+from utils.llm import cached_completion
+from utils.parser import JsonStreamParser
+from agents.models import BearOutput
 from utils.search_tools import multi_search
-
-load_dotenv()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
+from agents.tracks import TRACK_SHARDED_AGENTS, run_track_shards
+
+# Searches behind the bear case; {company} is filled in per run
+BEAR_QUERIES = [
+    "{company} layoffs budget cuts problems 2025,2026",
+    "{company} competitor contract vendor partnership",
+    "{company} financial distress pivot strategy change"
+]
+
+# Bump whenever build_bear_prompt or the user message changes; cached
+# outputs from earlier versions are then discarded
+PROMPT_VERSION = "3"
+
+# Fields the partner-track call fills when the agent is track-sharded
+PARTNER_TRACK_FIELDS = {
+    "scaleDisqualifiers": {"partnerScaleIssue": None},
+    "partnerRedFlags": None,
+    "competitorRisk": {"asPartner": None},
+    "overallBearScore": {"partnerScore": None},
+    "keyArgument": {"asPartner": None},
+    "dealKiller": {"partnerDealKiller": None}
+}
+
+@lru_cache(maxsize=64)
 def build_bear_prompt(client_info: str) -> str:
     return f"""
 You are the Bear Agent inside ALLYVEX, an autonomous B2B sales intelligence system.
-
-CLIENT COMPANY CONTEXT:
-{client_info}
+Our client is described under CLIENT COMPANY CONTEXT at the end.
 
 YOUR IDENTITY:
 You are a ruthless skeptic. Your job is to find every reason why pursuing this
@@ -164,38 +182,72 @@ Return this exact JSON:
     "partnerDealKiller": "<absolute deal-killing fact for partner track, or null>"
   }}
 }}
+
+CLIENT COMPANY CONTEXT:
+{client_info}
 """
-def run_bear_agent(domain: str, company_name: str, client_info: str) -> dict:
-    print(f"  [BEAR] Searching for client-relevant red flags on {company_name}...")
-
-    search_results = multi_search([
-        f"{company_name} layoffs budget cuts problems 2025,2026",
-        f"{company_name} competitor contract vendor partnership",
-        f"{company_name} financial distress pivot strategy change"
-    ])
-
-    print(f"  [BEAR] Reasoning over search results...")
-
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
-            {"role": "system", "content": build_bear_prompt(client_info)},
-            {
-                "role": "user",
-                "content": (
-                    f"Target Company: {company_name}\n"
-                    f"Domain: {domain}\n\n"
-                    f"SEARCH RESULTS:\n{search_results}\n\n"
-                    f"Build the strongest possible bear case relevant to our client. "
-                    f"Return only JSON."
-                )
-            }
-        ],
-        response_format={"type": "json_object"},
-        temperature=0.3,
-        max_tokens=2000
+async def run_bear_agent(
+    domain: str,
+    company_name: str,
+    client_info: str,
+    max_results: int = 2,
+    max_tokens: int = 2000,
+    evidence: str | None = None,
+    on_element=None,
+    shard_tracks: bool = TRACK_SHARDED_AGENTS
+) -> BearOutput:
+    # The war room passes this agent's view of the shared evidence pool;
+    # called on its own, the agent runs its searches itself
+    if evidence is None:
+        print(f"  [BEAR] Searching for client-relevant red flags on {company_name}...")
+        search_results = await multi_search(
+            [query.format(company=company_name) for query in BEAR_QUERIES],
+            max_results=max_results
+        )
+    else:
+        search_results = evidence
+
+    system_prompt = build_bear_prompt(client_info)
+    user_content = (
+        f"Target Company: {company_name}\n"
+        f"Domain: {domain}\n\n"
+        f"SEARCH RESULTS:\n{search_results}\n\n"
+        f"Build the strongest possible bear case relevant to our client. "
+        f"Return only JSON."
     )
 
-    result = parse_json(response.choices[0].message.content)
-    print(f"  [BEAR] Done. Bear Score: {result.get('overallBearScore', 'N/A')}")
+    if shard_tracks:
+        print(f"  [BEAR] Reasoning over search results in a customer and a partner track call...")
+        result = await run_track_shards(
+            agent="bear",
+            prompt_version=PROMPT_VERSION,
+            decode=BearOutput.decode,
+            provider="groq",
+            model="llama-3.3-70b-versatile",
+            system_prompt=system_prompt,
+            user_content=user_content,
+            temperature=0.3,
+            max_tokens=max_tokens,
+            partner_fields=PARTNER_TRACK_FIELDS,
+            score_field="overallBearScore",
+            on_element=on_element
+        )
+    else:
+        print(f"  [BEAR] Reasoning over search results...")
+        result = await cached_completion(
+            agent="bear",
+            prompt_version=PROMPT_VERSION,
+            parse=BearOutput.decode,
+            provider="groq",
+            model="llama-3.3-70b-versatile",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content}
+            ],
+            temperature=0.3,
+            max_tokens=max_tokens,
+            stream_to=JsonStreamParser(on_element) if on_element else None
+        )
+
+    print(f"  [BEAR] Done. Bear Score: {result.overallBearScore.dump() if result.overallBearScore else 'N/A'}")
     return result
\ No newline at end of file
@@ -1,18 +1,34 @@
-import os
-from groq import Groq
-from dotenv import load_dotenv
-from utils.parser import parse_json
+from functools import lru_cache
+from utils.llm import cached_completion
+from utils.parser import JsonStreamParser
+from agents.models import BullOutput
 from utils.search_tools import multi_search
+from agents.tracks import TRACK_SHARDED_AGENTS, run_track_shards
 
-load_dotenv()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# Searches behind the bull case; {company} is filled in per run
+BULL_QUERIES = [
+    "{company} funding hiring 2025,2026",
+    "{company} product news expansion pivot",
+    "{company} technical infrastructure legacy problems"
+]
 
+# Bump whenever build_bull_prompt or the user message changes; cached
+# outputs from earlier versions are then discarded
+PROMPT_VERSION = "3"
+
+# Fields the partner-track call fills when the agent is track-sharded
+PARTNER_TRACK_FIELDS = {
+    "companyScale": {"partnerScaleFit": None},
+    "partnerSignals": None,
+    "overallBullScore": {"partnerScore": None},
+    "keyArgument": {"asPartner": None}
+}
+
+@lru_cache(maxsize=64)
 def build_bull_prompt(client_info: str) -> str:
     return f"""
 You are the Bull Agent inside ALLYVEX, an autonomous B2B sales intelligence system.
-
-CLIENT COMPANY CONTEXT:
-{client_info}
+Our client is described under CLIENT COMPANY CONTEXT at the end.
 
 YOUR IDENTITY:
 You are aggressively optimistic. Your job is to find every reason why the TARGET
@@ -180,39 +196,74 @@ Return this exact JSON:
   }},
   "bestTimeToReach": "<why NOW specifically, grounded in what you found>"
 }}
+
+CLIENT COMPANY CONTEXT:
+{client_info}
 """
 
-def run_bull_agent(domain: str, company_name: str, client_info: str) -> dict:
-    print(f"  [BULL] Searching for client-relevant buying signals on {company_name}...")
-
-    search_results = multi_search([
-        f"{company_name} funding hiring 2025,2026",
-        f"{company_name} product news expansion pivot",
-        f"{company_name} technical infrastructure legacy problems"
-    ])
-
-    print(f"  [BULL] Reasoning over search results...")
-
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
-            {"role": "system", "content": build_bull_prompt(client_info)},
-            {
-                "role": "user",
-                "content": (
-                    f"Target Company: {company_name}\n"
-                    f"Domain: {domain}\n\n"
-                    f"SEARCH RESULTS:\n{search_results}\n\n"
-                    f"Build the strongest possible bull case relevant to our client. "
-                    f"Return only JSON."
-                )
-            }
-        ],
-        response_format={"type": "json_object"},
-        temperature=0.3,
-        max_tokens=2000
+async def run_bull_agent(
+    domain: str,
+    company_name: str,
+    client_info: str,
+    max_results: int = 2,
+    max_tokens: int = 2000,
+    evidence: str | None = None,
+    on_element=None,
+    shard_tracks: bool = TRACK_SHARDED_AGENTS
+) -> BullOutput:
+    # The war room passes this agent's view of the shared evidence pool;
+    # called on its own, the agent runs its searches itself
+    if evidence is None:
+        print(f"  [BULL] Searching for client-relevant buying signals on {company_name}...")
+        search_results = await multi_search(
+            [query.format(company=company_name) for query in BULL_QUERIES],
+            max_results=max_results
+        )
+    else:
+        search_results = evidence
+
+    system_prompt = build_bull_prompt(client_info)
+    user_content = (
+        f"Target Company: {company_name}\n"
+        f"Domain: {domain}\n\n"
+        f"SEARCH RESULTS:\n{search_results}\n\n"
+        f"Build the strongest possible bull case relevant to our client. "
+        f"Return only JSON."
     )
 
-    result = parse_json(response.choices[0].message.content)
-    print(f"  [BULL] Done. Bull Score: {result.get('overallBullScore', 'N/A')}")
+    if shard_tracks:
+        print(f"  [BULL] Reasoning over search results in a customer and a partner track call...")
+        result = await run_track_shards(
+            agent="bull",
+            prompt_version=PROMPT_VERSION,
+            decode=BullOutput.decode,
+            provider="groq",
+            model="llama-3.3-70b-versatile",
+            system_prompt=system_prompt,
+            user_content=user_content,
+            temperature=0.3,
+            max_tokens=max_tokens,
+            partner_fields=PARTNER_TRACK_FIELDS,
+            score_field="overallBullScore",
+            on_element=on_element
+        )
+    else:
+        print(f"  [BULL] Reasoning over search results...")
+        result = await cached_completion(
+            agent="bull",
+            prompt_version=PROMPT_VERSION,
+            parse=BullOutput.decode,
+            provider="groq",
+            model="llama-3.3-70b-versatile",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content}
+            ],
+            temperature=0.3,
+            max_tokens=max_tokens,
+            # Elements of the reply's arrays are passed to on_element as they stream in
+            stream_to=JsonStreamParser(on_element) if on_element else None
+        )
+
+    print(f"  [BULL] Done. Bull Score: {result.overallBullScore.dump() if result.overallBullScore else 'N/A'}")
     return result
\ No newline at end of file
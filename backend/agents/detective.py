@@ -1,19 +1,22 @@
-import os
-import json
-from groq import Groq
-from dotenv import load_dotenv
-from utils.parser import parse_json
+from functools import lru_cache
+from utils.llm import cached_completion
+from utils.parser import JsonStreamParser
+from agents.models import BullOutput, BearOutput, DetectiveOutput
 from utils.search_tools import web_search
+from agents.handoffs import handoff, DETECTIVE_FROM_BULL, DETECTIVE_FROM_BEAR
 
-load_dotenv()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# Gap search for what Bull and Bear may have missed; {company} is filled in per run
+DETECTIVE_QUERY = "{company} technology infrastructure strategy recent news 2025"
 
+# Bump whenever build_detective_prompt or the user message changes; cached
+# outputs from earlier versions are then discarded
+PROMPT_VERSION = "4"
+
+@lru_cache(maxsize=64)
 def build_detective_prompt(client_info: str) -> str:
     return f"""
 You are the Detective Agent inside ALLYVEX, an autonomous B2B sales intelligence system.
-
-CLIENT COMPANY CONTEXT:
-{client_info}
+Our client is described under CLIENT COMPANY CONTEXT at the end.
 
 YOUR IDENTITY:
 You are a forensic auditor. You have no opinion on whether to pursue the lead.
@@ -126,24 +129,42 @@ Return this exact JSON:
   "investigationGaps": ["<thing that should be researched but could not be confirmed>"],
   "overallConfidenceInDebate": <1-100>
 }}
+
+CLIENT COMPANY CONTEXT:
+{client_info}
 """
-def run_detective_agent(
+async def run_detective_agent(
     domain: str,
     company_name: str,
-    bull_output: dict,
-    bear_output: dict,
-    client_info: str
-) -> dict:
+    bull_output: BullOutput,
+    bear_output: BearOutput,
+    client_info: str,
+    run_search: bool = True,
+    max_tokens: int = 2000,
+    evidence: str | None = None,
+    on_element=None
+) -> DetectiveOutput:
     print(f"  [DETECTIVE] Auditing Bull and Bear findings for {company_name}...")
 
-    gap_results = web_search(
-        f"{company_name} technology infrastructure strategy recent news 2025",
-        max_results=2
-    )
+    # The war room passes the full evidence pool, including the gap search
+    gap_label = "ADDITIONAL SEARCH"
+    if evidence is not None:
+        gap_label = "EVIDENCE POOL (everything Bull and Bear saw, plus a gap search)"
+        gap_results = evidence
+    elif run_search:
+        gap_results = await web_search(DETECTIVE_QUERY.format(company=company_name), max_results=2)
+    else:
+        gap_results = "Skipped — latency budget."
 
     print(f"  [DETECTIVE] Reasoning over all evidence...")
-
-    response = client.chat.completions.create(
+    bull_findings = handoff("bull", "detective", bull_output, DETECTIVE_FROM_BULL)
+    bear_findings = handoff("bear", "detective", bear_output, DETECTIVE_FROM_BEAR)
+
+    result = await cached_completion(
+        agent="detective",
+        prompt_version=PROMPT_VERSION,
+        parse=DetectiveOutput.decode,
+        provider="groq",
         model="llama-3.3-70b-versatile",
         messages=[
             {"role": "system", "content": build_detective_prompt(client_info)},
@@ -151,19 +172,18 @@ def run_detective_agent(
                 "role": "user",
                 "content": (
                     f"Target Company: {company_name} ({domain})\n\n"
-                    f"BULL FINDINGS:\n{json.dumps(bull_output, indent=2)}\n\n"
-                    f"BEAR FINDINGS:\n{json.dumps(bear_output, indent=2)}\n\n"
-                    f"ADDITIONAL SEARCH:\n{gap_results}\n\n"
+                    f"BULL FINDINGS:\n{bull_findings}\n\n"
+                    f"BEAR FINDINGS:\n{bear_findings}\n\n"
+                    f"{gap_label}:\n{gap_results}\n\n"
                     f"Audit both sets of findings through the lens of our client's fit. "
                     f"Return only JSON."
                 )
             }
         ],
-        response_format={"type": "json_object"},
         temperature=0.2,
-        max_tokens=2000
+        max_tokens=max_tokens,
+        stream_to=JsonStreamParser(on_element) if on_element else None
     )
 
-    result = parse_json(response.choices[0].message.content)
-    print(f"  [DETECTIVE] Done. Debate confidence: {result.get('overallConfidenceInDebate', 'N/A')}")
+    print(f"  [DETECTIVE] Done. Debate confidence: {'N/A' if result.overallConfidenceInDebate is None else result.overallConfidenceInDebate}")
     return result
\ No newline at end of file
@@ -0,0 +1,132 @@
+import json
+from utils.tokens import estimate_tokens
+from utils.tracing import span
+from utils import metrics
+from agents.models import Model
+
+# What each downstream agent reads from an upstream output. A field maps to
+# None to keep it whole, or to a nested projection; a projection applied to
+# a list is applied to each of its items. Fields not listed are dropped —
+# the echoed agentRole/companyName/domain and reasoning the next agent's
+# framework never uses.
+
+DETECTIVE_FROM_BULL = {
+    "companyScale": {
+        "estimatedEmployees": None, "estimatedRevenue": None, "fundingStage": None,
+        "scaleCategory": None, "scaleSource": None, "customerScaleFit": None, "partnerScaleFit": None
+    },
+    "customerSignals": {
+        "signal": None, "source": None, "date": None, "strength": None, "clientConnection": None, "urgency": None
+    },
+    "partnerSignals": {
+        "signal": None, "source": None, "date": None, "strength": None, "partnerConnection": None, "partnerType": None
+    },
+    "technicalDebtSignals": {"observation": None, "source": None, "howClientHelps": None},
+    "fiscalPressureSignals": {"observation": None, "source": None, "howClientHelps": None},
+    "hiringSignals": {"isHiringRapidly": None, "relevantRoles": None, "hiringInsight": None},
+    "fundingStatus": {"recentFunding": None, "details": None, "budgetImplication": None},
+    "overallBullScore": None,
+    "keyArgument": None,
+    "bestTimeToReach": None
+}
+
+DETECTIVE_FROM_BEAR = {
+    "scaleDisqualifiers": None,
+    "customerRedFlags": {
+        "flag": None, "source": None, "date": None, "severity": None, "clientImpact": None, "dealBreakingPotential": None
+    },
+    "partnerRedFlags": {
+        "flag": None, "source": None, "date": None, "severity": None, "partnershipImpact": None, "dealBreakingPotential": None
+    },
+    "competitorRisk": None,
+    "financialHealth": {"concerning": None, "details": None, "source": None},
+    "leadershipStability": {"stable": None, "details": None},
+    "technicalDebtBarriers": {"observation": None, "source": None, "integrationRisk": None},
+    "overallBearScore": None,
+    "keyArgument": None,
+    "dealKiller": None
+}
+
+# The Orchestrator weighs claims rather than checking them, so sources go
+ORCHESTRATOR_FROM_BULL = {
+    "companyScale": {
+        "estimatedEmployees": None, "scaleCategory": None, "customerScaleFit": None, "partnerScaleFit": None
+    },
+    "customerSignals": {"signal": None, "date": None, "strength": None, "clientConnection": None, "urgency": None},
+    "partnerSignals": {"signal": None, "date": None, "strength": None, "partnerConnection": None, "partnerType": None},
+    "technicalDebtSignals": {"observation": None, "howClientHelps": None},
+    "fiscalPressureSignals": {"observation": None, "howClientHelps": None},
+    "hiringSignals": {"isHiringRapidly": None, "relevantRoles": None, "hiringInsight": None},
+    "fundingStatus": {"recentFunding": None, "details": None, "budgetImplication": None},
+    "overallBullScore": None,
+    "keyArgument": None,
+    "bestTimeToReach": None
+}
+
+ORCHESTRATOR_FROM_BEAR = {
+    "scaleDisqualifiers": None,
+    "customerRedFlags": {"flag": None, "date": None, "severity": None, "clientImpact": None, "dealBreakingPotential": None},
+    "partnerRedFlags": {"flag": None, "date": None, "severity": None, "partnershipImpact": None, "dealBreakingPotential": None},
+    "competitorRisk": None,
+    "financialHealth": {"concerning": None, "details": None},
+    "leadershipStability": {"stable": None, "details": None},
+    "technicalDebtBarriers": {"observation": None, "integrationRisk": None},
+    "overallBearScore": None,
+    "keyArgument": None,
+    "dealKiller": None
+}
+
+ORCHESTRATOR_FROM_DETECTIVE = {
+    "scaleVerification": {"confirmedScale": None, "scaleImpactsCustomerTrack": None, "scaleImpactsPartnerTrack": None},
+    "customerTrackAudit": {
+        "strongClaims": None,
+        "weakClaims": {"claim": None, "weakness": None},
+        "technicalFit": None, "technicalFitReason": None,
+        "budgetFit": None, "budgetFitReason": None,
+        "timingFit": None, "timingFitReason": None,
+        "evidenceScore": None
+    },
+    "partnerTrackAudit": {
+        "strongClaims": None,
+        "weakClaims": {"claim": None, "weakness": None},
+        "customerBaseOverlap": None, "customerBaseOverlapReason": None,
+        "distributionValue": None, "distributionValueReason": None,
+        "commercialViability": None, "commercialViabilityReason": None,
+        "evidenceScore": None
+    },
+    "splitVerdictAssessment": None,
+    "missingContext": {"finding": None, "impactsTrack": None, "impact": None, "clientRelevance": None},
+    "criticalOverlookedFact": None,
+    "overallConfidenceInDebate": None
+}
+
+
+def project(value, fields: dict | None):
+    """
+    The parts of value named in fields. A value that does not have the
+    expected shape, e.g. a bare score where an object was expected, is kept as is.
+    """
+    if fields is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, fields) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: project(value[key], sub_fields) for key, sub_fields in fields.items() if key in value}
+
+
+def handoff(source: str, target: str, output: Model, fields: dict) -> str:
+    """
+    Compact JSON of the fields of `output` that `target` uses. The prompt
+    tokens it takes, and those it saves over the full indented output, are
+    recorded on a span of the current run.
+    """
+    with span(f"handoff.{source}_to_{target}", "handoff") as s:
+        output = output.dump()
+        compact = json.dumps(project(output, fields), separators=(",", ":"), ensure_ascii=False)
+        tokens = estimate_tokens(compact)
+        full_tokens = estimate_tokens(json.dumps(output, indent=2))
+        s.attributes.update(tokens=tokens, fullTokens=full_tokens)
+    metrics.incr("handoff.tokens_saved", max(full_tokens - tokens, 0))
+    print(f"  [HANDOFF] {source.title()} → {target.title()}: {tokens} tokens (full output {full_tokens})")
+    return compact
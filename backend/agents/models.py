@@ -0,0 +1,537 @@
+import re
+import json
+from functools import cache
+from typing import ClassVar, get_args, get_origin
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, ValidationError
+from utils.tracing import span
+from utils import metrics
+
+# Typed agent outputs. A reply is validated straight from the model's text
+# by pydantic; only when that fails is it loaded and the common LLM mistakes
+# repaired before validating again: scores sent as strings ("75/100"),
+# null arrays, a single object where an array was expected, numbers where
+# text was expected, and string booleans. Every repair is counted in the
+# llm.repairs.* metrics. Keys a model does not declare are kept, so nothing
+# the agent said is lost.
+
+
+def _repaired(kind: str):
+    metrics.incr(f"llm.repairs.{kind}")
+
+
+def _score(value):
+    if value is None or isinstance(value, int) and not isinstance(value, bool):
+        return value
+    _repaired("score")
+    if isinstance(value, float):
+        return round(value)
+    match = re.search(r"-?\d+(?:\.\d+)?", str(value))
+    return round(float(match.group())) if match else None
+
+
+def _text(value):
+    if value is None or isinstance(value, str):
+        return value
+    _repaired("text")
+    if isinstance(value, list):
+        return "; ".join(v if isinstance(v, str) else json.dumps(v) for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return str(value)
+
+
+def _flag(value):
+    if value is None or isinstance(value, bool):
+        return value
+    _repaired("flag")
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "yes", "y", "1")
+    return bool(value)
+
+
+def _items(value):
+    if isinstance(value, list):
+        return value
+    _repaired("array")
+    return [] if value is None else [value]
+
+
+NULL_TEXT = ("", "null", "none", "n/a")
+
+
+def _as_object(model, value) -> dict | None:
+    """
+    What LLMs send in place of a `model` object, as a repaired dict: the
+    first object of a list, or a bare value moved into the model's scalar
+    field. None when nothing can be recovered, and the field is then left out.
+    """
+    if isinstance(value, dict):
+        return model.repair(value)
+    if value is None:
+        return None
+    _repaired("object")
+    if isinstance(value, list):
+        value = next((item for item in value if isinstance(item, dict)), None)
+        return None if value is None else model.repair(value)
+    if isinstance(value, str) and value.strip(" .").lower() in NULL_TEXT:
+        return None
+    value = model.from_scalar(value)
+    return None if value is None else model.repair(value)
+
+
+def _list_of(model, value) -> list:
+    items = []
+    for item in _items(value):
+        item = _as_object(model, item)
+        if item is not None:
+            items.append(item)
+    return items
+
+
+def _texts(_, value) -> list:
+    return [_text(item) for item in _items(value)]
+
+
+REPAIRS = {
+    "score": lambda _, value: _score(value),
+    "text": lambda _, value: _text(value),
+    "flag": lambda _, value: _flag(value),
+    "texts": _texts,
+    "list": _list_of,
+    "object": _as_object
+}
+
+Score = int | None
+Text = str | None
+Flag = bool | None
+Texts = list[Text]
+
+
+def legacy(field: str, *old_keys: str):
+    """A field that also reads the keys earlier prompt versions used for it."""
+    return Field([], validation_alias=AliasChoices(field, *old_keys))
+
+
+class Model(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    # A bare value (string, number or boolean) in place of this object
+    # becomes this field's value
+    scalar_field: ClassVar[str | None] = None
+
+    @classmethod
+    def from_scalar(cls, value) -> dict | None:
+        """What a bare value sent in place of this object means, or None to drop it."""
+        if cls.scalar_field:
+            return {cls.scalar_field: value}
+        return None
+
+    @classmethod
+    @cache
+    def _repairs(cls) -> tuple:
+        """(input keys, repair kind, nested model) of each field."""
+        repairs = []
+        for name, field in cls.model_fields.items():
+            keys = field.validation_alias.choices if isinstance(field.validation_alias, AliasChoices) else (name,)
+            if get_origin(field.annotation) is list:
+                (item,) = get_args(field.annotation)
+                is_model = isinstance(item, type) and issubclass(item, Model)
+                repairs.append((keys, "list" if is_model else "texts", item))
+                continue
+            types = get_args(field.annotation)
+            model = next((t for t in types if isinstance(t, type) and issubclass(t, Model)), None)
+            kind = "object" if model else "flag" if bool in types else "score" if int in types else "text"
+            repairs.append((keys, kind, model))
+        return tuple(repairs)
+
+    @classmethod
+    def repair(cls, data: dict) -> dict:
+        """
+        A copy of data with every declared field repaired into its type.
+        Object fields are never left null: a value that cannot be repaired
+        into an object is dropped, as if the agent had not sent it.
+        """
+        repaired = dict(data)
+        for keys, kind, model in cls._repairs():
+            for key in keys:
+                if key in repaired:
+                    value = REPAIRS[kind](model, repaired[key])
+                    if value is None and kind == "object":
+                        del repaired[key]
+                    else:
+                        repaired[key] = value
+        return repaired
+
+    @classmethod
+    def of(cls, data: dict):
+        """
+        Typed view of a dict, e.g. an output restored from a checkpoint or an
+        array element streamed in, repaired only if it does not validate as is.
+        """
+        try:
+            return cls.model_validate(data or {})
+        except ValidationError:
+            return cls.model_validate(cls.repair(data))
+
+    def dump(self) -> dict:
+        """The plain dict that checkpoints and SSE payloads carry."""
+        return self.model_dump(mode="json", exclude_unset=True)
+
+
+class AgentOutput(Model):
+    agent: ClassVar[str] = ""
+
+    agentRole: Text = None
+    companyName: Text = None
+
+    @classmethod
+    def decode(cls, raw_text: str):
+        """
+        The typed output of an agent reply. Code fences around the JSON are
+        ignored. Raises ValueError if the reply is not a JSON object or
+        cannot be repaired into one of this shape.
+        """
+        with span(f"decode.{cls.agent}", "parse", chars=len(raw_text)) as s:
+            cleaned = re.sub(r'```json|```', '', raw_text).strip()
+            try:
+                return cls.model_validate_json(cleaned)
+            except ValidationError:
+                pass
+            s.attributes["repaired"] = True
+            try:
+                data = json.loads(cleaned)
+                if not isinstance(data, dict):
+                    raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+                return cls.model_validate(cls.repair(data))
+            except (ValueError, ValidationError) as e:
+                print(f"Failed to parse agent output: {raw_text}")
+                raise ValueError(f"Agent returned malformed JSON: {e}")
+
+
+class TrackScores(Model):
+    customerScore: Score = None
+    partnerScore: Score = None
+    combinedScore: Score = None
+
+    @classmethod
+    def from_scalar(cls, value) -> dict | None:
+        # A single number is the combined score
+        score = _score(value)
+        return None if score is None else {"combinedScore": score}
+
+
+class TrackText(Model):
+    scalar_field = "asCustomer"
+
+    asCustomer: Text = None
+    asPartner: Text = None
+
+
+# ── Bull ──
+
+class CompanyScale(Model):
+    scalar_field = "scaleCategory"
+
+    estimatedEmployees: Text = None
+    estimatedRevenue: Text = None
+    fundingStage: Text = None
+    scaleCategory: Text = None
+    scaleSource: Text = None
+    customerScaleFit: Text = None
+    partnerScaleFit: Text = None
+    scaleReasoning: Text = None
+
+
+class Signal(Model):
+    scalar_field = "signal"
+
+    signal: Text = None
+    source: Text = None
+    date: Text = None
+    strength: Text = None
+    clientConnection: Text = None
+    urgency: Text = None
+    partnerConnection: Text = None
+    partnerType: Text = None
+    scaleDependentReasoning: Text = None
+
+
+class Observation(Model):
+    scalar_field = "observation"
+
+    observation: Text = None
+    source: Text = None
+    track: Text = None
+    howClientHelps: Text = None
+    integrationRisk: Text = None
+
+
+class HiringSignals(Model):
+    scalar_field = "hiringInsight"
+
+    isHiringRapidly: Flag = None
+    relevantRoles: Texts = []
+    track: Text = None
+    hiringInsight: Text = None
+
+
+class FundingStatus(Model):
+    scalar_field = "details"
+
+    recentFunding: Flag = None
+    details: Text = None
+    budgetImplication: Text = None
+    track: Text = None
+
+
+class BullOutput(AgentOutput):
+    agent = "bull"
+
+    domain: Text = None
+    companyScale: CompanyScale | None = None
+    customerSignals: list[Signal] = legacy("customerSignals", "clientRelevantSignals")
+    partnerSignals: list[Signal] = []
+    technicalDebtSignals: list[Observation] = []
+    fiscalPressureSignals: list[Observation] = []
+    hiringSignals: HiringSignals | None = None
+    fundingStatus: FundingStatus | None = None
+    overallBullScore: TrackScores | None = None
+    keyArgument: TrackText | None = None
+    bestTimeToReach: Text = None
+
+
+# ── Bear ──
+
+class ScaleDisqualifiers(Model):
+    scalar_field = "customerScaleIssue"
+
+    customerScaleIssue: Text = None
+    partnerScaleIssue: Text = None
+    isScaleDisqualified: Flag = None
+
+
+class RedFlag(Model):
+    scalar_field = "flag"
+
+    flag: Text = None
+    source: Text = None
+    date: Text = None
+    severity: Text = None
+    clientImpact: Text = None
+    partnershipImpact: Text = None
+    dealBreakingPotential: Text = None
+    scaleDependentReasoning: Text = None
+    # Earlier prompt versions
+    clientConnection: Text = None
+
+
+class CustomerCompetitor(Model):
+    scalar_field = "details"
+
+    hasCompetitorContract: Flag = None
+    competitorName: Text = None
+    details: Text = None
+    threatLevel: Text = None
+
+
+class PartnerCompetitor(Model):
+    scalar_field = "details"
+
+    competesWithClient: Flag = None
+    details: Text = None
+    threatLevel: Text = None
+
+
+class CompetitorRisk(Model):
+    asCustomer: CustomerCompetitor | None = None
+    asPartner: PartnerCompetitor | None = None
+
+
+class FinancialHealth(Model):
+    scalar_field = "details"
+
+    concerning: Flag = None
+    details: Text = None
+    source: Text = None
+    impactsCustomerTrack: Flag = None
+    impactsPartnerTrack: Flag = None
+
+
+class LeadershipStability(Model):
+    scalar_field = "details"
+
+    stable: Flag = None
+    details: Text = None
+    impactsCustomerTrack: Flag = None
+    impactsPartnerTrack: Flag = None
+
+
+class DealKiller(Model):
+    scalar_field = "customerDealKiller"
+
+    customerDealKiller: Text = None
+    partnerDealKiller: Text = None
+
+
+class BearOutput(AgentOutput):
+    agent = "bear"
+
+    domain: Text = None
+    scaleDisqualifiers: ScaleDisqualifiers | None = None
+    customerRedFlags: list[RedFlag] = legacy("customerRedFlags", "clientRelevantRedFlags")
+    partnerRedFlags: list[RedFlag] = []
+    competitorRisk: CompetitorRisk | None = None
+    financialHealth: FinancialHealth | None = None
+    leadershipStability: LeadershipStability | None = None
+    technicalDebtBarriers: list[Observation] = []
+    overallBearScore: TrackScores | None = None
+    keyArgument: TrackText | None = None
+    dealKiller: DealKiller | None = None
+
+
+# ── Detective ──
+
+class ScaleVerification(Model):
+    scalar_field = "confirmedScale"
+
+    bullEstimate: Text = None
+    bearEstimate: Text = None
+    confirmedScale: Text = None
+    scaleSource: Text = None
+    scaleImpactsCustomerTrack: Text = None
+    scaleImpactsPartnerTrack: Text = None
+
+
+class WeakClaim(Model):
+    scalar_field = "claim"
+
+    claim: Text = None
+    weakness: Text = None
+    evidenceGap: Text = None
+
+
+class TrackAudit(Model):
+    scalar_field = "evidenceScore"
+
+    strongClaims: Texts = []
+    weakClaims: list[WeakClaim] = []
+    technicalFit: Text = None
+    technicalFitReason: Text = None
+    budgetFit: Text = None
+    budgetFitReason: Text = None
+    timingFit: Text = None
+    timingFitReason: Text = None
+    customerBaseOverlap: Text = None
+    customerBaseOverlapReason: Text = None
+    distributionValue: Text = None
+    distributionValueReason: Text = None
+    commercialViability: Text = None
+    commercialViabilityReason: Text = None
+    evidenceScore: Score = None
+    # Earlier prompt versions
+    fiscalPressureAssessment: Text = None
+
+
+class SplitVerdictAssessment(Model):
+    scalar_field = "recommendedApproach"
+
+    customerTrackStrength: Text = None
+    partnerTrackStrength: Text = None
+    recommendedApproach: Text = None
+    sequencingAdvice: Text = None
+    splitReasoning: Text = None
+
+
+class MissingContext(Model):
+    scalar_field = "finding"
+
+    finding: Text = None
+    source: Text = None
+    impactsTrack: Text = None
+    impact: Text = None
+    clientRelevance: Text = None
+    # Earlier prompt versions
+    explanation: Text = None
+
+
+class DetectiveOutput(AgentOutput):
+    agent = "detective"
+
+    scaleVerification: ScaleVerification | None = None
+    customerTrackAudit: TrackAudit | None = None
+    partnerTrackAudit: TrackAudit | None = None
+    splitVerdictAssessment: SplitVerdictAssessment | None = None
+    missingContext: list[MissingContext] = []
+    criticalOverlookedFact: Text = None
+    investigationGaps: Texts = []
+    overallConfidenceInDebate: Score = None
+    # Earlier prompt versions audited each agent instead of each track
+    bullAudit: TrackAudit | None = None
+    bearAudit: TrackAudit | None = None
+
+
+# ── Orchestrator ──
+
+class RegretScore(Model):
+    scalar_field = "score"
+
+    score: Score = None
+    reason: Text = None
+
+
+class DecidingFactors(Model):
+    scalar_field = "keySwingFactor"
+
+    strongestBullSignal: Text = None
+    strongestBearSignal: Text = None
+    detectiveImpact: Text = None
+    scaleVerdict: Text = None
+    distributionValueVerdict: Text = None
+    keySwingFactor: Text = None
+
+
+class DecisionMaker(Model):
+    scalar_field = "title"
+
+    title: Text = None
+    why: Text = None
+    linkedinSearchTip: Text = None
+
+
+class OutreachEmail(Model):
+    scalar_field = "body"
+
+    subject: Text = None
+    body: Text = None
+
+
+class TrackVerdict(Model):
+    scalar_field = "verdict"
+
+    verdict: Text = None
+    confidence: Score = None
+    regretScore: RegretScore | None = None
+    decidingFactors: DecidingFactors | None = None
+    targetDecisionMaker: DecisionMaker | None = None
+    outreachEmail: OutreachEmail | None = None
+    ifHold: Text = None
+    ifAvoid: Text = None
+
+
+class OrchestratorOutput(AgentOutput):
+    agent = "orchestrator"
+
+    confirmedScale: Text = None
+    executiveSummary: Text = None
+    customerTrack: TrackVerdict | None = None
+    partnerTrack: TrackVerdict | None = None
+    recommendedApproach: Text = None
+    recommendedApproachReason: Text = None
+    clientAdvantages: Texts = []
+    clientDisadvantages: Texts = []
+    proposedNextSteps: Texts = []
+    # Earlier prompt versions gave a single verdict for the company
+    verdict: Text = None
+    confidence: Score = None
+    regretScore: RegretScore | None = None
+    decidingFactors: DecidingFactors | None = None
@@ -1,18 +1,17 @@
-import os
-import json
-from mistralai import Mistral
-from dotenv import load_dotenv
-from utils.parser import parse_json
+from functools import lru_cache
+from utils.llm import cached_completion
+from agents.models import BullOutput, BearOutput, DetectiveOutput, OrchestratorOutput, TrackVerdict, RegretScore
+from agents.handoffs import handoff, ORCHESTRATOR_FROM_BULL, ORCHESTRATOR_FROM_BEAR, ORCHESTRATOR_FROM_DETECTIVE
 
-load_dotenv()
-client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
+# Bump whenever build_orchestrator_prompt or the user message changes; cached
+# outputs from earlier versions are then discarded
+PROMPT_VERSION = "4"
 
+@lru_cache(maxsize=64)
 def build_orchestrator_prompt(client_info: str) -> str:
     return f"""
 You are the Orchestrator inside ALLYVEX, an autonomous B2B sales intelligence system.
-
-CLIENT COMPANY CONTEXT:
-{client_info}
+Our client is described under CLIENT COMPANY CONTEXT at the end.
 
 YOUR IDENTITY:
 You are the final decision-maker. You produce TWO independent verdicts —
@@ -141,18 +140,34 @@ Return this exact JSON:
     "<concrete next step 3 — specify which track this serves>"
   ]
 }}
+
+CLIENT COMPANY CONTEXT:
+{client_info}
 """
 
-def run_orchestrator_agent(
+async def run_orchestrator_agent(
     company_name: str,
-    bull_output: dict,
-    bear_output: dict,
-    detective_output: dict,
-    client_info: str
-) -> dict:
+    bull_output: BullOutput,
+    bear_output: BearOutput,
+    detective_output: DetectiveOutput | None,
+    client_info: str,
+    max_tokens: int = 2500
+) -> OrchestratorOutput:
     print(f"  [ORCHESTRATOR] Weighing all evidence for {company_name}...")
 
-    response = client.chat.complete(
+    if detective_output is None:
+        # Latency budget ran out before the Detective could audit the debate
+        detective_audit = "Not available — skipped to meet the latency budget. Weigh Bull and Bear directly."
+    else:
+        detective_audit = handoff("detective", "orchestrator", detective_output, ORCHESTRATOR_FROM_DETECTIVE)
+    bull_findings = handoff("bull", "orchestrator", bull_output, ORCHESTRATOR_FROM_BULL)
+    bear_findings = handoff("bear", "orchestrator", bear_output, ORCHESTRATOR_FROM_BEAR)
+
+    result = await cached_completion(
+        agent="orchestrator",
+        prompt_version=PROMPT_VERSION,
+        parse=OrchestratorOutput.decode,
+        provider="mistral",
         model="mistral-large-latest",
         messages=[
             {"role": "system", "content": build_orchestrator_prompt(client_info)},
@@ -160,31 +175,27 @@ def run_orchestrator_agent(
                 "role": "user",
                 "content": (
                     f"Target Company: {company_name}\n\n"
-                    f"BULL FINDINGS:\n{json.dumps(bull_output, indent=2)}\n\n"
-                    f"BEAR FINDINGS:\n{json.dumps(bear_output, indent=2)}\n\n"
-                    f"DETECTIVE AUDIT:\n{json.dumps(detective_output, indent=2)}\n\n"
+                    f"BULL FINDINGS:\n{bull_findings}\n\n"
+                    f"BEAR FINDINGS:\n{bear_findings}\n\n"
+                    f"DETECTIVE AUDIT:\n{detective_audit}\n\n"
                     f"Make your final verdict. Return only JSON."
                 )
             }
         ],
-        response_format={"type": "json_object"},
         temperature=0.2,
-        max_tokens=2500
+        max_tokens=max_tokens
     )
 
-    result = parse_json(response.choices[0].message.content)
-    customer_track = result.get("customerTrack", {})
-    partner_track = result.get("partnerTrack", {})
-    customer_regret = customer_track.get("regretScore", {})
-    partner_regret = partner_track.get("regretScore", {})
+    customer_track = result.customerTrack or TrackVerdict()
+    partner_track = result.partnerTrack or TrackVerdict()
+    customer_regret = customer_track.regretScore or RegretScore()
+    partner_regret = partner_track.regretScore or RegretScore()
     print(
         f"  [ORCHESTRATOR] Done.\n"
-        f"    Approach       : {result.get('recommendedApproach')}\n"
-        f"    Customer Verdict: {customer_track.get('verdict')} "
-        f"(confidence {customer_track.get('confidence')}, "
-        f"regret {customer_regret.get('score') if isinstance(customer_regret, dict) else customer_regret})\n"
-        f"    Partner Verdict : {partner_track.get('verdict')} "
-        f"(confidence {partner_track.get('confidence')}, "
-        f"regret {partner_regret.get('score') if isinstance(partner_regret, dict) else partner_regret})"
+        f"    Approach       : {result.recommendedApproach}\n"
+        f"    Customer Verdict: {customer_track.verdict} "
+        f"(confidence {customer_track.confidence}, regret {customer_regret.score})\n"
+        f"    Partner Verdict : {partner_track.verdict} "
+        f"(confidence {partner_track.confidence}, regret {partner_regret.score})"
     )
     return result
\ No newline at end of file
@@ -0,0 +1,127 @@
+import os
+import math
+import asyncio
+from dotenv import load_dotenv
+from utils.llm import cached_completion
+from utils.parser import JsonStreamParser
+from agents.models import Model
+
+load_dotenv()
+
+# With TRACK_SHARDED_AGENTS=true, Bull and Bear each make two concurrent
+# calls over the same evidence, one for the customer track and one for the
+# partner track, and merge them into their usual output. Completion length
+# drives latency, so each call gets TRACK_SHARD_TOKEN_SHARE of the agent's
+# max_tokens instead of one call filling both tracks.
+TRACK_SHARDED_AGENTS = os.getenv("TRACK_SHARDED_AGENTS", "false").lower() == "true"
+TRACK_SHARD_TOKEN_SHARE = float(os.getenv("TRACK_SHARD_TOKEN_SHARE", "0.6"))
+
+CUSTOMER_TRACK_INSTRUCTION = (
+    "This call covers the CUSTOMER track only; a separate call covers the partner track. "
+    "Return the JSON above, leaving out these partner-track fields: {fields}."
+)
+PARTNER_TRACK_INSTRUCTION = (
+    "This call covers the PARTNER track only; a separate call covers the customer track. "
+    "Return a JSON object with only these fields of the JSON above: {fields}."
+)
+
+
+def shard_max_tokens(max_tokens: int) -> int:
+    return math.ceil(max_tokens * TRACK_SHARD_TOKEN_SHARE)
+
+
+def _field_names(fields: dict, prefix: str = "") -> list[str]:
+    names = []
+    for key, sub_fields in fields.items():
+        if sub_fields is None:
+            names.append(f"{prefix}{key}")
+        else:
+            names += _field_names(sub_fields, f"{prefix}{key}.")
+    return names
+
+
+def _only(value, fields: dict | None):
+    """A copy of a typed value with only the named fields set, for a projection of fields."""
+    if fields is None or not isinstance(value, Model):
+        return value
+    return type(value).model_construct(
+        **{key: getattr(value, key) for key in fields if key in value.model_fields_set}
+    )
+
+
+def merge_tracks(customer: Model, partner: Model, partner_fields: dict) -> Model:
+    """The customer-track output with the partner_fields of the partner-track output."""
+    update = {}
+    for key, sub_fields in partner_fields.items():
+        if key not in partner.model_fields_set:
+            continue
+        value, current = getattr(partner, key), getattr(customer, key, None)
+        if sub_fields is not None and isinstance(value, Model) and isinstance(current, Model):
+            update[key] = merge_tracks(current, value, sub_fields)
+        else:
+            update[key] = _only(value, sub_fields)
+    return customer.model_copy(update=update)
+
+
+async def run_track_shards(
+    agent: str,
+    prompt_version: str,
+    decode,
+    provider: str,
+    model: str,
+    system_prompt: str,
+    user_content: str,
+    temperature: float,
+    max_tokens: int,
+    partner_fields: dict,
+    score_field: str,
+    on_element=None
+) -> Model:
+    """
+    Runs the customer-track and partner-track calls of one agent
+    concurrently and merges them. The partner call fills partner_fields;
+    everything else comes from the customer call. The combined score under
+    score_field is the mean of the two track scores. Streamed elements are
+    passed to on_element only from the call that owns them.
+    """
+    fields = ", ".join(_field_names(partner_fields))
+
+    async def shard(track: str) -> Model:
+        is_partner = track == "partner"
+        instruction = PARTNER_TRACK_INSTRUCTION if is_partner else CUSTOMER_TRACK_INSTRUCTION
+
+        def on_track_element(key: str, index: int, element: dict):
+            if (key in partner_fields) == is_partner:
+                on_element(key, index, element)
+
+        return await cached_completion(
+            agent=agent,
+            prompt_version=prompt_version,
+            parse=decode,
+            provider=provider,
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"{user_content}\n\n{instruction.format(fields=fields)}"}
+            ],
+            temperature=temperature,
+            max_tokens=shard_max_tokens(max_tokens),
+            stream_to=JsonStreamParser(on_track_element) if on_element else None
+        )
+
+    tasks = [asyncio.ensure_future(shard(track)) for track in ("customer", "partner")]
+    try:
+        customer, partner = await asyncio.gather(*tasks)
+    finally:
+        # If one track fails, stop the other
+        for task in tasks:
+            task.cancel()
+
+    merged = merge_tracks(customer, partner, partner_fields)
+    scores = getattr(merged, score_field)
+    if scores is not None:
+        track_scores = [s for s in (scores.customerScore, scores.partnerScore) if s is not None]
+        if track_scores:
+            scores = scores.model_copy(update={"combinedScore": round(sum(track_scores) / len(track_scores))})
+            merged = merged.model_copy(update={score_field: scores})
+    return merged
@@ -0,0 +1,196 @@
+"""
+Agent output decode benchmark — json.loads vs typed decoding with repair.
+
+Decodes one run's four agent replies (Bull, Bear, Detective, Orchestrator)
+RUNS times each way and reports the time per run: parse_json alone, the
+typed models on well-formed replies, the typed models on replies with
+common LLM mistakes that they repair, and the four thinking builders, which
+read the typed outputs decoded once.
+
+    cd backend
+    python -m benchmarks.decode_bench            # default 2000 runs
+    DECODE_BENCH_RUNS=10000 python -m benchmarks.decode_bench
+"""
+import os
+import json
+import time
+from agents.models import BullOutput, BearOutput, DetectiveOutput, OrchestratorOutput
+from orchestration.war_room import (
+    build_bull_thinking,
+    build_bear_thinking,
+    build_detective_thinking,
+    build_orchestrator_thinking
+)
+from utils.parser import parse_json
+from utils import metrics
+
+RUNS = int(os.getenv("DECODE_BENCH_RUNS", "2000"))
+
+SIGNAL = {
+    "signal": "Hiring 40+ data engineers across APAC after a Series D",
+    "source": "https://example.com/careers",
+    "date": "2026-03",
+    "strength": "HIGH",
+    "clientConnection": "Pipeline migration work fits the client's core offering",
+    "urgency": "NEAR_TERM",
+    "scaleDependentReasoning": "At their scale the migration is a multi-quarter programme"
+}
+RED_FLAG = {
+    "flag": "Existing multi-year contract with an incumbent data platform",
+    "source": "https://example.com/news",
+    "date": "2025-11",
+    "severity": "MEDIUM",
+    "clientImpact": "Displacement would need an executive sponsor",
+    "dealBreakingPotential": "WEAKENS_POSITION"
+}
+SCORES = {"customerScore": 78, "partnerScore": 52, "combinedScore": 68}
+AUDIT = {
+    "strongClaims": ["Series D closed in March", "APAC build-out announced"],
+    "weakClaims": [{"claim": "Incumbent contract ends next year", "weakness": "Single source", "evidenceGap": "Filing"}] * 2,
+    "technicalFit": "HIGH", "technicalFitReason": "Same cloud stack",
+    "budgetFit": "MEDIUM", "budgetFitReason": "Budget set per region",
+    "timingFit": "HIGH", "timingFitReason": "Planning cycle starts next month",
+    "evidenceScore": 74
+}
+TRACK = {
+    "verdict": "PURSUE",
+    "confidence": 82,
+    "regretScore": {"score": 88, "reason": "Budget decisions for the APAC build-out are being made now"},
+    "decidingFactors": {
+        "strongestBullSignal": "Active data engineering hiring",
+        "strongestBearSignal": "Incumbent platform contract",
+        "detectiveImpact": "Confirmed the funding round",
+        "scaleVerdict": "Scale makes the migration large enough to matter",
+        "keySwingFactor": "Budget is being allocated this quarter"
+    },
+    "targetDecisionMaker": {"title": "VP of Data Engineering", "why": "Owns the migration", "linkedinSearchTip": "VP Data APAC"},
+    "outreachEmail": {"subject": "Your APAC data platform build-out", "body": "Hi [Name],\n\n" + "Saw the expansion news. " * 20},
+    "ifHold": None,
+    "ifAvoid": None
+}
+OUTPUTS = {
+    "bull": {
+        "agentRole": "BULL", "companyName": "Bench Corp", "domain": "bench.example",
+        "companyScale": {"estimatedEmployees": "2000-5000", "scaleCategory": "ENTERPRISE", "scaleReasoning": "Global teams"},
+        "customerSignals": [SIGNAL] * 5,
+        "partnerSignals": [{**SIGNAL, "partnerConnection": "Lists data tooling partners", "partnerType": "INTEGRATION"}] * 3,
+        "technicalDebtSignals": [{"observation": "Nightly batch ETL", "source": "https://example.com", "howClientHelps": "Streaming"}],
+        "fiscalPressureSignals": [{"observation": "Cost review", "source": "https://example.com", "howClientHelps": "Cheaper runs"}],
+        "hiringSignals": {"isHiringRapidly": True, "relevantRoles": ["Data Engineer", "Platform Lead"], "hiringInsight": "Building in-house"},
+        "fundingStatus": {"recentFunding": True, "details": "$120M Series D", "budgetImplication": "Room for vendors"},
+        "overallBullScore": SCORES,
+        "keyArgument": {"asCustomer": "Strong buying window " * 5, "asPartner": "Shared buyers " * 5},
+        "bestTimeToReach": "Before the Q3 planning cycle closes"
+    },
+    "bear": {
+        "agentRole": "BEAR", "companyName": "Bench Corp", "domain": "bench.example",
+        "scaleDisqualifiers": {"customerScaleIssue": None, "partnerScaleIssue": None, "isScaleDisqualified": False},
+        "customerRedFlags": [RED_FLAG] * 4,
+        "partnerRedFlags": [{**RED_FLAG, "partnershipImpact": "Channel conflict"}] * 2,
+        "competitorRisk": {
+            "asCustomer": {"hasCompetitorContract": True, "competitorName": "Incumbent", "details": "Renewed", "threatLevel": "MEDIUM"},
+            "asPartner": {"competesWithClient": False, "details": "", "threatLevel": "LOW"}
+        },
+        "financialHealth": {"concerning": False, "details": "", "source": ""},
+        "leadershipStability": {"stable": True, "details": ""},
+        "technicalDebtBarriers": [{"observation": "Custom schema", "source": "https://example.com", "integrationRisk": "Mapping work"}],
+        "overallBearScore": SCORES,
+        "keyArgument": {"asCustomer": "Incumbent lock-in " * 5, "asPartner": "Overlap " * 5},
+        "dealKiller": {"customerDealKiller": None, "partnerDealKiller": None}
+    },
+    "detective": {
+        "agentRole": "DETECTIVE", "companyName": "Bench Corp",
+        "scaleVerification": {"confirmedScale": "ENTERPRISE", "scaleImpactsCustomerTrack": "Large", "scaleImpactsPartnerTrack": "Reach"},
+        "customerTrackAudit": AUDIT,
+        "partnerTrackAudit": {**AUDIT, "customerBaseOverlap": "HIGH", "distributionValue": "MEDIUM"},
+        "splitVerdictAssessment": {
+            "customerTrackStrength": "STRONG", "partnerTrackStrength": "MODERATE",
+            "recommendedApproach": "BOTH", "sequencingAdvice": "Customer first", "splitReasoning": "Budget is live now"
+        },
+        "missingContext": [{"finding": "New CTO hired in March", "impactsTrack": "CUSTOMER", "impact": "STRENGTHENS_BULL",
+                            "clientRelevance": "Fresh budget owner"}] * 3,
+        "criticalOverlookedFact": "The incumbent contract ends next year",
+        "investigationGaps": ["Contract end date"],
+        "overallConfidenceInDebate": 74
+    },
+    "orchestrator": {
+        "agentRole": "ORCHESTRATOR", "companyName": "Bench Corp",
+        "confirmedScale": "ENTERPRISE",
+        "executiveSummary": "Bench Corp is expanding its data platform. " * 4,
+        "customerTrack": TRACK,
+        "partnerTrack": {**TRACK, "verdict": "HOLD", "confidence": 58},
+        "recommendedApproach": "CUSTOMER_NOW_PARTNER_LATER",
+        "recommendedApproachReason": "Immediate project need " * 5,
+        "clientAdvantages": ["APAC delivery team", "Migration accelerators"],
+        "clientDisadvantages": ["No existing logo in their vertical"],
+        "proposedNextSteps": ["Map the data org", "Warm intro via partner", "Send the migration case study"]
+    }
+}
+# The same replies with mistakes LLMs make: string scores and booleans, a
+# lone object or null where an array belongs, and missing arrays
+MALFORMED = {
+    "bull": {
+        **OUTPUTS["bull"],
+        "customerSignals": SIGNAL,
+        "fiscalPressureSignals": None,
+        "hiringSignals": {**OUTPUTS["bull"]["hiringSignals"], "isHiringRapidly": "true", "relevantRoles": "Data Engineer"},
+        "overallBullScore": {"customerScore": "78/100", "partnerScore": "52", "combinedScore": 68.4}
+    },
+    "bear": {
+        **{k: v for k, v in OUTPUTS["bear"].items() if k not in ("partnerRedFlags", "technicalDebtBarriers")},
+        "overallBearScore": "41",
+        "dealKiller": "null"
+    },
+    "detective": {
+        **OUTPUTS["detective"],
+        "missingContext": OUTPUTS["detective"]["missingContext"][0],
+        "overallConfidenceInDebate": "74/100"
+    },
+    "orchestrator": {
+        **{k: v for k, v in OUTPUTS["orchestrator"].items() if k != "clientDisadvantages"},
+        "customerTrack": {**TRACK, "confidence": "82"},
+        "proposedNextSteps": "Map the data org"
+    }
+}
+MODELS = {"bull": BullOutput, "bear": BearOutput, "detective": DetectiveOutput, "orchestrator": OrchestratorOutput}
+
+
+def _replies(outputs: dict) -> dict:
+    return {agent: "```json\n" + json.dumps(output, indent=2) + "\n```" for agent, output in outputs.items()}
+
+
+def _time_per_run(step) -> float:
+    started = time.perf_counter()
+    for _ in range(RUNS):
+        step()
+    return (time.perf_counter() - started) / RUNS * 1_000_000
+
+
+def main():
+    replies, malformed = _replies(OUTPUTS), _replies(MALFORMED)
+    decoded = {agent: MODELS[agent].decode(reply) for agent, reply in replies.items()}
+    repairs_before = sum(v for k, v in metrics.snapshot().items() if k.startswith("llm.repairs."))
+    for agent, reply in malformed.items():
+        MODELS[agent].decode(reply)
+    repairs = sum(v for k, v in metrics.snapshot().items() if k.startswith("llm.repairs.")) - repairs_before
+
+    results = {
+        "parse_json": _time_per_run(lambda: [parse_json(reply) for reply in replies.values()]),
+        "typed decode": _time_per_run(lambda: [MODELS[a].decode(reply) for a, reply in replies.items()]),
+        "typed decode + repair": _time_per_run(lambda: [MODELS[a].decode(reply) for a, reply in malformed.items()]),
+        "thinking builders": _time_per_run(lambda: (
+            build_bull_thinking(decoded["bull"]),
+            build_bear_thinking(decoded["bear"]),
+            build_detective_thinking(decoded["detective"]),
+            build_orchestrator_thinking(decoded["orchestrator"], decoded["bull"], decoded["bear"])
+        ))
+    }
+
+    chars = sum(len(reply) for reply in replies.values())
+    print(f"Decoding 4 agent replies ({chars} chars) × {RUNS} runs; {repairs} repairs per malformed run\n")
+    for step, micros in results.items():
+        print(f"  {step:<24} {micros:>10.1f} µs/run")
+
+
+if __name__ == "__main__":
+    main()
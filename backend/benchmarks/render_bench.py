@@ -0,0 +1,167 @@
+"""
+Document render benchmark — serial in-process rendering vs the render pool.
+
+Renders the four documents of a run RUNS times in each mode and reports
+wall time per run and CPU utilisation (CPU seconds across this process and
+its render workers, divided by wall seconds × cores).
+
+    cd backend
+    python -m benchmarks.render_bench            # default 5 runs
+    RENDER_BENCH_RUNS=20 python -m benchmarks.render_bench
+"""
+import os
+import time
+import asyncio
+import resource
+from orchestration import documents
+from orchestration.checkpoints import CHECKPOINTS_DIR, new_run_key, save_phase
+from orchestration.documents import DOCUMENT_CACHE_DIR, prerender_documents, shutdown_render_pool
+from utils.document_generator import generate_dossier, generate_executive_summary_pdf
+
+RUNS = int(os.getenv("RENDER_BENCH_RUNS", "5"))
+OUTPUTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "outputs")
+
+SIGNAL = {
+    "signal": "Hiring 40+ data engineers across APAC after a Series D",
+    "clientConnection": "Pipeline migration work fits the client's core offering",
+    "partnerConnection": "Their integrations marketplace lists data tooling partners",
+    "strength": "HIGH",
+    "source": "https://example.com/careers"
+}
+RED_FLAG = {
+    "flag": "Existing multi-year contract with an incumbent data platform",
+    "clientImpact": "Displacement would need an executive sponsor",
+    "severity": "MEDIUM",
+    "source": "https://example.com/news"
+}
+TRACK = {
+    "verdict": "PURSUE",
+    "confidence": 82,
+    "regretScore": {"score": 88, "reason": "Budget decisions for the APAC build-out are being made now"},
+    "targetDecisionMaker": {"title": "VP of Data Engineering", "why": "Owns the migration", "linkedinSearchTip": "VP Data APAC"},
+    "outreachEmail": {"subject": "Your APAC data platform build-out", "body": "Hi [Name],\n\n" + "Saw the expansion news. " * 20},
+    "decidingFactors": {
+        "strongestBullSignal": "Active data engineering hiring",
+        "strongestBearSignal": "Incumbent platform contract",
+        "detectiveImpact": "Confirmed the funding round",
+        "scaleVerdict": "Scale makes the migration large enough to matter",
+        "keySwingFactor": "Budget is being allocated this quarter"
+    },
+    "ifHold": "Revisit after the Q3 planning cycle",
+    "ifAvoid": None
+}
+SAMPLE = {
+    "company_name": "Bench Corp",
+    "domain": "bench.example",
+    "client_info": "Company: DataVex\nWhat we do: data engineering services\n" * 5,
+    "bull_output": {
+        "customerSignals": [SIGNAL] * 6,
+        "partnerSignals": [SIGNAL] * 4,
+        "technicalDebtSignals": [SIGNAL] * 3,
+        "fiscalPressureSignals": [SIGNAL] * 2,
+        "recentPivotSignals": [SIGNAL] * 2,
+        "overallBullScore": 78,
+        "keyArgument": "Strong buying window " * 10
+    },
+    "bear_output": {
+        "customerRedFlags": [RED_FLAG] * 6,
+        "partnerRedFlags": [RED_FLAG] * 4,
+        "overallBearScore": 41,
+        "dealKiller": None,
+        "keyArgument": "Incumbent lock-in " * 10
+    },
+    "detective_output": {
+        "bullAudit": {"evidenceScore": 80, "weakClaims": [{"claim": "Series D size", "issue": "Unconfirmed"}] * 3},
+        "bearAudit": {"evidenceScore": 65, "weakClaims": [{"claim": "Contract length", "issue": "Rumour"}] * 3},
+        "missingContext": [{"fact": "New CTO hired in March", "impact": "Fresh budget owner"}] * 4,
+        "criticalOverlookedFact": "The incumbent contract ends next year",
+        "overallConfidenceInDebate": 74
+    },
+    "orchestrator_output": {
+        "confirmedScale": "ENTERPRISE",
+        "recommendedApproach": "CUSTOMER_FIRST",
+        "recommendedApproachReason": "Immediate project need " * 5,
+        "executiveSummary": "Bench Corp is expanding its data platform. " * 15,
+        "customerTrack": TRACK,
+        "partnerTrack": {**TRACK, "verdict": "HOLD", "confidence": 58},
+        "clientAdvantages": ["APAC delivery team", "Migration accelerators"] * 3,
+        "clientDisadvantages": ["No existing logo in their vertical"] * 2,
+        "proposedNextSteps": ["Map the data org", "Warm intro via partner"] * 3
+    }
+}
+
+
+def _render_serial() -> list[str]:
+    files = []
+    for track in ("customer", "partner"):
+        files.append(generate_dossier(**SAMPLE, track=track))
+        files.append(generate_executive_summary_pdf(
+            company_name=SAMPLE["company_name"],
+            domain=SAMPLE["domain"],
+            orchestrator_output=SAMPLE["orchestrator_output"],
+            track=track
+        ))
+    return files
+
+
+async def _render_pool() -> list[str]:
+    # A fresh run key per run, so every run renders instead of hitting the cache
+    run_key = new_run_key()
+    for phase in ("bull", "bear", "detective", "orchestrator"):
+        save_phase(
+            run_key, SAMPLE["domain"], SAMPLE["client_info"], phase,
+            SAMPLE[f"{phase}_output"], SAMPLE["company_name"]
+        )
+    await prerender_documents(run_key)
+    files = [os.path.join(CHECKPOINTS_DIR, f"{run_key}.json")]
+    files += [os.path.join(DOCUMENT_CACHE_DIR, name) for name in os.listdir(DOCUMENT_CACHE_DIR)
+              if name.startswith(run_key)]
+    return files
+
+
+def _cpu_seconds() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _cleanup(files: list[str]):
+    for name in files:
+        path = os.path.join(OUTPUTS_DIR, name)
+        if os.path.isfile(path):
+            os.remove(path)
+
+
+def bench(mode: str) -> dict:
+    files = []
+    cpu_before = _cpu_seconds()
+    started = time.perf_counter()
+    for _ in range(RUNS):
+        if mode == "serial":
+            files += _render_serial()
+        else:
+            files += asyncio.run(_render_pool())
+    wall = time.perf_counter() - started
+    if mode == "pool":
+        # Worker CPU time is only counted once the workers have exited
+        documents._pool.shutdown(wait=True)
+        documents._pool = None
+    cpu = _cpu_seconds() - cpu_before
+    _cleanup(files)
+
+    cores = os.cpu_count() or 1
+    return {
+        "mode": mode,
+        "runs": RUNS,
+        "msPerRun": round(wall / RUNS * 1000, 1),
+        "cpuSeconds": round(cpu, 2),
+        "cpuUtilisation": f"{cpu / (wall * cores) * 100:.0f}% of {cores} cores"
+    }
+
+
+if __name__ == "__main__":
+    print(f"Rendering 4 documents × {RUNS} runs, {documents.RENDER_WORKERS} render workers\n")
+    results = [bench("serial"), bench("pool")]
+    shutdown_render_pool()
+    for r in results:
+        print(f"  {r['mode']:<7} {r['msPerRun']:>8} ms/run   {r['cpuSeconds']:>6} CPU s   {r['cpuUtilisation']}")
@@ -0,0 +1,98 @@
+"""
+Offline War Room benchmark — replays a recorded cassette.
+
+Record one real run (needs API keys and a network), then replay it as often
+as needed with neither. Each replay reports the client profile, when each
+War Room phase finished, the thinking builders and document rendering.
+
+    cd backend
+    ALLYVEX_CASSETTE_MODE=record ALLYVEX_CASSETTE=cassettes/amazon.json python test.py
+    ALLYVEX_CASSETTE=cassettes/amazon.json python -m benchmarks.replay_bench
+    CASSETTE_LATENCY_SCALE=0 REPLAY_BENCH_RUNS=10 ALLYVEX_CASSETTE=cassettes/amazon.json python -m benchmarks.replay_bench
+
+The client URL and target domain must be the ones recorded — test.py's by
+default, otherwise set REPLAY_BENCH_CLIENT_URL and REPLAY_BENCH_DOMAIN.
+"""
+import os
+
+# Must be set before the clients and cassette are imported
+os.environ.setdefault("ALLYVEX_CASSETTE_MODE", "replay")
+
+import time
+import asyncio
+import statistics
+from agents.models import BullOutput, BearOutput, DetectiveOutput, OrchestratorOutput
+from orchestration.checkpoints import CHECKPOINTS_DIR, load_checkpoint, new_run_key
+from orchestration.documents import DOCUMENT_CACHE_DIR, prerender_documents, shutdown_render_pool
+from orchestration.war_room import (
+    run_war_room,
+    build_bull_thinking,
+    build_bear_thinking,
+    build_detective_thinking,
+    build_orchestrator_thinking
+)
+from utils.cassette import CASSETTE_LATENCY_SCALE, CASSETTE_PATH, rewind
+from utils.doc_generator import generate_client_info
+
+RUNS = int(os.getenv("REPLAY_BENCH_RUNS", "3"))
+CLIENT_URL = os.getenv("REPLAY_BENCH_CLIENT_URL", "https://datavex.ai")
+DOMAIN = os.getenv("REPLAY_BENCH_DOMAIN", "amazon.com")
+THINKING_REPEATS = 1000
+
+
+def _thinking_ms(phases: dict) -> float:
+    """Mean time for one pass over all four thinking builders, on outputs typed once."""
+    bull, bear = BullOutput.of(phases.get("bull")), BearOutput.of(phases.get("bear"))
+    detective = DetectiveOutput.of(phases.get("detective"))
+    orchestrator = OrchestratorOutput.of(phases.get("orchestrator"))
+    started = time.perf_counter()
+    for _ in range(THINKING_REPEATS):
+        build_bull_thinking(bull)
+        build_bear_thinking(bear)
+        build_detective_thinking(detective)
+        build_orchestrator_thinking(orchestrator, bull, bear)
+    return (time.perf_counter() - started) / THINKING_REPEATS * 1000
+
+
+async def replay() -> dict:
+    rewind()
+    timings = {}
+    started = time.perf_counter()
+    client_info = await generate_client_info(CLIENT_URL)
+    timings["clientProfile"] = time.perf_counter() - started
+
+    run_key = new_run_key()
+    started = time.perf_counter()
+    async for event in run_war_room(DOMAIN, client_info, run_key=run_key):
+        phase = event.get("phase", "")
+        if phase.endswith("_DONE") or phase in ("COMPLETE", "DETECTIVE_SKIPPED"):
+            timings[phase] = time.perf_counter() - started
+        if phase == "ERROR":
+            raise RuntimeError(f"{event.get('agent')}: {event.get('message')} — was the cassette recorded for this run?")
+
+    phases = load_checkpoint(run_key)["phases"]
+    timings["thinkingBuilders"] = _thinking_ms(phases) / 1000
+
+    started = time.perf_counter()
+    await prerender_documents(run_key)
+    timings["documents"] = time.perf_counter() - started
+
+    os.remove(os.path.join(CHECKPOINTS_DIR, f"{run_key}.json"))
+    for name in os.listdir(DOCUMENT_CACHE_DIR):
+        if name.startswith(run_key):
+            os.remove(os.path.join(DOCUMENT_CACHE_DIR, name))
+    return timings
+
+
+async def main():
+    print(f"Replaying {CASSETTE_PATH} × {RUNS} runs, latency scale {CASSETTE_LATENCY_SCALE}\n")
+    runs = [await replay() for _ in range(RUNS)]
+    shutdown_render_pool()
+    print(f"  {'step':<22} {'mean ms':>10} {'min ms':>10}   (phases: time since the War Room started)")
+    for step in runs[0]:
+        samples = [run[step] * 1000 for run in runs if step in run]
+        print(f"  {step:<22} {statistics.mean(samples):>10.3f} {min(samples):>10.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,12 +1,20 @@
 import os
 import json
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, FileResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from orchestration.war_room import run_war_room
+from orchestration.batch import run_batch, MAX_BATCH_DOMAINS
+from orchestration.jobs import start_job, get_job
+from orchestration.checkpoints import is_valid_run_key, load_checkpoint
+from orchestration.documents import shutdown_render_pool, document_links, get_document
+from orchestration.profiles import save_profile, load_profile
+from utils import metrics
+from utils.resilience import breaker_states
+from utils.evidence_index import index_stats
 from utils.doc_generator import generate_client_info
+from utils.search_tools import tavily_http_client
 from motor.motor_asyncio import AsyncIOMotorClient
 from passlib.context import CryptContext
 from pydantic import EmailStr
@@ -28,6 +36,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Job-Id"],
 )
 
 class GenerateProfileRequest(BaseModel):
@@ -35,7 +44,67 @@ class GenerateProfileRequest(BaseModel):
 
 class AnalyzeRequest(BaseModel):
     domain: str
-    client_info: str
+    # Either the profileId from /api/generate-client-profile or the profile text
+    profile_id: str | None = None
+    client_info: str | None = None
+    # Run key of an earlier failed run to resume from its checkpoint
+    run_key: str | None = None
+    # Seconds within which a verdict is needed; the run degrades to meet it
+    time_budget: float | None = None
+    # Skip the search and LLM caches: every search and model call is made fresh
+    fresh: bool = False
+
+class BatchAnalyzeRequest(BaseModel):
+    domains: list[str]
+    profile_id: str | None = None
+    client_info: str | None = None
+    concurrency: int | None = None
+    time_budget: float | None = None
+    fresh: bool = False
+
+def normalize_domain(domain: str) -> str:
+    domain = domain.strip().lower()
+    return domain.replace("https://", "").replace("http://", "").rstrip("/")
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"
+}
+
+def media_type_for(filename: str) -> str:
+    if filename.endswith(".docx"):
+        return "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    if filename.endswith(".pdf"):
+        return "application/pdf"
+    return "application/octet-stream"
+
+def resolve_client_info(profile_id: str | None, client_info: str | None) -> str:
+    """The stored profile for profile_id, else the profile text sent inline."""
+    if profile_id:
+        stored = load_profile(profile_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail=f"Client profile '{profile_id}' not found")
+        return stored
+    client_info = (client_info or "").strip()
+    if not client_info:
+        raise HTTPException(status_code=400, detail="Client profile is required")
+    return client_info
+
+def validate_analyze_request(request: AnalyzeRequest) -> tuple[str, str]:
+    domain = normalize_domain(request.domain)
+    if not domain:
+        raise HTTPException(status_code=400, detail="Domain is required")
+    client_info = resolve_client_info(request.profile_id, request.client_info)
+    if request.run_key and not is_valid_run_key(request.run_key):
+        raise HTTPException(status_code=400, detail="Invalid run key")
+    if request.time_budget is not None and request.time_budget <= 0:
+        raise HTTPException(status_code=400, detail="Time budget must be positive")
+    return domain, client_info
+
+@app.on_event("shutdown")
+async def shutdown():
+    shutdown_render_pool()
+    await tavily_http_client.aclose()
 
 @app.get("/")
 def health_check():
@@ -45,19 +114,20 @@ def health_check():
 async def generate_client_profile(request: GenerateProfileRequest):
     """
     Step 1 — Frontend sends client company URL.
-    Backend scrapes it and generates a structured profile document.
-    Frontend stores the returned clientProfile and sends it
-    back when calling /api/analyze.
+    Backend scrapes it, generates a structured profile document and
+    stores it. Frontend keeps the returned profileId and sends it
+    when calling /api/analyze.
     """
     url = request.url.strip()
     if not url:
         raise HTTPException(status_code=400, detail="URL is required")
 
     try:
-        document = generate_client_info(url)
+        document = await generate_client_info(url)
         return {
             "status": "success",
             "url": url,
+            "profileId": save_profile(document, url),
             "clientProfile": document
         }
     except ValueError as e:
@@ -72,37 +142,201 @@ async def generate_client_profile(request: GenerateProfileRequest):
 async def analyze(request: AnalyzeRequest):
     """
     Step 2 — Frontend sends target domain + client profile.
-    Runs the full War Room pipeline and streams events back.
+    Runs the full War Room pipeline as a server-side job and streams its
+    events back. The job ID is returned in the X-Job-Id header; if the
+    connection drops, resume with GET /api/jobs/{id}/events using the
+    number of events already received as Last-Event-ID. If nobody is
+    connected for ORPHANED_JOB_GRACE_SECONDS, the run is cancelled.
     """
-    domain = request.domain.strip().lower()
-    domain = domain.replace("https://", "").replace("http://", "").rstrip("/")
-    client_info = request.client_info.strip()
+    domain, client_info = validate_analyze_request(request)
+    # Closing the page cancels the run unless the client resumes it in time
+    job = start_job(
+        domain, client_info, request.run_key,
+        cancel_on_disconnect=True,
+        time_budget=request.time_budget,
+        fresh=request.fresh
+    )
 
-    if not domain:
-        raise HTTPException(status_code=400, detail="Domain is required")
-    if not client_info:
-        raise HTTPException(status_code=400, detail="Client profile is required")
+    async def event_stream():
+        async for item in job.tail():
+            if item is None:
+                yield ": keep-alive\n\n"
+                continue
+            _, event = item
+            yield f"data: {json.dumps(event)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={**SSE_HEADERS, "X-Job-Id": job.id}
+    )
+
+
+@app.post("/api/jobs")
+async def create_job(request: AnalyzeRequest):
+    """
+    Starts a War Room analysis in the background without streaming it.
+    Follow it with GET /api/jobs/{id}/events.
+    """
+    domain, client_info = validate_analyze_request(request)
+    job = start_job(
+        domain, client_info, request.run_key,
+        time_budget=request.time_budget,
+        fresh=request.fresh
+    )
+    return job.to_dict()
+
+
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.to_dict()
+
+
+@app.post("/api/jobs/{job_id}/retry")
+async def retry_job(job_id: str):
+    """
+    Re-runs a failed job as a new job under the same run key. Phases that
+    finished before the failure are restored from their checkpoint.
+    """
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    if not job.finished:
+        raise HTTPException(status_code=409, detail="Job is still running")
+
+    retry = start_job(
+        job.domain, job.client_info, job.run_key,
+        time_budget=job.time_budget,
+        fresh=job.fresh
+    )
+    return retry.to_dict()
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(
+    job_id: str,
+    last_event_id: int | None = None,
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID")
+):
+    """
+    Replays a job's event log after Last-Event-ID (header, or the
+    last_event_id query parameter) and then tails new events live.
+    Each SSE message carries its sequence number as the event id.
+    """
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    resume_from = last_event_id or 0
+    if last_event_id_header and last_event_id_header.strip().isdigit():
+        resume_from = int(last_event_id_header.strip())
 
     async def event_stream():
-        async for event in run_war_room(domain, client_info):
+        async for item in job.tail(resume_from):
+            if item is None:
+                yield ": keep-alive\n\n"
+                continue
+            event_id, event = item
+            yield f"id: {event_id}\ndata: {json.dumps(event)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+@app.post("/api/analyze/batch")
+async def analyze_batch(request: BatchAnalyzeRequest):
+    """
+    Runs the War Room over a whole account list with bounded concurrency.
+    Streams one multiplexed SSE feed of per-domain progress events and
+    finishes with a BATCH_COMPLETE event holding the ranked verdicts.
+    """
+    # Normalise and de-duplicate while keeping the uploaded order
+    domains = list(dict.fromkeys(
+        normalize_domain(d) for d in request.domains if d.strip()
+    ))
+    if not domains:
+        raise HTTPException(status_code=400, detail="At least one domain is required")
+    if len(domains) > MAX_BATCH_DOMAINS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch is limited to {MAX_BATCH_DOMAINS} domains"
+        )
+    client_info = resolve_client_info(request.profile_id, request.client_info)
+    if request.time_budget is not None and request.time_budget <= 0:
+        raise HTTPException(status_code=400, detail="Time budget must be positive")
+
+    async def event_stream():
+        async for event in run_batch(
+            domains, client_info, request.concurrency, request.time_budget, request.fresh
+        ):
             yield f"data: {json.dumps(event)}\n\n"
         yield "data: [DONE]\n\n"
 
     return StreamingResponse(
         event_stream(),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "X-Accel-Buffering": "no"
-        }
+        headers=SSE_HEADERS
     )
 
 
+@app.get("/api/runs/{run_key}/documents")
+async def run_documents(run_key: str):
+    """
+    Download links for a run's DOCX and PDF files. Status is ON_DEMAND unless
+    PRERENDER_DOCUMENTS is set, in which case it moves from RENDERING to READY.
+    """
+    checkpoint = load_checkpoint(run_key)
+    if not checkpoint:
+        raise HTTPException(status_code=404, detail=f"Run '{run_key}' not found")
+    return {
+        "runKey": run_key,
+        "status": checkpoint.get("documentsStatus", "ON_DEMAND"),
+        "documents": document_links(run_key)
+    }
+
+
+@app.get("/api/runs/{run_key}/documents/{track}/{kind}")
+async def run_document(run_key: str, track: str, kind: str):
+    """
+    Downloads one document (track: customer | partner, kind: dossier |
+    executive-summary). It is rendered from the run's checkpoint on first
+    request and served from the document cache afterwards.
+    """
+    try:
+        document = await get_document(run_key, track, kind)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Document generation failed: {e}")
+    if not document:
+        raise HTTPException(status_code=404, detail="No finished analysis for this document")
+
+    path, filename = document
+    return FileResponse(path=path, media_type=media_type_for(filename), filename=filename)
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """
+    Process-wide counters, e.g. runs cancelled and the planned provider calls they did not make,
+    plus the circuit breaker state of each provider and the evidence index's
+    size and lookup latency.
+    """
+    return {**metrics.snapshot(), "circuits": breaker_states(), "evidenceIndex": index_stats()}
+
+
 @app.get("/api/download/{filename}")
 async def download_file(filename: str):
     """
     Download a generated DOCX or PDF file from the outputs directory.
-    The filename is returned in the COMPLETE event under result.documents.
+    New runs link their documents through /api/runs/{run_key}/documents
+    instead; this serves files generated before that.
     """
     # Sanitize — prevent path traversal
     safe_name = os.path.basename(filename)
@@ -111,16 +345,9 @@ async def download_file(filename: str):
     if not os.path.isfile(filepath):
         raise HTTPException(status_code=404, detail=f"File '{safe_name}' not found in outputs.")
 
-    if safe_name.endswith(".docx"):
-        media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-    elif safe_name.endswith(".pdf"):
-        media_type = "application/pdf"
-    else:
-        media_type = "application/octet-stream"
-
     return FileResponse(
         path=filepath,
-        media_type=media_type,
+        media_type=media_type_for(safe_name),
         filename=safe_name
     )
 
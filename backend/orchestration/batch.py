@@ -0,0 +1,153 @@
+import os
+import time
+import asyncio
+from dotenv import load_dotenv
+from orchestration.war_room import run_war_room
+
+load_dotenv()
+
+# How many war rooms may run at once for a single batch request
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+MAX_BATCH_CONCURRENCY = int(os.getenv("MAX_BATCH_CONCURRENCY", "16"))
+MAX_BATCH_DOMAINS = int(os.getenv("MAX_BATCH_DOMAINS", "2000"))
+
+VERDICT_WEIGHT = {"PURSUE": 2, "HOLD": 1, "AVOID": 0}
+
+
+def _track_priority(track: dict) -> int:
+    """PURSUE beats HOLD beats AVOID; confidence breaks ties within a verdict."""
+    confidence = track.get("confidence")
+    if not isinstance(confidence, (int, float)):
+        confidence = 0
+    return VERDICT_WEIGHT.get(track.get("verdict"), 0) * 100 + confidence
+
+
+def summarize_result(result: dict) -> dict:
+    """Reduces a COMPLETE result to the row shown in the batch summary."""
+    customer = result.get("customerTrack", {}) or {}
+    partner = result.get("partnerTrack", {}) or {}
+    return {
+        "domain": result.get("domain"),
+        "companyName": result.get("companyName"),
+        "confirmedScale": result.get("confirmedScale"),
+        "recommendedApproach": result.get("recommendedApproach"),
+        "degraded": result.get("degraded", False),
+        "customerVerdict": customer.get("verdict"),
+        "customerConfidence": customer.get("confidence"),
+        "partnerVerdict": partner.get("verdict"),
+        "partnerConfidence": partner.get("confidence"),
+        "priority": max(_track_priority(customer), _track_priority(partner))
+    }
+
+
+def rank_results(rows: list[dict]) -> list[dict]:
+    ranked = sorted(rows, key=lambda row: row["priority"], reverse=True)
+    for position, row in enumerate(ranked, 1):
+        row["rank"] = position
+    return ranked
+
+
+async def run_batch(
+    domains: list[str],
+    client_info: str,
+    concurrency: int | None = None,
+    time_budget: float | None = None,
+    fresh: bool = False
+):
+    """
+    Runs the War Room for every domain with at most `concurrency` runs in flight
+    and yields one multiplexed stream of per-domain progress events, followed by
+    a BATCH_COMPLETE event carrying the ranked summary. time_budget, if
+    given, applies to each domain's run separately; fresh skips the search cache.
+    """
+    concurrency = max(1, min(concurrency or BATCH_CONCURRENCY, MAX_BATCH_CONCURRENCY))
+    total = len(domains)
+    started_at = time.monotonic()
+
+    queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(concurrency)
+    rows = []
+    failures = []
+
+    def throughput() -> float:
+        elapsed = time.monotonic() - started_at
+        finished = len(rows) + len(failures)
+        return round(finished / elapsed * 60, 2) if elapsed > 0 else 0.0
+
+    async def analyze_domain(domain: str):
+        async with semaphore:
+            await queue.put({"phase": "DOMAIN_START", "domain": domain})
+            try:
+                async for event in run_war_room(domain, client_info, time_budget=time_budget, fresh=fresh):
+                    phase = event.get("phase")
+                    # Per-element thoughts are too fine-grained for batch progress
+                    if phase.endswith("_PARTIAL"):
+                        continue
+                    progress_event = {
+                        "phase": phase,
+                        "domain": domain,
+                        "message": event.get("message", "")
+                    }
+                    if phase == "COMPLETE":
+                        row = summarize_result(event["result"])
+                        rows.append(row)
+                        progress_event["summary"] = row
+                    elif phase == "ERROR":
+                        failures.append({
+                            "domain": domain,
+                            "agent": event.get("agent"),
+                            "message": event.get("message")
+                        })
+                        progress_event["agent"] = event.get("agent")
+                    if phase in ("COMPLETE", "ERROR"):
+                        progress_event["progress"] = {
+                            "finished": len(rows) + len(failures),
+                            "total": total,
+                            "domainsPerMinute": throughput()
+                        }
+                    await queue.put(progress_event)
+            except Exception as e:
+                failures.append({"domain": domain, "agent": None, "message": str(e)})
+                await queue.put({"phase": "ERROR", "domain": domain, "message": str(e)})
+
+    print(f"\n[BATCH] Analyzing {total} domains with concurrency {concurrency}")
+    yield {
+        "phase": "BATCH_START",
+        "message": f"Analyzing {total} domains, {concurrency} at a time...",
+        "total": total,
+        "concurrency": concurrency
+    }
+
+    tasks = [asyncio.create_task(analyze_domain(domain)) for domain in domains]
+    runner = asyncio.ensure_future(asyncio.gather(*tasks))
+    try:
+        while not (runner.done() and queue.empty()):
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait({getter, runner}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+            else:
+                getter.cancel()
+    finally:
+        # Client went away or the batch finished — stop anything still running
+        for task in tasks:
+            task.cancel()
+
+    elapsed = time.monotonic() - started_at
+    print(f"[BATCH] Done: {len(rows)} complete, {len(failures)} failed in {elapsed:.1f}s")
+    yield {
+        "phase": "BATCH_COMPLETE",
+        "message": f"Batch complete: {len(rows)} analyzed, {len(failures)} failed.",
+        "result": {
+            "ranked": rank_results(rows),
+            "failed": failures,
+            "stats": {
+                "total": total,
+                "completed": len(rows),
+                "failed": len(failures),
+                "concurrency": concurrency,
+                "elapsedSeconds": round(elapsed, 2),
+                "domainsPerMinute": throughput()
+            }
+        }
+    }
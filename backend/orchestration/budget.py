@@ -0,0 +1,159 @@
+import os
+import time
+import asyncio
+from dotenv import load_dotenv
+from agents.tracks import TRACK_SHARDED_AGENTS, shard_max_tokens
+
+load_dotenv()
+
+# Rough per-step latencies used to plan how much to degrade. Tune them to
+# what the traces (COMPLETE.timing) show for your providers. LLM time is
+# estimated per 1k of max_tokens; Groq streams well over 300 tokens/s.
+EST_SEARCH_SECONDS = float(os.getenv("BUDGET_EST_SEARCH_SECONDS", "2.5"))
+EST_LLM_SECONDS_PER_1K_TOKENS = float(os.getenv("BUDGET_EST_LLM_SECONDS_PER_1K_TOKENS", "3"))
+EST_ORCHESTRATOR_SECONDS = float(os.getenv("BUDGET_EST_ORCHESTRATOR_SECONDS", "15"))
+
+# Applied in this order as the deadline gets closer. Each step keeps the ones before it.
+DEGRADATION_STEPS = (
+    "SKIP_DETECTIVE_SEARCH",
+    "REDUCED_SEARCH_RESULTS",
+    "REDUCED_MAX_TOKENS",
+    "SKIP_DETECTIVE"
+)
+
+# Candidates per search. The evidence pool packs them into each agent's
+# token budget, so more candidates mean better picks, not longer prompts.
+DEFAULT_SEARCH_RESULTS = 4
+REDUCED_SEARCH_RESULTS = 2
+REDUCED_TOKENS_FACTOR = 0.6
+
+
+class BudgetExceeded(Exception):
+    """Raised when a phase is still running at the deadline the budget gave it."""
+
+
+class LatencyBudget:
+    """
+    Deadline for one War Room run. Before each stage the war room calls plan(),
+    which escalates to the mildest degradation level whose estimated remaining
+    work still fits in the time left. Levels never go back down during a run.
+    A budget of None never degrades.
+
+    A stage that runs long is not cut short: the next plan() moves further
+    down the ladder instead. Only the Detective, which can be skipped, runs
+    under a hard deadline (within). The Orchestrator always gets its full
+    max_tokens, as a cut-off verdict is not valid JSON.
+    """
+
+    def __init__(self, seconds: float | None = None):
+        self.seconds = seconds
+        self.started_at = time.monotonic()
+        self.level = 0
+        self.applied: list[str] = []
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.applied)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> float:
+        if self.seconds is None:
+            return float("inf")
+        return self.seconds - self.elapsed()
+
+    def _llm_seconds(self, max_tokens: int, level: int) -> float:
+        return EST_LLM_SECONDS_PER_1K_TOKENS * self.max_tokens(max_tokens, level) / 1000
+
+    def _estimate(self, stage: str, level: int) -> float:
+        """Estimated seconds for `stage` and everything after it at `level`."""
+        orchestrator = EST_ORCHESTRATOR_SECONDS
+        detective = 0.0
+        if level < 4:
+            detective = self._llm_seconds(2000, level) + (EST_SEARCH_SECONDS if level < 1 else 0)
+        if stage == "orchestrator":
+            return orchestrator
+        if stage == "detective":
+            return detective + orchestrator
+        # Each agent's searches run concurrently, so they cost about one search
+        search_factor = 0.8 if level >= 2 else 1
+        # A track-sharded agent takes about as long as one of its track calls
+        agent_tokens = shard_max_tokens(2000) if TRACK_SHARDED_AGENTS else 2000
+        agents = EST_SEARCH_SECONDS * search_factor + self._llm_seconds(agent_tokens, level)
+        return agents + detective + orchestrator
+
+    def estimate_remaining(self, stage: str) -> float:
+        """Estimated seconds for `stage` and everything after it at the current level."""
+        return self._estimate(stage, self.level)
+
+    def plan(self, stage: str) -> int:
+        """Picks the degradation level for `stage` and records any new steps."""
+        if self.seconds is None:
+            return self.level
+        remaining = self.remaining()
+        level = self.level
+        while level < len(DEGRADATION_STEPS) and self._estimate(stage, level) > remaining:
+            level += 1
+        self._escalate(level, f"{remaining:.1f}s left before {stage}")
+        return self.level
+
+    def _escalate(self, level: int, reason: str):
+        for step in DEGRADATION_STEPS[self.level:level]:
+            print(f"  [BUDGET] Degrading: {step} ({reason})")
+            self.applied.append(step)
+        self.level = max(self.level, level)
+
+    def force(self, step: str, reason: str):
+        """Jumps straight to `step`, e.g. when a phase overran its deadline."""
+        self._escalate(DEGRADATION_STEPS.index(step) + 1, reason)
+
+    def detective_deadline(self) -> float | None:
+        """Seconds the Detective may run and still leave the Orchestrator its estimated time."""
+        if self.seconds is None:
+            return None
+        return max(self.remaining() - self.estimate_remaining("orchestrator"), 0)
+
+    async def within_detective_deadline(self, awaitable):
+        """
+        Awaits the Detective, cancelling it and raising BudgetExceeded if it
+        runs past detective_deadline(). Timeouts raised by the awaitable
+        itself, e.g. a provider's, pass through unchanged.
+        """
+        seconds = self.detective_deadline()
+        if seconds is None:
+            return await awaitable
+        task = asyncio.ensure_future(awaitable)
+        try:
+            done, _ = await asyncio.wait({task}, timeout=seconds)
+        finally:
+            if not task.done():
+                task.cancel()
+        if not done:
+            raise BudgetExceeded(f"Detective ran past its share of the time budget ({self.seconds:g}s)")
+        return task.result()
+
+    # ── Knobs read by the agents ──
+
+    def search_results(self) -> int:
+        return REDUCED_SEARCH_RESULTS if self.level >= 2 else DEFAULT_SEARCH_RESULTS
+
+    def max_tokens(self, default: int, level: int | None = None) -> int:
+        level = self.level if level is None else level
+        return int(default * REDUCED_TOKENS_FACTOR) if level >= 3 else default
+
+    @property
+    def detective_search(self) -> bool:
+        return self.level < 1
+
+    @property
+    def run_detective(self) -> bool:
+        return self.level < 4
+
+    def to_dict(self) -> dict:
+        return {
+            "timeBudgetSeconds": self.seconds,
+            "elapsedSeconds": round(self.elapsed(), 2),
+            "degraded": self.degraded,
+            "degradations": list(self.applied)
+        }
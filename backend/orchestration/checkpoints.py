@@ -0,0 +1,91 @@
+import os
+import re
+import json
+import uuid
+from datetime import datetime
+
+# Each run's phase outputs are saved here so a failed run can resume
+# from the first phase that did not finish instead of starting over
+CHECKPOINTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "checkpoints")
+os.makedirs(CHECKPOINTS_DIR, exist_ok=True)
+
+PHASES = ("evidence", "bull", "bear", "detective", "orchestrator")
+RUN_KEY_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def new_run_key() -> str:
+    return uuid.uuid4().hex
+
+
+def is_valid_run_key(run_key: str) -> bool:
+    return bool(RUN_KEY_PATTERN.match(run_key or ""))
+
+
+def _checkpoint_path(run_key: str) -> str:
+    return os.path.join(CHECKPOINTS_DIR, f"{run_key}.json")
+
+
+def load_checkpoint(run_key: str) -> dict | None:
+    """Returns the saved checkpoint for run_key, or None if there is none."""
+    if not is_valid_run_key(run_key):
+        return None
+    path = _checkpoint_path(run_key)
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_phase(
+    run_key: str,
+    domain: str,
+    client_info: str,
+    phase: str,
+    output: dict,
+    company_name: str | None = None
+):
+    """Records one phase's output under the run key."""
+    checkpoint = load_checkpoint(run_key) or {
+        "runKey": run_key,
+        "domain": domain,
+        "companyName": company_name,
+        "clientInfo": client_info,
+        "phases": {}
+    }
+    checkpoint["phases"][phase] = output
+    _write_checkpoint(run_key, checkpoint)
+
+
+def save_documents(run_key: str, status: str, documents: dict | None = None):
+    """Records the state of a run's background document rendering."""
+    checkpoint = load_checkpoint(run_key)
+    if checkpoint is None:
+        return
+    checkpoint["documentsStatus"] = status
+    checkpoint["documents"] = documents
+    _write_checkpoint(run_key, checkpoint)
+
+
+def _write_checkpoint(run_key: str, checkpoint: dict):
+    checkpoint["updatedAt"] = datetime.now().isoformat()
+
+    # Write to a temp file first so a crash never leaves a half-written checkpoint
+    path = _checkpoint_path(run_key)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def restorable_phases(run_key: str, domain: str, client_info: str) -> dict:
+    """
+    Returns the phase outputs that can be reused for this run. A checkpoint
+    saved for a different domain or client profile is never reused.
+    """
+    checkpoint = load_checkpoint(run_key)
+    if not checkpoint:
+        return {}
+    if checkpoint.get("domain") != domain or checkpoint.get("clientInfo") != client_info:
+        print(f"  [CHECKPOINT] Run {run_key} was saved for different inputs — starting fresh")
+        return {}
+    return {phase: output for phase, output in checkpoint.get("phases", {}).items() if phase in PHASES}
@@ -0,0 +1,198 @@
+import os
+import json
+import asyncio
+import hashlib
+import tempfile
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+from orchestration.checkpoints import load_checkpoint
+from utils.document_generator import generate_dossier, generate_executive_summary_pdf
+from utils.tracing import span
+from utils import metrics
+
+load_dotenv()
+
+# DOCX and PDF rendering is pure-Python and CPU-bound, so documents are
+# rendered in worker processes instead of on the event loop.
+# RENDER_WORKERS=0 renders on a thread in this process instead.
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 1)))
+
+# Documents are rendered on first download and kept here. Once the cache
+# grows past DOCUMENT_CACHE_MAX_MB the least recently used files are removed.
+# Each render writes to its own temporary file in the cache, named with
+# RENDER_TMP_PREFIX, and is renamed into place when complete.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RENDER_TMP_PREFIX = ".render-"
+DOCUMENT_CACHE_DIR = os.path.join(BACKEND_DIR, "document_cache")
+DOCUMENT_CACHE_MAX_MB = float(os.getenv("DOCUMENT_CACHE_MAX_MB", "200"))
+os.makedirs(DOCUMENT_CACHE_DIR, exist_ok=True)
+
+# Render all four documents as soon as a run completes instead of on first download
+PRERENDER_DOCUMENTS = os.getenv("PRERENDER_DOCUMENTS", "false").lower() == "true"
+
+TRACKS = ("customer", "partner")
+# URL kind → (key in the documents result, file extension, download name suffix)
+DOCUMENT_KINDS = {
+    "dossier": ("dossier", "docx", "Dossier"),
+    "executive-summary": ("executiveSummary", "pdf", "ExecutiveSummary")
+}
+
+_pool: ProcessPoolExecutor | None = None
+
+# Renders in progress, so concurrent requests for one document share a render
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def get_render_pool() -> ProcessPoolExecutor | None:
+    """The shared render pool, started on first use. None when RENDER_WORKERS is 0."""
+    global _pool
+    if RENDER_WORKERS <= 0:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+    return _pool
+
+
+def shutdown_render_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def document_links(run_key: str) -> dict:
+    """Download URLs for a run's four documents, shaped like result.documents."""
+    return {
+        track: {
+            key: f"/api/runs/{run_key}/documents/{track}/{kind}"
+            for kind, (key, _, _) in DOCUMENT_KINDS.items()
+        }
+        for track in TRACKS
+    }
+
+
+def _outputs_version(phases: dict) -> str:
+    """Short hash of the phase outputs, so a resumed run never serves stale files."""
+    encoded = json.dumps(phases, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:12]
+
+
+def _evict_documents(keep: str):
+    """Deletes least recently used documents until the cache fits its size limit."""
+    entries = []
+    for name in os.listdir(DOCUMENT_CACHE_DIR):
+        path = os.path.join(DOCUMENT_CACHE_DIR, name)
+        if os.path.isfile(path) and path != keep and not name.startswith(RENDER_TMP_PREFIX):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries) + os.path.getsize(keep)
+    limit = DOCUMENT_CACHE_MAX_MB * 1024 * 1024
+
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            metrics.incr("documents.cache.evicted")
+        except FileNotFoundError:
+            pass
+
+
+async def _render_to_cache(render_fn, kind: str, track: str, cache_path: str, **kwargs) -> str:
+    """Renders one document in the pool to a temporary file and moves it into the cache."""
+    fd, render_path = tempfile.mkstemp(
+        prefix=RENDER_TMP_PREFIX, suffix=os.path.splitext(cache_path)[1], dir=DOCUMENT_CACHE_DIR
+    )
+    os.close(fd)
+    try:
+        with span(f"render.{kind}", "render", track=track):
+            pool = get_render_pool()
+            call = partial(render_fn, track=track, output_path=render_path, **kwargs)
+            if pool is None:
+                await asyncio.to_thread(call)
+            else:
+                await asyncio.get_running_loop().run_in_executor(pool, call)
+        os.replace(render_path, cache_path)
+    except BaseException:
+        try:
+            os.remove(render_path)
+        except FileNotFoundError:
+            pass
+        raise
+    metrics.incr("documents.rendered")
+    _evict_documents(keep=cache_path)
+    return cache_path
+
+
+async def get_document(run_key: str, track: str, kind: str) -> tuple[str, str] | None:
+    """
+    Returns (path, download filename) for one of a run's documents, rendering
+    it from the run's checkpoint on first request. Returns None when the run
+    has no verdict to render from. Render failures raise.
+    """
+    checkpoint = load_checkpoint(run_key)
+    if track not in TRACKS or kind not in DOCUMENT_KINDS or not checkpoint:
+        return None
+    phases = checkpoint.get("phases", {})
+    if "orchestrator" not in phases:
+        return None
+
+    _, extension, suffix = DOCUMENT_KINDS[kind]
+    company_name = checkpoint.get("companyName") or checkpoint.get("domain", "")
+    download_name = f"ALLYVEX_{company_name.replace(' ', '_')}_{track.upper()}_{suffix}.{extension}"
+    cache_key = f"{run_key}_{track}_{kind}_{_outputs_version(phases)}"
+    cache_path = os.path.join(DOCUMENT_CACHE_DIR, f"{cache_key}.{extension}")
+
+    if os.path.isfile(cache_path):
+        os.utime(cache_path)  # mark as recently used for eviction
+        metrics.incr("documents.cache.hit")
+        return cache_path, download_name
+
+    task = _inflight.get(cache_key)
+    if task is None:
+        metrics.incr("documents.cache.miss")
+        common = {
+            "company_name": company_name,
+            "domain": checkpoint.get("domain", ""),
+            "orchestrator_output": phases["orchestrator"]
+        }
+        if kind == "dossier":
+            render = _render_to_cache(
+                generate_dossier, "dossier", track, cache_path,
+                client_info=checkpoint.get("clientInfo", ""),
+                bull_output=phases.get("bull", {}),
+                bear_output=phases.get("bear", {}),
+                detective_output=phases.get("detective") or {},
+                **common
+            )
+        else:
+            render = _render_to_cache(
+                generate_executive_summary_pdf, "executive_summary", track, cache_path, **common
+            )
+        task = asyncio.create_task(render)
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+    else:
+        metrics.incr("documents.cache.shared")
+
+    # Shielded so one client disconnecting does not cancel a render others wait on
+    await asyncio.shield(task)
+    return cache_path, download_name
+
+
+async def prerender_documents(run_key: str) -> dict:
+    """
+    Renders all four documents of a run at once so the first downloads are
+    instant. A failed render is logged and left to be retried on download.
+    """
+    async def render(track: str, kind: str):
+        try:
+            print(f"  [WAR_ROOM] Rendering {track.upper()} {kind} for run {run_key}...")
+            await get_document(run_key, track, kind)
+        except Exception as e:
+            print(f"  [WAR_ROOM] {track.title()} {kind} generation failed: {e}")
+
+    await asyncio.gather(*(render(track, kind) for track in TRACKS for kind in DOCUMENT_KINDS))
+    return document_links(run_key)
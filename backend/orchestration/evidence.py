@@ -0,0 +1,316 @@
+import os
+import re
+import asyncio
+import hashlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+from agents.bull import BULL_QUERIES
+from agents.bear import BEAR_QUERIES
+from agents.detective import DETECTIVE_QUERY
+from utils.search_tools import search_results
+from utils.resilience import CircuitOpenError
+from utils.tokens import estimate_tokens
+from utils import metrics
+
+load_dotenv()
+
+# Bull and Bear see the same 200-character snippets web_search produced;
+# the Detective audits them against longer raw excerpts
+SNIPPET_CHARS = 200
+RAW_SNIPPET_CHARS = 500
+
+# Each agent's evidence is packed into a token budget, best-ranked items first
+EVIDENCE_TOKEN_BUDGET = int(os.getenv("EVIDENCE_TOKEN_BUDGET", "600"))
+DETECTIVE_EVIDENCE_TOKEN_BUDGET = int(os.getenv("DETECTIVE_EVIDENCE_TOKEN_BUDGET", "2000"))
+
+# Results whose word 3-shingles overlap this much (Jaccard) are treated as the
+# same story, e.g. one press release syndicated by several outlets
+NEAR_DUPLICATE_SIMILARITY = float(os.getenv("NEAR_DUPLICATE_SIMILARITY", "0.5"))
+SHINGLE_WORDS = 3
+
+# Items published within this many days rank above older ones of equal relevance
+RECENCY_DAYS = 365
+RECENCY_WEIGHT = 0.2
+
+
+def _url_key(url: str) -> str:
+    parts = urlsplit(url.strip().lower())
+    host = re.sub(r"^www\.", "", parts.netloc)
+    return f"{host}{parts.path.rstrip('/')}" + (f"?{parts.query}" if parts.query else "")
+
+
+def _content_key(content: str) -> str:
+    normalized = re.sub(r"\s+", " ", content.strip().lower())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def _shingles(content: str) -> set[tuple]:
+    words = re.findall(r"\w+", content.lower())
+    return {tuple(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def _similarity(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _published_at(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        published = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            published = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    return published if published.tzinfo else published.replace(tzinfo=timezone.utc)
+
+
+def _rank(item: dict) -> float:
+    """Tavily relevance score, plus a bonus that fades over RECENCY_DAYS."""
+    rank = item.get("score") or 0.0
+    published = _published_at(item.get("publishedDate"))
+    if published:
+        age_days = (datetime.now(timezone.utc) - published).days
+        rank += RECENCY_WEIGHT * max(0.0, 1 - age_days / RECENCY_DAYS)
+    return rank
+
+
+def _entry(number: int, item: dict, chars: int, seen_by: list[str] | None = None) -> str:
+    entry = f"\n[{number}] {item.get('title', '')}\n"
+    entry += f"    URL: {item.get('url', '')}\n"
+    if seen_by is not None:
+        entry += f"    Seen by: {', '.join(seen_by) or 'none'}\n"
+    entry += f"    {item.get('content', '')[:chars]}\n"
+    return entry
+
+
+def _pack(items: list[dict], budget: int, cost) -> set[int]:
+    """Ids of the best-ranked items whose combined cost fits the token budget."""
+    chosen = set()
+    for item in sorted(items, key=lambda item: (-_rank(item), item["id"])):
+        tokens = cost(item)
+        if tokens <= budget:
+            chosen.add(item["id"])
+            budget -= tokens
+    return chosen
+
+
+def evidence_searches(include_gap_search: bool = True) -> int:
+    """Searches gather_evidence makes: every Bull and Bear query, plus the Detective's gap search."""
+    return len(BULL_QUERIES) + len(BEAR_QUERIES) + (1 if include_gap_search else 0)
+
+
+async def _search(query: str, max_results: int, company_name: str) -> tuple[list[dict], Exception | None]:
+    try:
+        return await search_results(query, max_results, subject=company_name), None
+    except Exception as e:
+        return [], e
+
+
+async def gather_evidence(company_name: str, max_results: int = 2, include_gap_search: bool = True) -> dict:
+    """
+    Runs every agent's searches once, concurrently, and pools the results.
+    A result whose URL or content was already pooled, or that is a
+    near-duplicate of a pooled item, is merged into that item rather than
+    added again. The pool is plain JSON so it can be checkpointed with the
+    other phases.
+
+    A query refused by an open Tavily circuit is marked circuitOpen and
+    counted apart from other failures. If every query was refused, the
+    CircuitOpenError is raised: there is no evidence to reason over.
+    """
+    roles = {
+        "bull": [query.format(company=company_name) for query in BULL_QUERIES],
+        "bear": [query.format(company=company_name) for query in BEAR_QUERIES]
+    }
+    if include_gap_search:
+        roles["detective"] = [DETECTIVE_QUERY.format(company=company_name)]
+
+    queries = list(dict.fromkeys(query for role_queries in roles.values() for query in role_queries))
+    responses = await asyncio.gather(*(_search(query, max_results, company_name) for query in queries))
+
+    items = []
+    by_url = {}
+    by_content = {}
+    shingles = {}
+    pooled_queries = {}
+    total_results = 0
+    near_duplicates = 0
+    for query, (results, error) in zip(queries, responses):
+        item_ids = []
+        for r in results:
+            total_results += 1
+            url_key = _url_key(r.get("url", ""))
+            content_key = _content_key(r.get("content", ""))
+            item = (url_key and by_url.get(url_key)) or by_content.get(content_key)
+            if item is None:
+                result_shingles = _shingles(r.get("content", ""))
+                item = next((
+                    pooled for pooled in items
+                    if _similarity(result_shingles, shingles[pooled["id"]]) >= NEAR_DUPLICATE_SIMILARITY
+                ), None)
+                if item is not None:
+                    near_duplicates += 1
+            if item is None:
+                item = {
+                    "id": len(items) + 1,
+                    "title": r.get("title", ""),
+                    "url": r.get("url", ""),
+                    "content": r.get("content", ""),
+                    "score": r.get("score"),
+                    "publishedDate": r.get("published_date"),
+                    "queries": []
+                }
+                items.append(item)
+                shingles[item["id"]] = result_shingles
+                if url_key:
+                    by_url[url_key] = item
+                if r.get("content", "").strip():
+                    by_content[content_key] = item
+            elif (r.get("score") or 0) > (item.get("score") or 0):
+                item["score"] = r["score"]
+            if query not in item["queries"]:
+                item["queries"].append(query)
+            if item["id"] not in item_ids:
+                item_ids.append(item["id"])
+        pooled_queries[query] = {
+            "items": item_ids,
+            "error": None if error is None else str(error),
+            "circuitOpen": isinstance(error, CircuitOpenError)
+        }
+
+    if queries and all(q["circuitOpen"] for q in pooled_queries.values()):
+        raise responses[0][1]
+
+    pool = {
+        "roles": roles,
+        "queries": pooled_queries,
+        "items": items,
+        "stats": {
+            "queries": len(queries),
+            "searchResults": total_results,
+            "uniqueItems": len(items),
+            "duplicatesRemoved": total_results - len(items) - near_duplicates,
+            "nearDuplicatesRemoved": near_duplicates,
+            "failedQueries": sum(1 for q in pooled_queries.values() if q["error"]),
+            "circuitOpenQueries": sum(1 for q in pooled_queries.values() if q["circuitOpen"])
+        }
+    }
+    pool["stats"]["tokens"] = _token_stats(pool, queries, responses)
+    pool["stats"]["tokensSaved"] = sum(t["raw"] - t["packed"] for t in pool["stats"]["tokens"].values())
+    metrics.incr("evidence.tokens_saved", max(pool["stats"]["tokensSaved"], 0))
+    return pool
+
+
+def _token_stats(pool: dict, queries: list[str], responses: list) -> dict:
+    """
+    Prompt tokens of each agent's evidence: raw is every search result as
+    returned, in the multi_search layout; packed is what the agent is given.
+    """
+    raw_views = {}
+    for query, (results, error) in zip(queries, responses):
+        raw_views[query] = f"\n=== {query} ===\n" + (
+            f"Search failed: {error}" if error else
+            "".join(_entry(i, r, SNIPPET_CHARS) for i, r in enumerate(results, 1)) or "No results found."
+        )
+
+    stats = {
+        role: {
+            "raw": sum(estimate_tokens(raw_views[query]) for query in pool["roles"][role]),
+            "packed": estimate_tokens(role_view(pool, role))
+        }
+        for role in ("bull", "bear")
+    }
+    stats["detective"] = {
+        "raw": sum(
+            estimate_tokens(_entry(0, r, RAW_SNIPPET_CHARS, seen_by=[])) for results, _ in responses for r in results
+        ),
+        "packed": estimate_tokens(detective_view(pool))
+    }
+    return stats
+
+
+def role_view(pool: dict, role: str, token_budget: int = EVIDENCE_TOKEN_BUDGET) -> str:
+    """
+    One agent's searches from the pool, in the same layout multi_search
+    produces so the agent prompts read as before. The agent gets its
+    best-ranked items that fit token_budget. An item already listed under
+    an earlier query is not repeated. The ids of the items listed are
+    recorded under the pool's "packed" key, for detective_view.
+    """
+    queries = pool["roles"].get(role, [])
+    items = {item["id"]: item for item in pool["items"]}
+    role_ids = dict.fromkeys(
+        item_id for query in queries if not pool["queries"][query]["error"]
+        for item_id in pool["queries"][query]["items"]
+    )
+    headers = sum(estimate_tokens(f"\n=== {query} ===\n") for query in queries)
+    chosen = _pack(
+        [items[item_id] for item_id in role_ids], token_budget - headers,
+        lambda item: estimate_tokens(_entry(1, item, SNIPPET_CHARS))
+    )
+
+    shown = set()
+    view = ""
+    for query in queries:
+        entry = pool["queries"][query]
+        view += f"\n=== {query} ===\n"
+        if entry.get("circuitOpen"):
+            view += "Not searched — the search provider is unavailable."
+            continue
+        if entry["error"]:
+            view += f"Search failed: {entry['error']}"
+            continue
+        new_ids = [item_id for item_id in entry["items"] if item_id in chosen and item_id not in shown]
+        if not entry["items"]:
+            view += "No results found."
+            continue
+        if not new_ids:
+            if set(entry["items"]) <= shown:
+                view += "Same results as listed above."
+            else:
+                view += "Lower-ranked results left out."
+            continue
+
+        formatted = "".join(_entry(i, items[item_id], SNIPPET_CHARS) for i, item_id in enumerate(new_ids, 1))
+        view += formatted.strip()
+        shown.update(new_ids)
+    pool.setdefault("packed", {})[role] = sorted(shown)
+    return view.strip()
+
+
+def detective_view(pool: dict, token_budget: int = DETECTIVE_EVIDENCE_TOKEN_BUDGET) -> str:
+    """
+    The best-ranked pooled items that fit token_budget, in pool order, each
+    with a longer excerpt and which agents were shown it: Bull and Bear if
+    their role_view listed it, the Detective if its gap search found it.
+    """
+    if not pool["items"]:
+        return "No results found."
+    for role in ("bull", "bear"):
+        if role not in pool.get("packed", {}):
+            # A pool checkpointed before packed ids were recorded
+            role_view(pool, role)
+    packed = {role: set(ids) for role, ids in pool["packed"].items()}
+    gap_queries = set(pool["roles"].get("detective", []))
+
+    def seen_by(item: dict) -> list[str]:
+        roles = [role.upper() for role, ids in packed.items() if item["id"] in ids]
+        if gap_queries.intersection(item["queries"]):
+            roles.append("DETECTIVE")
+        return roles
+
+    chosen = _pack(
+        pool["items"], token_budget,
+        lambda item: estimate_tokens(_entry(item["id"], item, RAW_SNIPPET_CHARS, seen_by(item)))
+    )
+    view = "".join(
+        _entry(item["id"], item, RAW_SNIPPET_CHARS, seen_by(item))
+        for item in pool["items"] if item["id"] in chosen
+    )
+    return view.strip()
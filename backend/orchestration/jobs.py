@@ -0,0 +1,230 @@
+import os
+import re
+import json
+import uuid
+import asyncio
+from datetime import datetime
+from dotenv import load_dotenv
+from orchestration.war_room import run_war_room
+from orchestration.checkpoints import new_run_key
+from utils import metrics
+
+load_dotenv()
+
+# Every job's event log is appended here as JSON lines so an analysis
+# survives browser reloads and dropped connections
+JOBS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "jobs")
+os.makedirs(JOBS_DIR, exist_ok=True)
+
+# Seconds of silence after which a tailing client receives an SSE comment
+KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
+# How long a job started by /api/analyze keeps running after its last viewer
+# disconnects — long enough for a page reload to resume it
+ORPHANED_JOB_GRACE_SECONDS = float(os.getenv("ORPHANED_JOB_GRACE_SECONDS", "30"))
+
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+TERMINAL_PHASES = {"COMPLETE": "COMPLETE", "ERROR": "ERROR"}
+
+# Jobs still running in this process; finished jobs are read back from disk
+active_jobs: dict[str, "Job"] = {}
+
+
+class Job:
+    def __init__(
+        self,
+        job_id: str,
+        domain: str,
+        client_info: str,
+        run_key: str | None = None,
+        cancel_on_disconnect: bool = False,
+        time_budget: float | None = None,
+        fresh: bool = False,
+        status: str = "RUNNING",
+        created_at: str | None = None,
+        finished_at: str | None = None
+    ):
+        self.id = job_id
+        self.domain = domain
+        self.client_info = client_info
+        self.run_key = run_key or new_run_key()
+        self.time_budget = time_budget
+        self.fresh = fresh
+        self.status = status
+        self.created_at = created_at or datetime.now().isoformat()
+        self.finished_at = finished_at
+        self.events: list[dict] = []
+        self.task: asyncio.Task | None = None
+        self.updated = asyncio.Event()
+        self.cancel_on_disconnect = cancel_on_disconnect
+        self.subscribers = 0
+        self._orphan_timer: asyncio.TimerHandle | None = None
+
+    @property
+    def log_path(self) -> str:
+        return os.path.join(JOBS_DIR, f"{self.id}.jsonl")
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(JOBS_DIR, f"{self.id}.json")
+
+    @property
+    def finished(self) -> bool:
+        return self.status != "RUNNING"
+
+    def to_dict(self) -> dict:
+        return {
+            "jobId": self.id,
+            "domain": self.domain,
+            "runKey": self.run_key,
+            "timeBudget": self.time_budget,
+            "fresh": self.fresh,
+            "status": self.status,
+            "createdAt": self.created_at,
+            "finishedAt": self.finished_at,
+            "eventCount": len(self.events)
+        }
+
+    def save_meta(self):
+        meta = self.to_dict()
+        meta["clientInfo"] = self.client_info
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def _notify(self):
+        # Swap in a fresh Event first so tailers that wake up wait on the next change
+        updated, self.updated = self.updated, asyncio.Event()
+        updated.set()
+
+    def append(self, event: dict) -> int:
+        event_id = len(self.events) + 1
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"id": event_id, "event": event}) + "\n")
+        self.events.append(event)
+        self._notify()
+        return event_id
+
+    def finish(self, status: str):
+        self.status = status
+        self.finished_at = datetime.now().isoformat()
+        self.save_meta()
+        active_jobs.pop(self.id, None)
+        self._notify()
+
+    def cancel(self, reason: str):
+        if self.task and not self.task.done():
+            print(f"  [JOBS] Cancelling job {self.id}: {reason}")
+            self.task.cancel()
+
+    def _subscribe(self):
+        self.subscribers += 1
+        if self._orphan_timer:
+            self._orphan_timer.cancel()
+            self._orphan_timer = None
+
+    def _unsubscribe(self):
+        self.subscribers -= 1
+        if self.subscribers == 0 and self.cancel_on_disconnect and not self.finished:
+            self._orphan_timer = asyncio.get_running_loop().call_later(
+                ORPHANED_JOB_GRACE_SECONDS, self.cancel, "client disconnected"
+            )
+
+    async def tail(self, last_event_id: int = 0):
+        """
+        Yields (event_id, event) for every event after last_event_id, then keeps
+        yielding new events live until the job finishes. Yields None whenever
+        KEEPALIVE_SECONDS pass without a new event.
+        """
+        self._subscribe()
+        try:
+            next_id = last_event_id + 1
+            while True:
+                updated = self.updated
+                while next_id <= len(self.events):
+                    yield next_id, self.events[next_id - 1]
+                    next_id += 1
+                if self.finished:
+                    return
+                if updated is not self.updated:
+                    continue
+                try:
+                    await asyncio.wait_for(updated.wait(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self._unsubscribe()
+
+
+def _load_job(job_id: str) -> Job | None:
+    job = Job(job_id, "", "")
+    if not os.path.isfile(job.meta_path):
+        return None
+    with open(job.meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+
+    job.domain = meta.get("domain", "")
+    job.client_info = meta.get("clientInfo", "")
+    job.run_key = meta.get("runKey", job.run_key)
+    job.time_budget = meta.get("timeBudget")
+    job.fresh = meta.get("fresh", False)
+    job.created_at = meta.get("createdAt")
+    job.finished_at = meta.get("finishedAt")
+    # A job left RUNNING on disk belonged to a process that has since exited
+    job.status = meta.get("status", "INTERRUPTED")
+    if job.status == "RUNNING":
+        job.status = "INTERRUPTED"
+
+    if os.path.isfile(job.log_path):
+        with open(job.log_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    job.events.append(json.loads(line)["event"])
+    return job
+
+
+def get_job(job_id: str) -> Job | None:
+    if not JOB_ID_PATTERN.match(job_id):
+        return None
+    return active_jobs.get(job_id) or _load_job(job_id)
+
+
+async def _run_job(job: Job):
+    status = "INTERRUPTED"
+    try:
+        async for event in run_war_room(
+            job.domain, job.client_info, job.run_key, job.time_budget, job.fresh
+        ):
+            job.append(event)
+            status = TERMINAL_PHASES.get(event.get("phase"), status)
+    except asyncio.CancelledError:
+        job.append({"phase": "CANCELLED", "message": "Analysis cancelled — no client was listening."})
+        metrics.incr("jobs.cancelled")
+        status = "CANCELLED"
+    except Exception as e:
+        print(f"  [JOBS] Job {job.id} crashed: {e}")
+        job.append({"phase": "ERROR", "agent": "WAR_ROOM", "message": str(e)})
+        status = "ERROR"
+    finally:
+        job.finish(status)
+
+
+def start_job(
+    domain: str,
+    client_info: str,
+    run_key: str | None = None,
+    cancel_on_disconnect: bool = False,
+    time_budget: float | None = None,
+    fresh: bool = False
+) -> Job:
+    """
+    Starts a War Room run as a server-side job that outlives any one connection.
+    Passing the run_key of an earlier run resumes it from its checkpoint.
+    With cancel_on_disconnect, the job is cancelled once nobody has been
+    watching it for ORPHANED_JOB_GRACE_SECONDS.
+    """
+    job = Job(uuid.uuid4().hex, domain, client_info, run_key, cancel_on_disconnect, time_budget, fresh)
+    job.save_meta()
+    active_jobs[job.id] = job
+    job.task = asyncio.create_task(_run_job(job))
+    print(f"  [JOBS] Started job {job.id} for {domain}")
+    return job
@@ -0,0 +1,58 @@
+import os
+import re
+import json
+import hashlib
+from datetime import datetime
+
+# Generated client profiles are stored here so the frontend can send a
+# profile ID with each analysis instead of the whole profile text
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles")
+os.makedirs(PROFILES_DIR, exist_ok=True)
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def profile_id_for(client_info: str) -> str:
+    """
+    The ID is a hash of the profile text, so an identical profile always gets
+    the same ID and an edited one a new ID — each ID is one profile version.
+    """
+    return hashlib.sha256(client_info.strip().encode("utf-8")).hexdigest()[:32]
+
+
+def is_valid_profile_id(profile_id: str) -> bool:
+    return bool(PROFILE_ID_PATTERN.match(profile_id or ""))
+
+
+def _profile_path(profile_id: str) -> str:
+    return os.path.join(PROFILES_DIR, f"{profile_id}.json")
+
+
+def save_profile(client_info: str, url: str | None = None) -> str:
+    """Stores a client profile and returns its ID."""
+    client_info = client_info.strip()
+    profile_id = profile_id_for(client_info)
+    path = _profile_path(profile_id)
+    if not os.path.isfile(path):
+        # Write to a temp file first so a crash never leaves a half-written profile
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "profileId": profile_id,
+                "url": url,
+                "clientInfo": client_info,
+                "createdAt": datetime.now().isoformat()
+            }, f)
+        os.replace(tmp_path, path)
+    return profile_id
+
+
+def load_profile(profile_id: str) -> str | None:
+    """Returns the stored profile text, or None if there is no such profile."""
+    if not is_valid_profile_id(profile_id):
+        return None
+    path = _profile_path(profile_id)
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["clientInfo"]
@@ -1,9 +1,22 @@
 import re
+import asyncio
 from agents.bull import run_bull_agent
 from agents.bear import run_bear_agent
 from agents.detective import run_detective_agent
 from agents.orchestrator import run_orchestrator_agent
-from utils.document_generator import generate_dossier, generate_executive_summary_pdf
+from agents.tracks import TRACK_SHARDED_AGENTS
+from agents.models import (
+    BullOutput, BearOutput, DetectiveOutput, OrchestratorOutput, Signal, RedFlag, MissingContext,
+    TrackScores, TrackText, ScaleDisqualifiers, DealKiller, CompetitorRisk, DecidingFactors
+)
+from orchestration.checkpoints import new_run_key, restorable_phases, save_phase, save_documents
+from orchestration.budget import LatencyBudget, BudgetExceeded
+from orchestration.evidence import gather_evidence, evidence_searches, role_view, detective_view
+from orchestration.documents import PRERENDER_DOCUMENTS, document_links, prerender_documents
+from utils.tracing import Trace, current_trace, in_phase
+from utils.search_cache import bypass_search_cache
+from utils.llm_cache import bypass_llm_cache
+from utils import metrics
 
 # Fallback CLIENT_INFO — overridden at runtime by the caller passing client_info param
 CLIENT_INFO = ""
@@ -15,275 +28,274 @@ def extract_company_name(domain: str) -> str:
     name = name.replace('-', ' ').replace('_', ' ')
     return name.title()
 
-def build_bull_thinking(bull_output: dict) -> list:
+def _first_set(*values):
+    """The first value that is not None — unlike `or`, keeps 0 and empty strings."""
+    return next((value for value in values if value is not None), None)
+
+
+def _customer_signal_thought(signal: Signal) -> dict:
+    return {
+        "fact": f"[CUSTOMER] {signal.signal or ''}",
+        "reasoning": signal.clientConnection or "",
+        "strength": _first_set(signal.strength, "MEDIUM"),
+        "source": signal.source or ""
+    }
+
+
+def _partner_signal_thought(signal: Signal) -> dict:
+    return {
+        "fact": f"[PARTNER] {signal.signal or ''}",
+        "reasoning": signal.partnerConnection or "",
+        "strength": _first_set(signal.strength, "MEDIUM"),
+        "source": signal.source or ""
+    }
+
+
+def _customer_red_flag_thought(flag: RedFlag) -> dict:
+    return {
+        "fact": f"[CUSTOMER] {flag.flag or ''}",
+        "reasoning": _first_set(flag.clientImpact, flag.clientConnection, ""),
+        "severity": _first_set(flag.severity, "MEDIUM"),
+        "source": flag.source or ""
+    }
+
+
+def _partner_red_flag_thought(flag: RedFlag) -> dict:
+    return {
+        "fact": f"[PARTNER] {flag.flag or ''}",
+        "reasoning": flag.partnershipImpact or "",
+        "severity": _first_set(flag.severity, "MEDIUM"),
+        "source": flag.source or ""
+    }
+
+
+def _missing_context_thought(context: MissingContext) -> dict:
+    return {
+        "fact": f"[{_first_set(context.impactsTrack, context.impact, 'BOTH')}] Overlooked: {context.finding or ''}",
+        "reasoning": _first_set(context.clientRelevance, context.explanation, ""),
+        "impact": _first_set(context.impact, "NEUTRAL")
+    }
+
+
+def _score_thought(label: str, scores: TrackScores | None, key_argument: TrackText | None) -> dict:
+    reasoning = (key_argument.asCustomer if key_argument else None) or ""
+    if scores is not None and scores.customerScore is None and scores.partnerScore is None:
+        return {"fact": f"{label} Score: {scores.combinedScore}/100", "reasoning": reasoning}
+    scores = scores or TrackScores()
+    return {
+        "fact": (
+            f"Customer {'Score' if label == 'Bull' else 'Risk'}: {scores.customerScore}/100 — "
+            f"Partner {'Score' if label == 'Bull' else 'Risk'}: {scores.partnerScore}/100"
+        ),
+        "reasoning": reasoning
+    }
+
+
+def build_bull_thinking(bull: BullOutput) -> list:
     thoughts = []
 
-    scale = bull_output.get("companyScale", {})
-    if scale:
+    if bull.companyScale:
         thoughts.append({
-            "fact": f"Company Scale: {scale.get('scaleCategory', 'UNKNOWN')} — {scale.get('estimatedEmployees', '?')} employees",
-            "reasoning": scale.get("scaleReasoning", ""),
+            "fact": f"Company Scale: {_first_set(bull.companyScale.scaleCategory, 'UNKNOWN')} — {_first_set(bull.companyScale.estimatedEmployees, '?')} employees",
+            "reasoning": bull.companyScale.scaleReasoning or "",
             "impact": "NEUTRAL"
         })
 
-    for signal in bull_output.get("customerSignals", [])[:3]:
-        thoughts.append({
-            "fact": f"[CUSTOMER] {signal.get('signal', '')}",
-            "reasoning": signal.get("clientConnection", ""),
-            "strength": signal.get("strength", "MEDIUM"),
-            "source": signal.get("source", "")
-        })
+    for signal in bull.customerSignals[:3]:
+        thoughts.append(_customer_signal_thought(signal))
 
-    for signal in bull_output.get("partnerSignals", [])[:2]:
-        thoughts.append({
-            "fact": f"[PARTNER] {signal.get('signal', '')}",
-            "reasoning": signal.get("partnerConnection", ""),
-            "strength": signal.get("strength", "MEDIUM"),
-            "source": signal.get("source", "")
-        })
+    for signal in bull.partnerSignals[:2]:
+        thoughts.append(_partner_signal_thought(signal))
 
-    for debt in bull_output.get("technicalDebtSignals", [])[:1]:
+    for debt in bull.technicalDebtSignals[:1]:
         thoughts.append({
-            "fact": f"[CUSTOMER] Technical debt: {debt.get('observation', '')}",
-            "reasoning": debt.get("howClientHelps", ""),
+            "fact": f"[CUSTOMER] Technical debt: {debt.observation or ''}",
+            "reasoning": debt.howClientHelps or "",
             "strength": "HIGH"
         })
 
-    for fiscal in bull_output.get("fiscalPressureSignals", [])[:1]:
+    for fiscal in bull.fiscalPressureSignals[:1]:
         thoughts.append({
-            "fact": f"[CUSTOMER] Fiscal pressure: {fiscal.get('observation', '')}",
-            "reasoning": fiscal.get("howClientHelps", ""),
+            "fact": f"[CUSTOMER] Fiscal pressure: {fiscal.observation or ''}",
+            "reasoning": fiscal.howClientHelps or "",
             "strength": "MEDIUM"
         })
 
-    hiring = bull_output.get("hiringSignals", {})
-    if hiring.get("isHiringRapidly"):
-        roles = ", ".join(hiring.get("relevantRoles", [])[:3])
+    hiring = bull.hiringSignals
+    if hiring and hiring.isHiringRapidly:
         thoughts.append({
-            "fact": f"Actively hiring: {roles}",
-            "reasoning": hiring.get("hiringInsight", ""),
+            "fact": f"Actively hiring: {', '.join(role for role in hiring.relevantRoles[:3] if role)}",
+            "reasoning": hiring.hiringInsight or "",
             "strength": "MEDIUM"
         })
 
-    funding = bull_output.get("fundingStatus", {})
-    if funding.get("recentFunding"):
+    funding = bull.fundingStatus
+    if funding and funding.recentFunding:
         thoughts.append({
-            "fact": f"Funding: {funding.get('details', 'Recent funding detected')}",
-            "reasoning": funding.get("budgetImplication", ""),
+            "fact": f"Funding: {_first_set(funding.details, 'Recent funding detected')}",
+            "reasoning": funding.budgetImplication or "",
             "strength": "HIGH"
         })
 
-    scores = bull_output.get("overallBullScore", {})
-    if isinstance(scores, dict):
-        thoughts.append({
-            "fact": f"Customer Score: {scores.get('customerScore')}/100 — Partner Score: {scores.get('partnerScore')}/100",
-            "reasoning": (
-                bull_output.get("keyArgument", {}).get("asCustomer", "")
-                if isinstance(bull_output.get("keyArgument"), dict)
-                else str(bull_output.get("keyArgument", ""))
-            )
-        })
-    else:
-        thoughts.append({
-            "fact": f"Bull Score: {scores}/100",
-            "reasoning": str(bull_output.get("keyArgument", ""))
-        })
-
+    thoughts.append(_score_thought("Bull", bull.overallBullScore, bull.keyArgument))
     return thoughts
 
 
-def build_bear_thinking(bear_output: dict) -> list:
+def build_bear_thinking(bear: BearOutput) -> list:
     thoughts = []
 
-    scale = bear_output.get("scaleDisqualifiers", {})
-    if scale.get("customerScaleIssue"):
+    scale = bear.scaleDisqualifiers or ScaleDisqualifiers()
+    if scale.customerScaleIssue:
         thoughts.append({
-            "fact": f"[CUSTOMER] Scale disqualifier: {scale.get('customerScaleIssue')}",
+            "fact": f"[CUSTOMER] Scale disqualifier: {scale.customerScaleIssue}",
             "reasoning": "Wrong scale makes a customer relationship unviable",
             "severity": "HIGH"
         })
 
-    if scale.get("partnerScaleIssue"):
+    if scale.partnerScaleIssue:
         thoughts.append({
-            "fact": f"[PARTNER] Scale disqualifier: {scale.get('partnerScaleIssue')}",
+            "fact": f"[PARTNER] Scale disqualifier: {scale.partnerScaleIssue}",
             "reasoning": "Wrong scale makes a partnership commercially unviable",
             "severity": "HIGH"
         })
 
-    deal_killer = bear_output.get("dealKiller", {})
-    if isinstance(deal_killer, dict):
-        if deal_killer.get("customerDealKiller"):
-            thoughts.append({
-                "fact": "[CUSTOMER] DEAL KILLER",
-                "reasoning": deal_killer.get("customerDealKiller"),
-                "severity": "HIGH"
-            })
-        if deal_killer.get("partnerDealKiller"):
-            thoughts.append({
-                "fact": "[PARTNER] DEAL KILLER",
-                "reasoning": deal_killer.get("partnerDealKiller"),
-                "severity": "HIGH"
-            })
-    elif deal_killer and deal_killer != "null":
+    deal_killer = bear.dealKiller or DealKiller()
+    if deal_killer.customerDealKiller:
+        thoughts.append({
+            "fact": "[CUSTOMER] DEAL KILLER",
+            "reasoning": deal_killer.customerDealKiller,
+            "severity": "HIGH"
+        })
+    if deal_killer.partnerDealKiller:
         thoughts.append({
-            "fact": "DEAL KILLER FOUND",
-            "reasoning": str(deal_killer),
+            "fact": "[PARTNER] DEAL KILLER",
+            "reasoning": deal_killer.partnerDealKiller,
             "severity": "HIGH"
         })
 
-    competitor = bear_output.get("competitorRisk", {})
-    customer_competitor = competitor.get("asCustomer", competitor)
-    if customer_competitor.get("hasCompetitorContract"):
+    competitor = bear.competitorRisk or CompetitorRisk()
+    customer_competitor = competitor.asCustomer
+    if customer_competitor and customer_competitor.hasCompetitorContract:
         thoughts.append({
-            "fact": f"[CUSTOMER] Competitor already in: {customer_competitor.get('competitorName', 'Unknown')}",
-            "reasoning": customer_competitor.get("details", ""),
-            "severity": customer_competitor.get("threatLevel", "HIGH")
+            "fact": f"[CUSTOMER] Competitor already in: {_first_set(customer_competitor.competitorName, 'Unknown')}",
+            "reasoning": customer_competitor.details or "",
+            "severity": _first_set(customer_competitor.threatLevel, "HIGH")
         })
 
-    partner_competitor = competitor.get("asPartner", {})
-    if partner_competitor.get("competesWithClient"):
+    partner_competitor = competitor.asPartner
+    if partner_competitor and partner_competitor.competesWithClient:
         thoughts.append({
             "fact": "[PARTNER] Direct competitor conflict",
-            "reasoning": partner_competitor.get("details", ""),
-            "severity": partner_competitor.get("threatLevel", "HIGH")
+            "reasoning": partner_competitor.details or "",
+            "severity": _first_set(partner_competitor.threatLevel, "HIGH")
         })
 
-    financial = bear_output.get("financialHealth", {})
-    if financial.get("concerning"):
+    financial = bear.financialHealth
+    if financial and financial.concerning:
         thoughts.append({
-            "fact": f"Financial concern: {financial.get('details', '')}",
+            "fact": f"Financial concern: {financial.details or ''}",
             "reasoning": "Financial instability impacts both customer spend and partnership viability",
             "severity": "HIGH"
         })
 
-    leadership = bear_output.get("leadershipStability", {})
-    if not leadership.get("stable"):
+    leadership = bear.leadershipStability
+    if not (leadership and leadership.stable):
         thoughts.append({
-            "fact": f"Leadership instability: {leadership.get('details', '')}",
+            "fact": f"Leadership instability: {(leadership and leadership.details) or ''}",
             "reasoning": "Leadership changes pause both vendor decisions and partnership conversations",
             "severity": "MEDIUM"
         })
 
-    for flag in bear_output.get("customerRedFlags", bear_output.get("clientRelevantRedFlags", []))[:3]:
-        thoughts.append({
-            "fact": f"[CUSTOMER] {flag.get('flag', '')}",
-            "reasoning": flag.get("clientImpact", flag.get("clientConnection", "")),
-            "severity": flag.get("severity", "MEDIUM"),
-            "source": flag.get("source", "")
-        })
+    for flag in bear.customerRedFlags[:3]:
+        thoughts.append(_customer_red_flag_thought(flag))
 
-    for flag in bear_output.get("partnerRedFlags", [])[:2]:
-        thoughts.append({
-            "fact": f"[PARTNER] {flag.get('flag', '')}",
-            "reasoning": flag.get("partnershipImpact", ""),
-            "severity": flag.get("severity", "MEDIUM"),
-            "source": flag.get("source", "")
-        })
-
-    scores = bear_output.get("overallBearScore", {})
-    if isinstance(scores, dict):
-        thoughts.append({
-            "fact": f"Customer Risk: {scores.get('customerScore')}/100 — Partner Risk: {scores.get('partnerScore')}/100",
-            "reasoning": (
-                bear_output.get("keyArgument", {}).get("asCustomer", "")
-                if isinstance(bear_output.get("keyArgument"), dict)
-                else str(bear_output.get("keyArgument", ""))
-            )
-        })
-    else:
-        thoughts.append({
-            "fact": f"Bear Score: {scores}/100",
-            "reasoning": str(bear_output.get("keyArgument", ""))
-        })
+    for flag in bear.partnerRedFlags[:2]:
+        thoughts.append(_partner_red_flag_thought(flag))
 
+    thoughts.append(_score_thought("Bear", bear.overallBearScore, bear.keyArgument))
     return thoughts
 
 
-def build_detective_thinking(detective_output: dict) -> list:
+def build_detective_thinking(detective: DetectiveOutput) -> list:
     thoughts = []
 
-    scale = detective_output.get("scaleVerification", {})
+    scale = detective.scaleVerification
     if scale:
         thoughts.append({
-            "fact": f"Confirmed Scale: {scale.get('confirmedScale', 'UNCONFIRMED')}",
+            "fact": f"Confirmed Scale: {_first_set(scale.confirmedScale, 'UNCONFIRMED')}",
             "reasoning": (
-                f"Customer impact: {scale.get('scaleImpactsCustomerTrack', '')} | "
-                f"Partner impact: {scale.get('scaleImpactsPartnerTrack', '')}"
+                f"Customer impact: {scale.scaleImpactsCustomerTrack or ''} | "
+                f"Partner impact: {scale.scaleImpactsPartnerTrack or ''}"
             ),
             "impact": "NEUTRAL"
         })
     else:
-        bull_score = detective_output.get("bullAudit", {}).get("evidenceScore", "N/A")
-        bear_score = detective_output.get("bearAudit", {}).get("evidenceScore", "N/A")
+        bull_score = detective.bullAudit.evidenceScore if detective.bullAudit else None
+        bear_score = detective.bearAudit.evidenceScore if detective.bearAudit else None
         thoughts.append({
-            "fact": f"Bull evidence quality: {bull_score}/100 — Bear evidence quality: {bear_score}/100",
+            "fact": f"Bull evidence quality: {_first_set(bull_score, 'N/A')}/100 — Bear evidence quality: {_first_set(bear_score, 'N/A')}/100",
             "reasoning": "Higher score means claims are better supported by real sources"
         })
 
-    customer_audit = detective_output.get("customerTrackAudit", detective_output.get("bullAudit", {}))
+    customer_audit = detective.customerTrackAudit or detective.bullAudit
     if customer_audit:
         thoughts.append({
             "fact": (
-                f"[CUSTOMER] Technical fit: {customer_audit.get('technicalFit', 'N/A')} — "
-                f"Budget fit: {customer_audit.get('budgetFit', 'N/A')} — "
-                f"Timing fit: {customer_audit.get('timingFit', 'N/A')}"
+                f"[CUSTOMER] Technical fit: {_first_set(customer_audit.technicalFit, 'N/A')} — "
+                f"Budget fit: {_first_set(customer_audit.budgetFit, 'N/A')} — "
+                f"Timing fit: {_first_set(customer_audit.timingFit, 'N/A')}"
             ),
-            "reasoning": customer_audit.get("timingFitReason", customer_audit.get("fiscalPressureAssessment", ""))
+            "reasoning": _first_set(customer_audit.timingFitReason, customer_audit.fiscalPressureAssessment, "")
         })
 
-    partner_audit = detective_output.get("partnerTrackAudit", {})
+    partner_audit = detective.partnerTrackAudit
     if partner_audit:
         thoughts.append({
             "fact": (
-                f"[PARTNER] Customer overlap: {partner_audit.get('customerBaseOverlap', 'N/A')} — "
-                f"Distribution value: {partner_audit.get('distributionValue', 'N/A')}"
+                f"[PARTNER] Customer overlap: {_first_set(partner_audit.customerBaseOverlap, 'N/A')} — "
+                f"Distribution value: {_first_set(partner_audit.distributionValue, 'N/A')}"
             ),
-            "reasoning": partner_audit.get("commercialViabilityReason", "")
+            "reasoning": partner_audit.commercialViabilityReason or ""
         })
 
-    split = detective_output.get("splitVerdictAssessment", {})
+    split = detective.splitVerdictAssessment
     if split:
         thoughts.append({
-            "fact": f"Split Verdict: Customer {split.get('customerTrackStrength')} — Partner {split.get('partnerTrackStrength')}",
-            "reasoning": split.get("splitReasoning", ""),
+            "fact": f"Split Verdict: Customer {split.customerTrackStrength} — Partner {split.partnerTrackStrength}",
+            "reasoning": split.splitReasoning or "",
             "impact": "CRITICAL"
         })
         thoughts.append({
-            "fact": f"Recommended approach: {split.get('recommendedApproach')}",
-            "reasoning": split.get("sequencingAdvice", "")
+            "fact": f"Recommended approach: {split.recommendedApproach}",
+            "reasoning": split.sequencingAdvice or ""
         })
 
-    for weak in detective_output.get("bullAudit", {}).get("weakClaims", [])[:2]:
+    for weak in (detective.bullAudit.weakClaims if detective.bullAudit else [])[:2]:
         thoughts.append({
-            "fact": f"Bull claim challenged: {weak.get('claim', '')}",
-            "reasoning": weak.get("weakness", ""),
+            "fact": f"Bull claim challenged: {weak.claim or ''}",
+            "reasoning": weak.weakness or "",
             "impact": "STRENGTHENS_BEAR"
         })
 
-    for weak in detective_output.get("bearAudit", {}).get("weakClaims", [])[:2]:
+    for weak in (detective.bearAudit.weakClaims if detective.bearAudit else [])[:2]:
         thoughts.append({
-            "fact": f"Bear claim challenged: {weak.get('claim', '')}",
-            "reasoning": weak.get("weakness", ""),
+            "fact": f"Bear claim challenged: {weak.claim or ''}",
+            "reasoning": weak.weakness or "",
             "impact": "STRENGTHENS_BULL"
         })
 
-    for context in detective_output.get("missingContext", [])[:2]:
-        thoughts.append({
-            "fact": f"[{context.get('impactsTrack', context.get('impact', 'BOTH'))}] Overlooked: {context.get('finding', '')}",
-            "reasoning": context.get("clientRelevance", context.get("explanation", "")),
-            "impact": context.get("impact", "NEUTRAL")
-        })
+    for context in detective.missingContext[:2]:
+        thoughts.append(_missing_context_thought(context))
 
-    critical = detective_output.get("criticalOverlookedFact")
-    if critical:
+    if detective.criticalOverlookedFact:
         thoughts.append({
             "fact": "Most important overlooked fact",
-            "reasoning": critical,
+            "reasoning": detective.criticalOverlookedFact,
             "impact": "CRITICAL"
         })
 
     thoughts.append({
-        "fact": f"Debate confidence: {detective_output.get('overallConfidenceInDebate')}/100",
+        "fact": f"Debate confidence: {detective.overallConfidenceInDebate}/100",
         "reasoning": "How well the combined evidence supports reliable verdicts on both tracks"
     })
 
@@ -291,264 +303,550 @@ def build_detective_thinking(detective_output: dict) -> list:
 
 
 def build_orchestrator_thinking(
-    orchestrator_output: dict,
-    bull_output: dict,
-    bear_output: dict
+    orchestrator: OrchestratorOutput,
+    bull: BullOutput,
+    bear: BearOutput
 ) -> list:
     thoughts = []
 
     thoughts.append({
-        "fact": f"Confirmed Scale: {orchestrator_output.get('confirmedScale', 'UNKNOWN')}",
-        "reasoning": orchestrator_output.get("executiveSummary", "")
+        "fact": f"Confirmed Scale: {_first_set(orchestrator.confirmedScale, 'UNKNOWN')}",
+        "reasoning": orchestrator.executiveSummary or ""
     })
 
-    customer = orchestrator_output.get("customerTrack", {})
+    customer = orchestrator.customerTrack
     if customer:
-        customer_factors = customer.get("decidingFactors", {})
+        customer_factors = customer.decidingFactors or DecidingFactors()
         thoughts.append({
-            "fact": f"[CUSTOMER VERDICT] {customer.get('verdict')} — Confidence {customer.get('confidence')}/100",
-            "reasoning": customer_factors.get("keySwingFactor", "")
+            "fact": f"[CUSTOMER VERDICT] {customer.verdict} — Confidence {customer.confidence}/100",
+            "reasoning": customer_factors.keySwingFactor or ""
         })
         thoughts.append({
-            "fact": f"[CUSTOMER] Strongest FOR: {customer_factors.get('strongestBullSignal', '')}",
-            "reasoning": f"Scale verdict: {customer_factors.get('scaleVerdict', '')}"
+            "fact": f"[CUSTOMER] Strongest FOR: {customer_factors.strongestBullSignal or ''}",
+            "reasoning": f"Scale verdict: {customer_factors.scaleVerdict or ''}"
         })
         thoughts.append({
-            "fact": f"[CUSTOMER] Strongest AGAINST: {customer_factors.get('strongestBearSignal', '')}",
-            "reasoning": customer_factors.get("detectiveImpact", "")
+            "fact": f"[CUSTOMER] Strongest AGAINST: {customer_factors.strongestBearSignal or ''}",
+            "reasoning": customer_factors.detectiveImpact or ""
         })
-        customer_regret = customer.get("regretScore", {})
-        if isinstance(customer_regret, dict):
+        if customer.regretScore:
             thoughts.append({
-                "fact": f"[CUSTOMER] Regret Score: {customer_regret.get('score')}/100",
-                "reasoning": customer_regret.get("reason", "")
+                "fact": f"[CUSTOMER] Regret Score: {customer.regretScore.score}/100",
+                "reasoning": customer.regretScore.reason or ""
             })
     else:
-        factors = orchestrator_output.get("decidingFactors", {})
-        bull_score = bull_output.get("overallBullScore", {})
-        bear_score = bear_output.get("overallBearScore", {})
+        factors = orchestrator.decidingFactors or DecidingFactors()
+        bull_score = bull.overallBullScore or TrackScores()
+        bear_score = bear.overallBearScore or TrackScores()
         thoughts.append({
-            "fact": f"Strongest signal FOR: {factors.get('strongestBullSignal', '')}",
-            "reasoning": f"Bull scored {bull_score.get('combinedScore') if isinstance(bull_score, dict) else bull_score}/100"
+            "fact": f"Strongest signal FOR: {factors.strongestBullSignal or ''}",
+            "reasoning": f"Bull scored {bull_score.combinedScore}/100"
         })
         thoughts.append({
-            "fact": f"Strongest signal AGAINST: {factors.get('strongestBearSignal', '')}",
-            "reasoning": f"Bear scored {bear_score.get('combinedScore') if isinstance(bear_score, dict) else bear_score}/100"
+            "fact": f"Strongest signal AGAINST: {factors.strongestBearSignal or ''}",
+            "reasoning": f"Bear scored {bear_score.combinedScore}/100"
         })
-        regret = orchestrator_output.get("regretScore", {})
-        if isinstance(regret, dict):
+        if orchestrator.regretScore:
             thoughts.append({
-                "fact": f"Regret Score: {regret.get('score')}/100",
-                "reasoning": regret.get("reason", "")
+                "fact": f"Regret Score: {orchestrator.regretScore.score}/100",
+                "reasoning": orchestrator.regretScore.reason or ""
             })
 
-    partner = orchestrator_output.get("partnerTrack", {})
+    partner = orchestrator.partnerTrack
     if partner:
-        partner_factors = partner.get("decidingFactors", {})
+        partner_factors = partner.decidingFactors or DecidingFactors()
         thoughts.append({
-            "fact": f"[PARTNER VERDICT] {partner.get('verdict')} — Confidence {partner.get('confidence')}/100",
-            "reasoning": partner_factors.get("keySwingFactor", "")
+            "fact": f"[PARTNER VERDICT] {partner.verdict} — Confidence {partner.confidence}/100",
+            "reasoning": partner_factors.keySwingFactor or ""
         })
         thoughts.append({
-            "fact": f"[PARTNER] Distribution value: {partner_factors.get('distributionValueVerdict', '')}",
-            "reasoning": f"Strongest partner signal: {partner_factors.get('strongestBullSignal', '')}"
+            "fact": f"[PARTNER] Distribution value: {partner_factors.distributionValueVerdict or ''}",
+            "reasoning": f"Strongest partner signal: {partner_factors.strongestBullSignal or ''}"
         })
-        partner_regret = partner.get("regretScore", {})
-        if isinstance(partner_regret, dict):
+        if partner.regretScore:
             thoughts.append({
-                "fact": f"[PARTNER] Regret Score: {partner_regret.get('score')}/100",
-                "reasoning": partner_regret.get("reason", "")
+                "fact": f"[PARTNER] Regret Score: {partner.regretScore.score}/100",
+                "reasoning": partner.regretScore.reason or ""
             })
 
-    recommended = orchestrator_output.get("recommendedApproach")
-    if recommended:
+    if orchestrator.recommendedApproach:
         thoughts.append({
-            "fact": f"RECOMMENDED APPROACH: {recommended}",
-            "reasoning": orchestrator_output.get("recommendedApproachReason", ""),
+            "fact": f"RECOMMENDED APPROACH: {orchestrator.recommendedApproach}",
+            "reasoning": orchestrator.recommendedApproachReason or "",
             "impact": "CRITICAL"
         })
     else:
         thoughts.append({
-            "fact": f"VERDICT: {orchestrator_output.get('verdict')} — Confidence {orchestrator_output.get('confidence')}/100",
-            "reasoning": orchestrator_output.get("executiveSummary", "")
+            "fact": f"VERDICT: {orchestrator.verdict} — Confidence {orchestrator.confidence}/100",
+            "reasoning": orchestrator.executiveSummary or ""
         })
 
     return thoughts
 
 
-async def run_war_room(domain: str, client_info: str = CLIENT_INFO):
+# Array elements that get a thought of their own while an agent's reply is
+# still streaming: the element's model, its thought, and how many of them
+# the full thinking shows
+PARTIAL_THOUGHTS = {
+    "BULL": {
+        "customerSignals": (Signal, _customer_signal_thought, 3),
+        "partnerSignals": (Signal, _partner_signal_thought, 2)
+    },
+    "BEAR": {
+        "customerRedFlags": (RedFlag, _customer_red_flag_thought, 3),
+        "partnerRedFlags": (RedFlag, _partner_red_flag_thought, 2)
+    },
+    "DETECTIVE": {
+        "missingContext": (MissingContext, _missing_context_thought, 2)
+    }
+}
+
+
+def partial_event(agent: str, key: str, index: int, element: dict) -> dict | None:
+    """
+    A thought for one streamed array element, or None if the full thinking
+    would not show it. The *_DONE event that follows replaces these thoughts.
+    """
+    model, build_thought, shown = PARTIAL_THOUGHTS[agent].get(key, (None, None, 0))
+    if index >= shown:
+        return None
+    thought = build_thought(model.of(element))
+    return {
+        "phase": f"{agent}_PARTIAL",
+        "message": thought["fact"],
+        "key": key,
+        "index": index,
+        "thinking": [thought]
+    }
+
+
+async def _with_partials(tasks: set, partials: asyncio.Queue):
+    """
+    Yields ("partial", event) for each event put on partials while tasks
+    run, and ("done", task) as each task finishes. Partial events queued
+    before a task finished are yielded before it.
+    """
+    pending = set(tasks)
+    while pending:
+        getter = asyncio.ensure_future(partials.get())
+        try:
+            done, pending = await asyncio.wait(pending | {getter}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not getter.done():
+                getter.cancel()
+        pending.discard(getter)
+        if getter in done:
+            done.discard(getter)
+            yield "partial", getter.result()
+        if done:
+            while not partials.empty():
+                yield "partial", partials.get_nowait()
+            for task in done:
+                yield "done", task
+
+
+def bull_done_event(bull_output: BullOutput, restored: bool = False, timing: dict | None = None) -> dict:
+    return {
+        "phase": "BULL_DONE",
+        "message": f"Bull found {len(bull_output.customerSignals)} buying signals" + (" (restored)" if restored else ""),
+        "data": bull_output.dump(),
+        "thinking": build_bull_thinking(bull_output),
+        "restored": restored,
+        "timing": timing
+    }
+
+
+def bear_done_event(bear_output: BearOutput, restored: bool = False, timing: dict | None = None) -> dict:
+    return {
+        "phase": "BEAR_DONE",
+        "message": f"Bear found {len(bear_output.customerRedFlags)} red flags" + (" (restored)" if restored else ""),
+        "data": bear_output.dump(),
+        "thinking": build_bear_thinking(bear_output),
+        "restored": restored,
+        "timing": timing
+    }
+
+
+def detective_done_event(detective_output: DetectiveOutput, restored: bool = False, timing: dict | None = None) -> dict:
+    return {
+        "phase": "DETECTIVE_DONE",
+        "message": (
+            f"Detective found {len(detective_output.missingContext)} overlooked facts"
+            + (" (restored)" if restored else "")
+        ),
+        "data": detective_output.dump(),
+        "thinking": build_detective_thinking(detective_output),
+        "restored": restored,
+        "timing": timing
+    }
+
+
+def orchestrator_done_event(
+    orchestrator_output: OrchestratorOutput,
+    bull_output: BullOutput,
+    bear_output: BearOutput,
+    restored: bool = False,
+    timing: dict | None = None
+) -> dict:
+    approach = orchestrator_output.recommendedApproach or orchestrator_output.verdict or "COMPLETE"
+    return {
+        "phase": "ORCHESTRATOR_DONE",
+        "message": f"Approach: {approach}" + (" (restored)" if restored else ""),
+        "data": orchestrator_output.dump(),
+        "thinking": build_orchestrator_thinking(
+            orchestrator_output, bull_output, bear_output
+        ),
+        "restored": restored,
+        "timing": timing
+    }
+
+
+# The typed output each restorable agent phase is read back into
+RESTORED_OUTPUTS = {
+    "bull": BullOutput,
+    "bear": BearOutput,
+    "detective": DetectiveOutput,
+    "orchestrator": OrchestratorOutput
+}
+
+
+# Provider calls each phase plans — used to count those a cancelled run did not make.
+# Every search is made in the evidence phase; the agents are handed the pool.
+# These are planned calls, not avoided spend: the search and LLM caches, the
+# evidence index and single-flight may have answered some of them for free.
+PHASE_COSTS = {
+    "EVIDENCE_DONE": {"searches": evidence_searches()},
+    "BULL_DONE": {"llm_calls": 2 if TRACK_SHARDED_AGENTS else 1},
+    "BEAR_DONE": {"llm_calls": 2 if TRACK_SHARDED_AGENTS else 1},
+    "DETECTIVE_DONE": {"llm_calls": 1},
+    "ORCHESTRATOR_DONE": {"llm_calls": 1}
+}
+if PRERENDER_DOCUMENTS:
+    PHASE_COSTS["DOCUMENTS_READY"] = {"renders": 4}
+
+
+def record_cancellation(seen_phases: set, last_phase: str | None, planned_searches: int | None = None):
+    """
+    Counts the cancellation and the planned provider calls of the phases
+    that did not finish. planned_searches is what EVIDENCE_START announced; a run that got
+    past its start without gathering evidence (restored from a checkpoint)
+    makes no searches.
+    """
+    metrics.incr("runs.cancelled")
+    metrics.incr(f"runs.cancelled.after.{last_phase or 'START'}")
+    if planned_searches is None and last_phase is not None:
+        planned_searches = 0
+    for phase, costs in PHASE_COSTS.items():
+        if phase not in seen_phases:
+            if phase == "EVIDENCE_DONE" and planned_searches is not None:
+                costs = {**costs, "searches": planned_searches}
+            for name, amount in costs.items():
+                metrics.incr(f"cancel.planned_not_made.{name}", amount)
+
+
+async def run_war_room(
+    domain: str,
+    client_info: str = CLIENT_INFO,
+    run_key: str | None = None,
+    time_budget: float | None = None,
+    fresh: bool = False
+):
+    """
+    Runs the full pipeline and yields SSE events. Every phase output is
+    checkpointed under run_key; passing the run_key of an earlier failed
+    run resumes it from the first phase that did not finish.
+
+    With fresh=True every search goes to Tavily and every agent to its model
+    instead of the search and LLM caches.
+
+    With a time_budget in seconds, the run degrades in defined steps as the
+    deadline approaches (see orchestration/budget.py) and COMPLETE flags it.
+
+    COMPLETE is yielded as soon as the verdict exists and links the DOCX and
+    PDF files, which render on first download. With PRERENDER_DOCUMENTS they
+    render right after COMPLETE instead, followed by DOCUMENTS_READY.
+
+    Cancelling the consuming task stops the in-flight agent calls, searches
+    and remaining document renders, and is counted in the metrics.
+    """
+    metrics.incr("runs.started")
+    seen_phases = set()
+    last_phase = None
+    planned_searches = None
+    try:
+        async for event in _war_room_events(domain, client_info, run_key, time_budget, fresh):
+            last_phase = event.get("phase")
+            seen_phases.add(last_phase)
+            if last_phase == "EVIDENCE_START":
+                planned_searches = event["searches"]
+            yield event
+    except (asyncio.CancelledError, GeneratorExit):
+        # A consumer that stops reading once the verdict is out is not a cancellation
+        if "COMPLETE" not in seen_phases and last_phase != "ERROR":
+            print(f"  [WAR_ROOM] Run for {domain} cancelled after {last_phase}")
+            record_cancellation(seen_phases, last_phase, planned_searches)
+        raise
+
+    if "COMPLETE" in seen_phases:
+        metrics.incr("runs.completed")
+    elif last_phase == "ERROR":
+        metrics.incr("runs.failed")
+
+
+async def _war_room_events(
+    domain: str,
+    client_info: str,
+    run_key: str | None,
+    time_budget: float | None,
+    fresh: bool
+):
     company_name = extract_company_name(domain)
+    run_key = run_key or new_run_key()
+    restored = restorable_phases(run_key, domain, client_info)
+    trace = Trace(run_key)
+    current_trace.set(trace)
+    budget = LatencyBudget(time_budget)
+    bypass_search_cache.set(fresh)
+    bypass_llm_cache.set(fresh)
     print(f"\n{'='*50}")
-    print(f"ALLYVEX INITIATED: {company_name} ({domain})")
+    print(f"ALLYVEX INITIATED: {company_name} ({domain}) — run {run_key}")
     print(f"{'='*50}\n")
 
-    # Phase 1: Bull
-    yield {
-        "phase": "BULL_START",
-        "message": f"Bull Agent building the case FOR {company_name}...",
-        "companyName": company_name
+    def checkpoint(phase: str, output: dict):
+        save_phase(run_key, domain, client_info, phase, output, company_name)
+
+    if restored:
+        print(f"  [CHECKPOINT] Restoring phases: {', '.join(restored)}")
+        yield {
+            "phase": "CHECKPOINT_RESTORED",
+            "message": f"Resuming run — restored {', '.join(restored)} from checkpoint",
+            "runKey": run_key,
+            "restoredPhases": list(restored)
+        }
+
+    # Checkpoints hold plain dicts; restored outputs are typed once here
+    restored_outputs = {
+        phase: model.of(restored[phase])
+        for phase, model in RESTORED_OUTPUTS.items() if restored.get(phase) is not None
     }
-    try:
-        bull_output = run_bull_agent(domain, company_name, client_info)
+    bull_output = restored_outputs.get("bull")
+    bear_output = restored_outputs.get("bear")
+    budget.plan("agents")
+
+    # Phase 0: one round of searches for every agent, pooled and de-duplicated
+    evidence = restored.get("evidence")
+    needs_evidence = bull_output is None or bear_output is None or (
+        "detective" not in restored and "orchestrator" not in restored
+    )
+    if evidence is None and needs_evidence:
         yield {
-            "phase": "BULL_DONE",
-            "message": f"Bull found {len(bull_output.get('customerSignals', bull_output.get('clientRelevantSignals', [])))} buying signals",
-            "data": bull_output,
-            "thinking": build_bull_thinking(bull_output)
+            "phase": "EVIDENCE_START",
+            "message": f"Gathering evidence on {company_name}...",
+            "companyName": company_name,
+            "searches": evidence_searches(budget.detective_search),
+            "runKey": run_key
+        }
+        try:
+            evidence = await in_phase("evidence", gather_evidence(
+                company_name,
+                max_results=budget.search_results(),
+                include_gap_search=budget.detective_search
+            ))
+        except Exception as e:
+            yield {"phase": "ERROR", "agent": "EVIDENCE", "message": str(e), "runKey": run_key}
+            return
+        checkpoint("evidence", evidence)
+        stats = evidence["stats"]
+        yield {
+            "phase": "EVIDENCE_DONE",
+            "message": (
+                f"Pooled {stats['uniqueItems']} sources from {stats['queries']} searches "
+                f"({stats['duplicatesRemoved']} duplicates and {stats['nearDuplicatesRemoved']} "
+                f"near-duplicates removed, {stats['tokensSaved']} prompt tokens saved)"
+                + (
+                    f" — {stats['circuitOpenQueries']} searches not made, search provider unavailable"
+                    if stats["circuitOpenQueries"] else ""
+                )
+            ),
+            "stats": stats,
+            "timing": trace.summary("evidence")
         }
-    except Exception as e:
-        yield {"phase": "ERROR", "agent": "BULL", "message": str(e)}
-        return
 
-    # Phase 2: Bear
+    # Phase 1 + 2: Bull and Bear run concurrently — neither depends on the other
+    yield {
+        "phase": "BULL_START",
+        "message": f"Bull Agent building the case FOR {company_name}...",
+        "companyName": company_name,
+        "runKey": run_key
+    }
     yield {
         "phase": "BEAR_START",
         "message": f"Bear Agent searching for red flags on {company_name}..."
     }
+
+    if bull_output is not None:
+        yield bull_done_event(bull_output, restored=True)
+    if bear_output is not None:
+        yield bear_done_event(bear_output, restored=True)
+
+    # Agents stream their replies; each finished signal or red flag is queued
+    # here and yielded as a *_PARTIAL event before the agent's *_DONE
+    partials = asyncio.Queue()
+
+    def queue_partial(agent: str):
+        def on_element(key: str, index: int, element: dict):
+            event = partial_event(agent, key, index, element)
+            if event is not None:
+                partials.put_nowait(event)
+        return on_element
+
+    max_tokens = budget.max_tokens(2000)
+    agent_names = {}
+    if bull_output is None:
+        agent_names[asyncio.create_task(in_phase("bull", run_bull_agent(
+            domain, company_name, client_info,
+            max_tokens=max_tokens,
+            evidence=role_view(evidence, "bull"),
+            on_element=queue_partial("BULL")
+        )))] = "BULL"
+    if bear_output is None:
+        agent_names[asyncio.create_task(in_phase("bear", run_bear_agent(
+            domain, company_name, client_info,
+            max_tokens=max_tokens,
+            evidence=role_view(evidence, "bear"),
+            on_element=queue_partial("BEAR")
+        )))] = "BEAR"
+
     try:
-        bear_output = run_bear_agent(domain, company_name, client_info)
-        yield {
-            "phase": "BEAR_DONE",
-            "message": f"Bear found {len(bear_output.get('customerRedFlags', bear_output.get('clientRelevantRedFlags', [])))} red flags",
-            "data": bear_output,
-            "thinking": build_bear_thinking(bear_output)
-        }
-    except Exception as e:
-        yield {"phase": "ERROR", "agent": "BEAR", "message": str(e)}
-        return
+        async for kind, item in _with_partials(set(agent_names), partials):
+            if kind == "partial":
+                yield item
+                continue
+            agent = agent_names[item]
+            try:
+                if agent == "BULL":
+                    bull_output = item.result()
+                    event = bull_done_event(bull_output, timing=trace.summary("bull"))
+                    checkpoint("bull", event["data"])
+                else:
+                    bear_output = item.result()
+                    event = bear_done_event(bear_output, timing=trace.summary("bear"))
+                    checkpoint("bear", event["data"])
+            except Exception as e:
+                yield {"phase": "ERROR", "agent": agent, "message": str(e), "runKey": run_key}
+                return
+            yield event
+    finally:
+        # On error or cancellation, stop whichever agent is still running
+        for task in agent_names:
+            task.cancel()
 
     # NOTE: Sentiment agent is not implemented — skipped gracefully
     sentiment_output = {}
 
-    # Phase 3: Detective
-    yield {
-        "phase": "DETECTIVE_START",
-        "message": "Detective Agent auditing all evidence..."
-    }
-    try:
-        detective_output = run_detective_agent(
-            domain, company_name, bull_output, bear_output, client_info
-        )
-        yield {
-            "phase": "DETECTIVE_DONE",
-            "message": f"Detective found {len(detective_output.get('missingContext', []))} overlooked facts",
-            "data": detective_output,
-            "thinking": build_detective_thinking(detective_output)
-        }
-    except Exception as e:
-        yield {"phase": "ERROR", "agent": "DETECTIVE", "message": str(e)}
-        return
+    # Phase 3: Detective — the first phase dropped when the latency budget is tight
+    detective_output = restored_outputs.get("detective")
+    if detective_output is not None:
+        yield detective_done_event(detective_output, restored=True)
+    elif "orchestrator" not in restored:
+        budget.plan("detective")
+        if not budget.run_detective:
+            yield {
+                "phase": "DETECTIVE_SKIPPED",
+                "message": "Detective skipped to meet the time budget — Orchestrator will weigh Bull and Bear alone"
+            }
+        else:
+            yield {
+                "phase": "DETECTIVE_START",
+                "message": "Detective Agent auditing all evidence..."
+            }
+            # The Detective's deadline leaves the Orchestrator enough time to reach a verdict
+            detective_task = asyncio.create_task(budget.within_detective_deadline(in_phase(
+                "detective", run_detective_agent(
+                    domain, company_name, bull_output, bear_output, client_info,
+                    max_tokens=budget.max_tokens(2000),
+                    evidence=detective_view(evidence) if evidence else None,
+                    on_element=queue_partial("DETECTIVE")
+                )
+            )))
+            try:
+                async for kind, item in _with_partials({detective_task}, partials):
+                    if kind == "partial":
+                        yield item
+                        continue
+                    detective_output = item.result()
+                    event = detective_done_event(detective_output, timing=trace.summary("detective"))
+                    checkpoint("detective", event["data"])
+                    yield event
+            except BudgetExceeded:
+                budget.force("SKIP_DETECTIVE", "Detective overran its share of the budget")
+                yield {
+                    "phase": "DETECTIVE_SKIPPED",
+                    "message": "Detective ran out of time — Orchestrator will weigh Bull and Bear alone"
+                }
+            except Exception as e:
+                yield {"phase": "ERROR", "agent": "DETECTIVE", "message": str(e), "runKey": run_key}
+                return
+            finally:
+                detective_task.cancel()
 
     # Phase 4: Orchestrator
-    yield {
-        "phase": "ORCHESTRATOR_START",
-        "message": "Orchestrator weighing all evidence and making the final call..."
-    }
-    try:
-        orchestrator_output = run_orchestrator_agent(
-            company_name, bull_output, bear_output, detective_output, client_info
-        )
+    orchestrator_output = restored_outputs.get("orchestrator")
+    if orchestrator_output is not None:
+        yield orchestrator_done_event(orchestrator_output, bull_output, bear_output, restored=True)
+    else:
         yield {
-            "phase": "ORCHESTRATOR_DONE",
-            "message": f"Approach: {orchestrator_output.get('recommendedApproach', orchestrator_output.get('verdict', 'COMPLETE'))}",
-            "data": orchestrator_output,
-            "thinking": build_orchestrator_thinking(
-                orchestrator_output, bull_output, bear_output
-            )
+            "phase": "ORCHESTRATOR_START",
+            "message": "Orchestrator weighing all evidence and making the final call..."
         }
-    except Exception as e:
-        yield {"phase": "ERROR", "agent": "ORCHESTRATOR", "message": str(e)}
-        return
-
-    # Generate DOCX and PDF for BOTH tracks
-    customer_docx = None
-    partner_docx  = None
-    customer_pdf  = None
-    partner_pdf   = None
-
-    # ── Customer Track Documents ──
-    try:
-        print(f"  [WAR_ROOM] Generating CUSTOMER DOCX dossier for {company_name}...")
-        customer_docx = generate_dossier(
-            company_name=company_name,
-            domain=domain,
-            client_info=client_info,
-            bull_output=bull_output,
-            bear_output=bear_output,
-            detective_output=detective_output,
-            orchestrator_output=orchestrator_output,
-            track="customer"
-        )
-        print(f"  [WAR_ROOM] Customer DOCX saved: {customer_docx}")
-    except Exception as e:
-        print(f"  [WAR_ROOM] Customer DOCX generation failed: {e}")
-
-    try:
-        print(f"  [WAR_ROOM] Generating CUSTOMER PDF executive summary for {company_name}...")
-        customer_pdf = generate_executive_summary_pdf(
-            company_name=company_name,
-            domain=domain,
-            orchestrator_output=orchestrator_output,
-            track="customer"
-        )
-        print(f"  [WAR_ROOM] Customer PDF saved: {customer_pdf}")
-    except Exception as e:
-        print(f"  [WAR_ROOM] Customer PDF generation failed: {e}")
-
-    # ── Partner Track Documents ──
-    try:
-        print(f"  [WAR_ROOM] Generating PARTNER DOCX dossier for {company_name}...")
-        partner_docx = generate_dossier(
-            company_name=company_name,
-            domain=domain,
-            client_info=client_info,
-            bull_output=bull_output,
-            bear_output=bear_output,
-            detective_output=detective_output,
-            orchestrator_output=orchestrator_output,
-            track="partner"
-        )
-        print(f"  [WAR_ROOM] Partner DOCX saved: {partner_docx}")
-    except Exception as e:
-        print(f"  [WAR_ROOM] Partner DOCX generation failed: {e}")
+        try:
+            # The last step: never cut short, and always given its full max_tokens
+            orchestrator_output = await in_phase("orchestrator", run_orchestrator_agent(
+                company_name, bull_output, bear_output, detective_output, client_info,
+                max_tokens=2500
+            ))
+            event = orchestrator_done_event(
+                orchestrator_output, bull_output, bear_output,
+                timing=trace.summary("orchestrator")
+            )
+            checkpoint("orchestrator", event["data"])
+            yield event
+        except Exception as e:
+            yield {"phase": "ERROR", "agent": "ORCHESTRATOR", "message": str(e), "runKey": run_key}
+            return
 
-    try:
-        print(f"  [WAR_ROOM] Generating PARTNER PDF executive summary for {company_name}...")
-        partner_pdf = generate_executive_summary_pdf(
-            company_name=company_name,
-            domain=domain,
-            orchestrator_output=orchestrator_output,
-            track="partner"
-        )
-        print(f"  [WAR_ROOM] Partner PDF saved: {partner_pdf}")
-    except Exception as e:
-        print(f"  [WAR_ROOM] Partner PDF generation failed: {e}")
+    # The result carries plain dicts, an empty one when the Detective was skipped
+    orchestrator_data = orchestrator_output.dump()
 
     # Final result
-    customer_track = orchestrator_output.get("customerTrack", {})
-    partner_track = orchestrator_output.get("partnerTrack", {})
+    customer_track = orchestrator_data.get("customerTrack", {}) or {}
+    partner_track = orchestrator_data.get("partnerTrack", {}) or {}
 
     yield {
         "phase": "COMPLETE",
         "message": "Analysis complete.",
+        "timing": trace.summary(),
         "result": {
+            "runKey": run_key,
             "companyName": company_name,
+            "degraded": budget.degraded,
+            "latencyBudget": budget.to_dict(),
             "domain": domain,
-            "confirmedScale": orchestrator_output.get("confirmedScale"),
-            "recommendedApproach": orchestrator_output.get("recommendedApproach", "CUSTOMER_FIRST"),
-            "recommendedApproachReason": orchestrator_output.get("recommendedApproachReason"),
-            "executiveSummary": orchestrator_output.get("executiveSummary"),
+            "confirmedScale": orchestrator_data.get("confirmedScale"),
+            "recommendedApproach": orchestrator_data.get("recommendedApproach", "CUSTOMER_FIRST"),
+            "recommendedApproachReason": orchestrator_data.get("recommendedApproachReason"),
+            "executiveSummary": orchestrator_data.get("executiveSummary"),
 
             # Dual track results
             "customerTrack": {
-                "verdict": customer_track.get("verdict", orchestrator_output.get("verdict")),
-                "confidence": customer_track.get("confidence", orchestrator_output.get("confidence")),
-                "regretScore": customer_track.get("regretScore", orchestrator_output.get("regretScore")),
-                "targetDecisionMaker": customer_track.get("targetDecisionMaker", orchestrator_output.get("targetDecisionMaker")),
-                "outreachEmail": customer_track.get("outreachEmail", orchestrator_output.get("outreachEmail")),
-                "decidingFactors": customer_track.get("decidingFactors", orchestrator_output.get("decidingFactors")),
-                "ifHold": customer_track.get("ifHold", orchestrator_output.get("ifHold")),
-                "ifAvoid": customer_track.get("ifAvoid", orchestrator_output.get("ifAvoid"))
+                "verdict": customer_track.get("verdict", orchestrator_data.get("verdict")),
+                "confidence": customer_track.get("confidence", orchestrator_data.get("confidence")),
+                "regretScore": customer_track.get("regretScore", orchestrator_data.get("regretScore")),
+                "targetDecisionMaker": customer_track.get("targetDecisionMaker", orchestrator_data.get("targetDecisionMaker")),
+                "outreachEmail": customer_track.get("outreachEmail", orchestrator_data.get("outreachEmail")),
+                "decidingFactors": customer_track.get("decidingFactors", orchestrator_data.get("decidingFactors")),
+                "ifHold": customer_track.get("ifHold", orchestrator_data.get("ifHold")),
+                "ifAvoid": customer_track.get("ifAvoid", orchestrator_data.get("ifAvoid"))
             },
             "partnerTrack": {
                 "verdict": partner_track.get("verdict"),
@@ -562,28 +860,36 @@ async def run_war_room(domain: str, client_info: str = CLIENT_INFO):
             },
 
             # Shared fields
-            "clientAdvantages": orchestrator_output.get("clientAdvantages", []),
-            "clientDisadvantages": orchestrator_output.get("clientDisadvantages", []),
-            "proposedNextSteps": orchestrator_output.get("proposedNextSteps", []),
+            "clientAdvantages": orchestrator_data.get("clientAdvantages", []),
+            "clientDisadvantages": orchestrator_data.get("clientDisadvantages", []),
+            "proposedNextSteps": orchestrator_data.get("proposedNextSteps", []),
 
             # Full agent outputs for frontend drill-down
             "agentOutputs": {
-                "bull": bull_output,
-                "bear": bear_output,
-                "detective": detective_output,
-                "orchestrator": orchestrator_output
+                "bull": bull_output.dump(),
+                "bear": bear_output.dump(),
+                "detective": detective_output.dump() if detective_output else {},
+                "orchestrator": orchestrator_data
             },
 
-            # Generated document filenames (4 files: customer + partner × docx + pdf)
-            "documents": {
-                "customer": {
-                    "dossier": customer_docx,
-                    "executiveSummary": customer_pdf
-                },
-                "partner": {
-                    "dossier": partner_docx,
-                    "executiveSummary": partner_pdf
-                }
-            }
+            # Download URLs for the 4 files (customer + partner × docx + pdf).
+            # Each one renders from the checkpoint on first download.
+            "documents": document_links(run_key),
+            "documentsStatus": "RENDERING" if PRERENDER_DOCUMENTS else "ON_DEMAND"
         }
+    }
+
+    if not PRERENDER_DOCUMENTS:
+        return
+
+    # Warm the document cache for BOTH tracks in the render pool once the verdict is out
+    save_documents(run_key, "RENDERING")
+    documents = await in_phase("documents", prerender_documents(run_key))
+    save_documents(run_key, "READY", documents)
+    yield {
+        "phase": "DOCUMENTS_READY",
+        "message": "Documents ready for download.",
+        "runKey": run_key,
+        "timing": trace.summary("documents"),
+        "documents": documents
     }
\ No newline at end of file
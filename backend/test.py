@@ -12,7 +12,7 @@ async def test(client_url: str, target_domain: str):
     print(f"STEP 1 — Generating client profile from {client_url}")
     print(f"{'='*60}")
 
-    client_info = generate_client_info(client_url)
+    client_info = await generate_client_info(client_url)
 
     print(f"\nGenerated Client Profile:")
     print("-" * 60)
@@ -105,14 +105,14 @@ async def test(client_url: str, target_domain: str):
             print(f"\nNext Steps:")
             for s in result.get("proposedNextSteps", []):
                 print(f"  -> {s}")
-            print(f"\nGenerated Documents:")
+            print(f"\nDocuments (rendered on first download):")
             docs = result.get("documents", {})
             c_docs = docs.get("customer", {})
             p_docs = docs.get("partner", {})
-            print(f"  [CUSTOMER] DOCX Dossier     : {c_docs.get('dossier') or 'Not generated'}")
-            print(f"  [CUSTOMER] PDF Exec Summary : {c_docs.get('executiveSummary') or 'Not generated'}")
-            print(f"  [PARTNER]  DOCX Dossier     : {p_docs.get('dossier') or 'Not generated'}")
-            print(f"  [PARTNER]  PDF Exec Summary : {p_docs.get('executiveSummary') or 'Not generated'}")
+            print(f"  [CUSTOMER] DOCX Dossier     : {c_docs.get('dossier')}")
+            print(f"  [CUSTOMER] PDF Exec Summary : {c_docs.get('executiveSummary')}")
+            print(f"  [PARTNER]  DOCX Dossier     : {p_docs.get('dossier')}")
+            print(f"  [PARTNER]  PDF Exec Summary : {p_docs.get('executiveSummary')}")
             print("=" * 60)
 
         if phase == "ERROR":
@@ -0,0 +1,20 @@
+import os
+import sys
+import tempfile
+
+# Run from backend/ with `python -m pytest tests`. The environment is set
+# before any app module is imported: placeholder API keys, no rate limits,
+# and caches in a scratch directory so tests neither read nor write the
+# real ones.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_scratch = tempfile.mkdtemp(prefix="allyvex-tests-")
+for key in ("GROQ_API_KEY", "MISTRAL_API_KEY", "TAVILY_API_KEY"):
+    os.environ.setdefault(key, "test")
+for key in ("TAVILY_RPM", "GROQ_RPM", "MISTRAL_RPM"):
+    os.environ[key] = "0"
+os.environ["SEARCH_CACHE_PATH"] = os.path.join(_scratch, "search_cache.sqlite3")
+os.environ["LLM_CACHE_PATH"] = os.path.join(_scratch, "llm_cache.sqlite3")
+os.environ["EVIDENCE_INDEX_PATH"] = os.path.join(_scratch, "evidence_index.sqlite3")
+os.environ["PRERENDER_DOCUMENTS"] = "false"
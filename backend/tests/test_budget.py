@@ -0,0 +1,131 @@
+"""
+LatencyBudget: which degradation steps plan() applies for a given time
+left, and the hard deadline the Detective runs under.
+
+The per-step estimates are pinned so the expected levels do not move when
+the defaults are tuned: agents 8.5s, Detective 8.5s, Orchestrator 15s.
+"""
+import time
+import asyncio
+import pytest
+import orchestration.budget as budget_module
+from orchestration.budget import LatencyBudget, BudgetExceeded
+
+
+@pytest.fixture(autouse=True)
+def estimates(monkeypatch):
+    monkeypatch.setattr(budget_module, "EST_SEARCH_SECONDS", 2.5)
+    monkeypatch.setattr(budget_module, "EST_LLM_SECONDS_PER_1K_TOKENS", 3.0)
+    monkeypatch.setattr(budget_module, "EST_ORCHESTRATOR_SECONDS", 15.0)
+    monkeypatch.setattr(budget_module, "TRACK_SHARDED_AGENTS", False)
+
+
+def _budget(seconds: float | None, elapsed: float = 0.0) -> LatencyBudget:
+    budget = LatencyBudget(seconds)
+    budget.started_at = time.monotonic() - elapsed
+    return budget
+
+
+def test_no_budget_never_degrades():
+    budget = _budget(None)
+    assert budget.plan("agents") == 0
+    assert budget.plan("detective") == 0
+    assert not budget.degraded
+    assert budget.detective_deadline() is None
+    assert budget.max_tokens(2000) == 2000
+
+
+def test_enough_time_applies_nothing():
+    budget = _budget(35)
+    assert budget.plan("agents") == 0
+    assert budget.search_results() == budget_module.DEFAULT_SEARCH_RESULTS
+    assert budget.detective_search and budget.run_detective
+
+
+@pytest.mark.parametrize("seconds, applied", [
+    (30, ["SKIP_DETECTIVE_SEARCH"]),
+    (29.2, ["SKIP_DETECTIVE_SEARCH", "REDUCED_SEARCH_RESULTS"]),
+    (25, ["SKIP_DETECTIVE_SEARCH", "REDUCED_SEARCH_RESULTS", "REDUCED_MAX_TOKENS"]),
+    (20, ["SKIP_DETECTIVE_SEARCH", "REDUCED_SEARCH_RESULTS", "REDUCED_MAX_TOKENS", "SKIP_DETECTIVE"])
+])
+def test_plan_applies_the_mildest_steps_that_fit(seconds, applied):
+    budget = _budget(seconds)
+    budget.plan("agents")
+    assert budget.applied == applied
+    assert budget.degraded
+
+
+def test_reduced_max_tokens_cuts_agent_tokens():
+    budget = _budget(25)
+    budget.plan("agents")
+    assert budget.max_tokens(2000) == int(2000 * budget_module.REDUCED_TOKENS_FACTOR)
+    assert budget.search_results() == budget_module.REDUCED_SEARCH_RESULTS
+
+
+def test_a_slow_stage_moves_the_next_plan_down_the_ladder():
+    budget = _budget(35)
+    assert budget.plan("agents") == 0
+    # The agents took 20s of an estimated 8.5s: the Detective no longer fits
+    budget.started_at -= 20
+    budget.plan("detective")
+    assert "SKIP_DETECTIVE" in budget.applied
+    assert not budget.run_detective
+
+
+def test_levels_never_go_back_down():
+    budget = _budget(25)
+    budget.plan("agents")
+    level = budget.level
+    budget.seconds = 1000
+    assert budget.plan("detective") == level
+
+
+def test_force_jumps_to_a_step_and_keeps_those_before_it():
+    budget = _budget(35)
+    budget.force("SKIP_DETECTIVE", "overran")
+    assert budget.applied == list(budget_module.DEGRADATION_STEPS)
+
+
+def test_detective_deadline_leaves_the_orchestrator_its_time():
+    budget = _budget(30, elapsed=10)
+    assert budget.detective_deadline() == pytest.approx(5, abs=0.1)
+    assert _budget(30, elapsed=20).detective_deadline() == 0
+
+
+def test_within_detective_deadline_returns_the_result():
+    async def detective():
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    assert asyncio.run(_budget(30).within_detective_deadline(detective())) == {"ok": True}
+
+
+def test_within_detective_deadline_cancels_a_slow_detective():
+    cancelled = False
+
+    async def detective():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    async def run():
+        budget = _budget(15.1)
+        with pytest.raises(BudgetExceeded):
+            await budget.within_detective_deadline(detective())
+        await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    assert time.perf_counter() - started < 1
+    assert cancelled
+
+
+def test_within_detective_deadline_passes_provider_timeouts_through():
+    async def detective():
+        raise asyncio.TimeoutError("provider timed out")
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(_budget(30).within_detective_deadline(detective()))
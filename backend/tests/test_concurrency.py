@@ -0,0 +1,114 @@
+"""
+Concurrent runs must overlap on the event loop, not queue behind each other.
+
+The Groq, Mistral and Tavily clients are replaced by fakes that sleep a
+fixed time per call, so a run's wall time is set by its sequential phases.
+N runs started together with asyncio.gather should then take about as long
+as one run.
+"""
+import time
+import asyncio
+from types import SimpleNamespace
+import pytest
+import utils.llm as llm
+import utils.search_tools as search_tools
+import orchestration.checkpoints as checkpoints
+from orchestration.war_room import run_war_room
+
+SEARCH_SECONDS = 0.2
+LLM_SECONDS = 0.3
+RUNS = 5
+
+
+class FakeGroq:
+    """AsyncGroq's chat.completions.create, plain or streamed."""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, stream: bool = False, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(LLM_SECONDS)
+        if not stream:
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))], usage=None)
+
+        async def chunks():
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="{}"))], x_groq=None)
+        return chunks()
+
+
+class FakeMistral:
+    """Mistral's chat.complete_async and chat.stream_async."""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(complete_async=self.complete_async, stream_async=self.stream_async)
+
+    async def complete_async(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(LLM_SECONDS)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))], usage=None)
+
+    async def stream_async(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(LLM_SECONDS)
+
+        async def events():
+            data = SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="{}"))], usage=None)
+            yield SimpleNamespace(data=data)
+        return events()
+
+
+class FakeTavily:
+    """AsyncTavilyClient.search, with one result per query."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def search(self, query: str, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(SEARCH_SECONDS)
+        return {"results": [{
+            "title": query,
+            "url": f"https://example.com/{abs(hash(query))}",
+            "content": f"Search result for {query}",
+            "score": 0.5
+        }]}
+
+
+@pytest.fixture
+def fake_clients(monkeypatch, tmp_path):
+    clients = SimpleNamespace(groq=FakeGroq(), mistral=FakeMistral(), tavily=FakeTavily())
+    monkeypatch.setattr(llm, "groq_client", clients.groq)
+    monkeypatch.setattr(llm, "mistral_client", clients.mistral)
+    monkeypatch.setattr(search_tools, "tavily_client", clients.tavily)
+    monkeypatch.setattr(checkpoints, "CHECKPOINTS_DIR", str(tmp_path))
+    return clients
+
+
+async def _run(domain: str) -> list[str]:
+    return [event["phase"] async for event in run_war_room(domain, "A data engineering consultancy.")]
+
+
+async def _timed(*domains: str) -> tuple[float, list[list[str]]]:
+    started = time.perf_counter()
+    phases = await asyncio.gather(*(_run(domain) for domain in domains))
+    return time.perf_counter() - started, phases
+
+
+def test_concurrent_runs_take_about_one_run(fake_clients):
+    single, (phases,) = asyncio.run(_timed("solo-company.com"))
+    assert phases[-1] == "COMPLETE", phases
+    calls_per_run = fake_clients.groq.calls + fake_clients.mistral.calls + fake_clients.tavily.calls
+
+    # Distinct companies, so no run is answered from another's cached or
+    # in-flight searches and completions
+    elapsed, runs = asyncio.run(_timed(*(f"company-{i}.com" for i in range(RUNS))))
+
+    assert all(phases[-1] == "COMPLETE" for phases in runs), runs
+    calls = fake_clients.groq.calls + fake_clients.mistral.calls + fake_clients.tavily.calls
+    assert calls == calls_per_run * (RUNS + 1)
+    assert single >= SEARCH_SECONDS + 3 * LLM_SECONDS
+    # Run serially they would take RUNS times as long
+    assert elapsed < single * 1.5, f"{RUNS} concurrent runs took {elapsed:.2f}s, one run {single:.2f}s"
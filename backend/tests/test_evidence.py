@@ -0,0 +1,94 @@
+"""
+The evidence pool: one round of searches for every agent, de-duplicated by
+URL, content and near-duplicate text, and packed into each agent's token
+budget. Tavily is replaced by a fake that finds one story syndicated twice.
+"""
+import asyncio
+import itertools
+import pytest
+import utils.search_tools as search_tools
+from utils.resilience import CircuitOpenError
+from orchestration.evidence import gather_evidence, role_view, detective_view, evidence_searches
+
+STORY = (
+    "Acme raised a 40 million dollar series C round led by Example Ventures to expand its "
+    "data platform team and migrate its legacy warehouse to the cloud over the next year"
+)
+_companies = itertools.count()
+
+
+class FakeTavily:
+    """Every query gets the same syndicated story, plus one result of its own."""
+
+    def __init__(self, fail_with: Exception | None = None):
+        self.fail_with = fail_with
+
+    async def search(self, query: str, **kwargs):
+        if self.fail_with:
+            raise self.fail_with
+        return {"results": [
+            {"title": "Series C", "url": "https://news.example.com/acme-series-c?utm_source=feed", "content": STORY},
+            {"title": "Syndicated", "url": "https://other.example.com/acme", "content": STORY + " according to reports"},
+            {"title": query, "url": f"https://example.com/{abs(hash(query))}", "content": f"Only for {query} " * 5}
+        ]}
+
+
+@pytest.fixture
+def company():
+    # A new company per test, so no test is answered from another's cached searches
+    return f"Evidencetest{next(_companies)}"
+
+
+def _gather(company: str, tavily: FakeTavily, monkeypatch, **kwargs) -> dict:
+    monkeypatch.setattr(search_tools, "tavily_client", tavily)
+    return asyncio.run(gather_evidence(company, **kwargs))
+
+
+def test_duplicates_are_pooled_once(company, monkeypatch):
+    pool = _gather(company, FakeTavily(), monkeypatch, max_results=3)
+    stats = pool["stats"]
+    assert stats["queries"] == evidence_searches()
+    assert stats["searchResults"] == 3 * stats["queries"]
+    # The story once, plus one result of each query's own
+    assert stats["uniqueItems"] == 1 + stats["queries"]
+    # The syndicated copy is merged into the story each time, the story itself by URL after the first
+    assert stats["nearDuplicatesRemoved"] == stats["queries"]
+    assert stats["duplicatesRemoved"] == stats["queries"] - 1
+    story = next(item for item in pool["items"] if item["title"] == "Series C")
+    assert len(story["queries"]) == stats["queries"]
+
+
+def test_role_view_lists_an_item_once_and_fits_the_budget(company, monkeypatch):
+    pool = _gather(company, FakeTavily(), monkeypatch, max_results=3)
+    view = role_view(pool, "bull")
+    assert view.count("Series C") == 1
+
+    tight = role_view(pool, "bull", token_budget=60)
+    assert len(tight) < len(view)
+    assert "Lower-ranked results left out." in tight
+
+
+def test_detective_view_says_who_saw_each_item(company, monkeypatch):
+    pool = _gather(company, FakeTavily(), monkeypatch, max_results=3)
+    role_view(pool, "bull")
+    role_view(pool, "bear")
+    view = detective_view(pool)
+    assert "BULL" in view and "BEAR" in view and "DETECTIVE" in view
+
+
+def test_a_skipped_gap_search_is_not_made(company, monkeypatch):
+    pool = _gather(company, FakeTavily(), monkeypatch, include_gap_search=False)
+    assert pool["stats"]["queries"] == evidence_searches(include_gap_search=False)
+    assert "detective" not in pool["roles"]
+
+
+def test_failed_searches_are_marked(company, monkeypatch):
+    pool = _gather(company, FakeTavily(fail_with=ValueError("bad request")), monkeypatch)
+    assert pool["stats"]["failedQueries"] == pool["stats"]["queries"]
+    assert pool["stats"]["circuitOpenQueries"] == 0
+    assert "Search failed: bad request" in role_view(pool, "bull")
+
+
+def test_an_open_circuit_on_every_query_is_raised(company, monkeypatch):
+    with pytest.raises(CircuitOpenError):
+        _gather(company, FakeTavily(fail_with=CircuitOpenError("tavily circuit is open")), monkeypatch)
@@ -0,0 +1,49 @@
+"""
+Evidence index lookups: a query is answered from indexed snippets only when
+enough of them mention the company and most of the query's other words.
+"""
+import itertools
+import pytest
+from utils.evidence_index import index_results, lookup_results
+
+_companies = itertools.count()
+
+
+@pytest.fixture
+def company():
+    # A new company per test, so no test matches another's snippets
+    return f"Indextest{next(_companies)}"
+
+
+def _index(company: str, *contents: str):
+    index_results(f"{company} news", [
+        {"title": "News update", "url": f"https://example.com/{company}/{i}", "content": content}
+        for i, content in enumerate(contents)
+    ])
+
+
+def test_snippets_with_most_query_words_answer(company):
+    _index(
+        company,
+        f"{company} is hiring data engineers to rebuild its warehouse",
+        f"{company} hiring spree: data engineers wanted for the platform team"
+    )
+    results = lookup_results(f"{company} hiring data engineers 2025", company, 2)
+    assert results is not None and len(results) == 2
+    assert {"title", "url", "content", "score", "published_date"} <= set(results[0])
+
+
+def test_a_snippet_sharing_one_word_does_not_answer(company):
+    # Mentions the company and "funding", but none of the query's other words
+    _index(company, f"{company} announced funding for a community garden")
+    assert lookup_results(f"{company} funding hiring expansion layoffs", company, 1) is None
+
+
+def test_too_few_matches_fall_back_to_the_web(company):
+    _index(company, f"{company} is hiring data engineers")
+    assert lookup_results(f"{company} hiring data engineers", company, 2) is None
+
+
+def test_snippets_about_another_company_do_not_answer(company):
+    _index(company, "Othercorp is hiring data engineers")
+    assert lookup_results(f"{company} hiring data engineers", company, 1) is None
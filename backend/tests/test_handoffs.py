@@ -0,0 +1,69 @@
+"""
+What each agent hands the next: projections of an upstream output, and the
+merge of Bull's and Bear's customer-track and partner-track calls.
+"""
+import json
+from agents.models import BullOutput
+from agents.handoffs import project, handoff, DETECTIVE_FROM_BULL, ORCHESTRATOR_FROM_BULL
+from agents.tracks import merge_tracks
+from agents.bull import PARTNER_TRACK_FIELDS
+
+BULL = {
+    "agentRole": "Bull",
+    "companyName": "Acme",
+    "domain": "acme.com",
+    "companyScale": {"scaleCategory": "MID_MARKET", "scaleReasoning": "Long reasoning", "partnerScaleFit": "Good"},
+    "customerSignals": [
+        {"signal": "Hiring", "source": "https://jobs.acme.com", "strength": "HIGH", "scaleDependentReasoning": "x"}
+    ],
+    "overallBullScore": {"customerScore": 70, "partnerScore": 40}
+}
+
+
+def test_project_keeps_only_the_named_fields():
+    projected = project(BULL, DETECTIVE_FROM_BULL)
+    assert "agentRole" not in projected and "domain" not in projected
+    assert projected["companyScale"] == {"scaleCategory": "MID_MARKET", "partnerScaleFit": "Good"}
+    assert projected["overallBullScore"] == BULL["overallBullScore"]
+
+
+def test_project_applies_to_each_list_item():
+    projected = project(BULL, ORCHESTRATOR_FROM_BULL)
+    # The Orchestrator weighs claims rather than checking them, so sources go
+    assert projected["customerSignals"] == [{"signal": "Hiring", "strength": "HIGH"}]
+
+
+def test_project_keeps_values_of_an_unexpected_shape():
+    assert project({"companyScale": "MID_MARKET"}, DETECTIVE_FROM_BULL) == {"companyScale": "MID_MARKET"}
+
+
+def test_handoff_is_compact_json_of_the_projection():
+    compact = handoff("bull", "detective", BullOutput.of(BULL), DETECTIVE_FROM_BULL)
+    assert json.loads(compact) == project(BULL, DETECTIVE_FROM_BULL)
+    assert "\n" not in compact and ", " not in compact
+
+
+def test_merge_takes_partner_fields_from_the_partner_call():
+    customer = BullOutput.of({
+        "companyScale": {"scaleCategory": "MID_MARKET", "partnerScaleFit": "from the customer call"},
+        "customerSignals": [{"signal": "Hiring"}],
+        "keyArgument": {"asCustomer": "Buy"}
+    })
+    partner = BullOutput.of({
+        "companyScale": {"scaleCategory": "ignored", "partnerScaleFit": "Good"},
+        "customerSignals": [{"signal": "ignored"}],
+        "partnerSignals": [{"signal": "Reseller"}],
+        "keyArgument": {"asCustomer": "ignored", "asPartner": "Partner"}
+    })
+    merged = merge_tracks(customer, partner, PARTNER_TRACK_FIELDS).dump()
+    assert merged["companyScale"] == {"scaleCategory": "MID_MARKET", "partnerScaleFit": "Good"}
+    assert merged["customerSignals"] == [{"signal": "Hiring"}]
+    assert merged["partnerSignals"] == [{"signal": "Reseller"}]
+    assert merged["keyArgument"] == {"asCustomer": "Buy", "asPartner": "Partner"}
+
+
+def test_merge_projects_partner_objects_the_customer_call_left_out():
+    customer = BullOutput.of({"customerSignals": []})
+    partner = BullOutput.of({"keyArgument": {"asCustomer": "ignored", "asPartner": "Partner"}})
+    merged = merge_tracks(customer, partner, PARTNER_TRACK_FIELDS).dump()
+    assert merged["keyArgument"] == {"asPartner": "Partner"}
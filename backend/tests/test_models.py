@@ -0,0 +1,101 @@
+"""
+Typed agent outputs: well-formed replies validate as they are, and the
+common LLM mistakes are repaired and counted instead of failing the run.
+"""
+import json
+import pytest
+from agents.models import BullOutput, BearOutput, DetectiveOutput, Signal
+from utils import metrics
+
+
+def _repairs() -> int:
+    return sum(v for k, v in metrics.snapshot().items() if k.startswith("llm.repairs."))
+
+
+def _decode(model, output: dict):
+    return model.decode("```json\n" + json.dumps(output) + "\n```")
+
+
+def test_a_well_formed_reply_needs_no_repair():
+    before = _repairs()
+    bull = _decode(BullOutput, {
+        "companyScale": {"scaleCategory": "MID_MARKET", "estimatedEmployees": "500"},
+        "customerSignals": [{"signal": "Hiring", "strength": "HIGH"}],
+        "overallBullScore": {"customerScore": 72, "partnerScore": 40}
+    })
+    assert _repairs() == before
+    assert bull.companyScale.scaleCategory == "MID_MARKET"
+    assert bull.customerSignals[0].strength == "HIGH"
+    assert bull.overallBullScore.customerScore == 72
+
+
+def test_scores_sent_as_text_are_repaired():
+    bull = _decode(BullOutput, {"overallBullScore": {"customerScore": "72/100", "partnerScore": 40.6}})
+    assert bull.overallBullScore.customerScore == 72
+    assert bull.overallBullScore.partnerScore == 41
+
+
+def test_a_bare_score_is_the_combined_score():
+    bull = _decode(BullOutput, {"overallBullScore": "65"})
+    assert bull.overallBullScore.combinedScore == 65
+
+
+def test_array_mistakes_are_repaired():
+    bull = _decode(BullOutput, {
+        "customerSignals": {"signal": "A lone object"},
+        "partnerSignals": None,
+        "technicalDebtSignals": ["A bare string"]
+    })
+    assert [s.signal for s in bull.customerSignals] == ["A lone object"]
+    assert bull.partnerSignals == []
+    assert bull.technicalDebtSignals[0].observation == "A bare string"
+
+
+def test_scalars_in_place_of_objects_move_into_their_scalar_field():
+    bear = _decode(BearOutput, {"dealKiller": "Existing vendor contract", "financialHealth": "Stable"})
+    assert bear.dealKiller.customerDealKiller == "Existing vendor contract"
+    assert bear.financialHealth.details == "Stable"
+
+
+def test_unrepairable_objects_are_left_out():
+    bull = _decode(BullOutput, {"fundingStatus": "N/A", "hiringSignals": [1, 2], "domain": "acme.com"})
+    assert bull.fundingStatus is None and bull.hiringSignals is None
+    assert "fundingStatus" not in bull.dump()
+
+
+def test_text_and_flag_mistakes_are_repaired():
+    bull = _decode(BullOutput, {
+        "bestTimeToReach": ["Q3", "before renewal"],
+        "hiringSignals": {"isHiringRapidly": "yes", "relevantRoles": "Data engineer", "hiringInsight": 12}
+    })
+    assert bull.bestTimeToReach == "Q3; before renewal"
+    assert bull.hiringSignals.isHiringRapidly is True
+    assert bull.hiringSignals.relevantRoles == ["Data engineer"]
+    assert bull.hiringSignals.hiringInsight == "12"
+
+
+def test_legacy_keys_are_read_into_their_new_fields():
+    bull = _decode(BullOutput, {"clientRelevantSignals": [{"signal": "From an old prompt"}]})
+    assert bull.customerSignals[0].signal == "From an old prompt"
+    assert "customerSignals" in bull.dump()
+
+
+def test_undeclared_keys_are_kept():
+    detective = _decode(DetectiveOutput, {"newField": {"kept": True}, "missingContext": []})
+    assert detective.dump()["newField"] == {"kept": True}
+
+
+def test_only_sent_fields_are_dumped():
+    assert _decode(BullOutput, {"domain": "acme.com"}).dump() == {"domain": "acme.com"}
+
+
+@pytest.mark.parametrize("reply", ["not json", "[1, 2]", '{"customerSignals": [', ""])
+def test_malformed_replies_raise_value_error(reply):
+    with pytest.raises(ValueError):
+        BullOutput.decode(reply)
+
+
+def test_of_repairs_a_streamed_element():
+    signal = Signal.of({"signal": 42, "strength": ["HIGH"]})
+    assert signal.signal == "42"
+    assert signal.strength == "HIGH"
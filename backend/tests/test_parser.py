@@ -0,0 +1,58 @@
+"""
+JsonStreamParser: elements of top-level arrays are passed on as soon as
+they close, however the reply is split into chunks.
+"""
+import json
+import pytest
+from utils.parser import JsonStreamParser
+
+REPLY = json.dumps({
+    "agentRole": "Bull {not an array}",
+    "customerSignals": [
+        {"signal": "Hiring \"data\" engineers", "strength": "HIGH"},
+        {"signal": "Migrating off [legacy] ETL", "tags": ["a", {"b": 1}]}
+    ],
+    "companyScale": {"nested": [{"ignored": True}]},
+    "partnerSignals": [{"signal": "Reseller programme"}],
+    "investigationGaps": ["plain strings", "are not elements"]
+})
+ELEMENTS = [
+    ("customerSignals", 0, {"signal": "Hiring \"data\" engineers", "strength": "HIGH"}),
+    ("customerSignals", 1, {"signal": "Migrating off [legacy] ETL", "tags": ["a", {"b": 1}]}),
+    ("partnerSignals", 0, {"signal": "Reseller programme"})
+]
+
+
+def _parse(chunks) -> list:
+    elements = []
+    parser = JsonStreamParser(lambda key, index, element: elements.append((key, index, element)))
+    for chunk in chunks:
+        parser.feed(chunk)
+    return elements
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(REPLY)])
+def test_elements_are_the_same_for_any_chunk_size(size):
+    chunks = [REPLY[i:i + size] for i in range(0, len(REPLY), size)]
+    assert _parse(chunks) == ELEMENTS
+
+
+def test_a_code_fence_before_the_object_is_skipped():
+    assert _parse(["```json\n", REPLY[:40], REPLY[40:], "\n```"]) == ELEMENTS
+
+
+def test_an_element_is_passed_on_before_the_reply_ends():
+    elements = []
+    parser = JsonStreamParser(lambda key, index, element: elements.append(index))
+    end_of_first = REPLY.index("},") + 1
+    parser.feed(REPLY[:end_of_first])
+    assert elements == [0]
+
+
+def test_a_retried_completion_does_not_repeat_elements():
+    elements = []
+    parser = JsonStreamParser(lambda key, index, element: elements.append((key, index)))
+    parser.feed(REPLY[:REPLY.index("partnerSignals")])
+    parser.reset()
+    parser.feed(REPLY)
+    assert elements == [(key, index) for key, index, _ in ELEMENTS]
@@ -0,0 +1,120 @@
+"""
+Circuit breaker states and resilient_call's retry rules. Backoff delays are
+zeroed so retries run straight away.
+"""
+import asyncio
+import pytest
+from tavily import errors as tavily_errors
+import utils.resilience as resilience
+from utils.resilience import CircuitBreaker, CircuitOpenError, resilient_call
+
+
+@pytest.fixture(autouse=True)
+def fast_breaker(monkeypatch):
+    monkeypatch.setattr(resilience, "BREAKER_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(resilience, "BREAKER_RESET_SECONDS", 30)
+    monkeypatch.setattr(resilience, "RETRY_BASE_DELAY_SECONDS", 0)
+    monkeypatch.setattr(resilience, "RETRY_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(resilience, "breakers", {})
+
+
+def _opened(breaker: CircuitBreaker) -> CircuitBreaker:
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def _reset_elapsed(breaker: CircuitBreaker):
+    breaker.opened_at -= resilience.BREAKER_RESET_SECONDS
+
+
+def test_opens_after_the_threshold_and_rejects_calls():
+    breaker = CircuitBreaker("test")
+    breaker.record_failure()
+    assert breaker.state == "CLOSED"
+    breaker.record_failure()
+    assert breaker.state == "OPEN"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = _opened(CircuitBreaker("test"))
+    _reset_elapsed(breaker)
+    assert breaker.state == "HALF_OPEN"
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_a_successful_trial_closes_the_circuit():
+    breaker = _opened(CircuitBreaker("test"))
+    _reset_elapsed(breaker)
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "CLOSED"
+    breaker.before_call()
+
+
+def test_a_failed_trial_reopens_the_circuit():
+    breaker = _opened(CircuitBreaker("test"))
+    _reset_elapsed(breaker)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "OPEN"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_a_trial_without_an_outcome_lets_another_through():
+    breaker = _opened(CircuitBreaker("test"))
+    _reset_elapsed(breaker)
+    breaker.before_call()
+    breaker.end_trial()
+    breaker.before_call()
+
+
+def test_retryable_errors_are_retried():
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise asyncio.TimeoutError()
+        return "ok"
+
+    assert asyncio.run(resilient_call("test", call)) == "ok"
+    assert attempts == 2
+    assert resilience.breakers["test"].state == "CLOSED"
+
+
+def test_usage_limits_fail_fast_without_tripping_the_circuit():
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        raise tavily_errors.UsageLimitExceededError("plan limit reached")
+
+    with pytest.raises(tavily_errors.UsageLimitExceededError):
+        asyncio.run(resilient_call("test", call))
+    assert attempts == 1
+    assert resilience.breakers["test"].failures == 0
+
+
+def test_an_open_circuit_fails_fast_without_calling():
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        raise asyncio.TimeoutError()
+
+    # The circuit opens after the second attempt, so the third is refused
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilient_call("test", call))
+    assert resilience.breakers["test"].state == "OPEN"
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilient_call("test", call))
+    assert attempts == 2
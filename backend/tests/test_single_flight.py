@@ -0,0 +1,83 @@
+"""
+Identical concurrent calls share one in-flight call, and it is cancelled
+only once every caller has gone away.
+"""
+import asyncio
+from utils.single_flight import single_flight
+
+
+class Call:
+    """A call that counts how often it starts and whether it was cancelled."""
+
+    def __init__(self, seconds: float = 0.05):
+        self.seconds = seconds
+        self.started = 0
+        self.cancelled = False
+
+    async def __call__(self):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.seconds)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"results": [1, 2]}
+
+
+def test_identical_calls_share_one_call():
+    call = Call()
+
+    async def run():
+        return await asyncio.gather(*(single_flight("test", "shared", call) for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert call.started == 1
+    assert all(result == {"results": [1, 2]} for result in results)
+    # Followers get their own copy
+    assert results[0] is not results[1]
+    assert results[1]["results"] is not results[2]["results"]
+
+
+def test_different_keys_make_their_own_calls():
+    call = Call()
+
+    async def run():
+        await asyncio.gather(single_flight("test", "a", call), single_flight("test", "b", call))
+
+    asyncio.run(run())
+    assert call.started == 2
+
+
+def test_one_caller_leaving_does_not_cancel_the_call():
+    call = Call()
+
+    async def run():
+        leader = asyncio.create_task(single_flight("test", "leaves", call))
+        follower = asyncio.create_task(single_flight("test", "leaves", call))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == {"results": [1, 2]}
+    assert call.started == 1
+    assert not call.cancelled
+
+
+def test_the_call_is_cancelled_once_every_caller_leaves():
+    call = Call(seconds=10)
+
+    async def run():
+        callers = [asyncio.create_task(single_flight("test", "abandoned", call)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        # The next identical call starts afresh
+        fresh = Call()
+        return await single_flight("test", "abandoned", fresh), fresh
+
+    result, fresh = asyncio.run(run())
+    assert call.cancelled
+    assert fresh.started == 1 and result == {"results": [1, 2]}
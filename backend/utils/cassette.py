@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import asyncio
+from dotenv import load_dotenv
+from utils.single_flight import flight_key
+from utils.tracing import span
+from utils import metrics
+
+load_dotenv()
+
+# Record/replay of every external call: Tavily searches, Groq and Mistral
+# completions, and scraped pages.
+#   ALLYVEX_CASSETTE_MODE=record  makes the calls and writes them to the cassette
+#   ALLYVEX_CASSETTE_MODE=replay  serves them from the cassette, never calling out
+# Replayed calls wait their recorded latency × CASSETTE_LATENCY_SCALE (0 = instant).
+CASSETTE_MODE = os.getenv("ALLYVEX_CASSETTE_MODE", "off").lower()
+CASSETTE_PATH = os.getenv(
+    "ALLYVEX_CASSETTE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cassettes", "cassette.json")
+)
+CASSETTE_LATENCY_SCALE = float(os.getenv("CASSETTE_LATENCY_SCALE", "1"))
+
+if CASSETTE_MODE not in ("off", "record", "replay"):
+    raise ValueError(f"ALLYVEX_CASSETTE_MODE must be off, record or replay, not {CASSETTE_MODE!r}")
+
+
+class CassetteError(Exception):
+    """A replayed call that failed when it was recorded."""
+
+
+class CassetteMissError(CassetteError):
+    """Raised in replay mode for a call the cassette has no recording of."""
+
+
+# Recordings by request key. A key recorded more than once is replayed in
+# the same order; once exhausted its last recording is served again.
+_interactions: dict[str, list[dict]] | None = None
+_replayed: dict[str, int] = {}
+
+
+def cassette_active() -> bool:
+    return CASSETTE_MODE != "off"
+
+
+def api_key(name: str) -> str | None:
+    """The named API key, or a placeholder when replaying, since no provider is called."""
+    return os.getenv(name) or ("replay" if CASSETTE_MODE == "replay" else None)
+
+
+def rewind():
+    """Starts replay from the first recording of every call again."""
+    _replayed.clear()
+
+
+def _load() -> dict[str, list[dict]]:
+    global _interactions
+    if _interactions is None:
+        # Recording always starts a new cassette
+        if CASSETTE_MODE == "replay":
+            if not os.path.isfile(CASSETTE_PATH):
+                raise CassetteMissError(f"No cassette at {CASSETTE_PATH}")
+            with open(CASSETTE_PATH, encoding="utf-8") as f:
+                _interactions = json.load(f)["interactions"]
+            print(f"  [CASSETTE] Replaying {sum(map(len, _interactions.values()))} calls from {CASSETTE_PATH}")
+        else:
+            _interactions = {}
+    return _interactions
+
+
+def _save():
+    os.makedirs(os.path.dirname(CASSETTE_PATH) or ".", exist_ok=True)
+    # Write to a temp file first so a crash never leaves a half-written cassette
+    tmp_path = f"{CASSETTE_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "interactions": _interactions}, f, indent=1)
+    os.replace(tmp_path, CASSETTE_PATH)
+
+
+async def _replay(kind: str, key: str, request: dict):
+    recordings = _load().get(key)
+    if not recordings:
+        metrics.incr("cassette.missed")
+        raise CassetteMissError(f"No recorded {kind} call for {json.dumps(request, default=str)[:200]}")
+
+    index = _replayed.get(key, 0)
+    _replayed[key] = index + 1
+    recording = recordings[min(index, len(recordings) - 1)]
+    with span(f"replay.{kind}", kind, recordedSeconds=recording["latency"]):
+        await asyncio.sleep(recording["latency"] * CASSETTE_LATENCY_SCALE)
+    metrics.incr("cassette.replayed")
+    if "error" in recording:
+        raise CassetteError(recording["error"])
+    return recording["response"]
+
+
+async def cassette(kind: str, request: dict, call):
+    """
+    Awaits call() — one external request described by `request` — recording
+    or replaying it when a cassette mode is set. Responses must be plain JSON.
+    Failures are recorded too, and replay as CassetteError with the same message.
+    """
+    if CASSETTE_MODE == "off":
+        return await call()
+    key = flight_key(kind, request)
+    if CASSETTE_MODE == "replay":
+        return await _replay(kind, key, request)
+
+    recording = {"kind": kind, "request": request}
+    started = time.monotonic()
+    try:
+        recording["response"] = await call()
+    except Exception as e:
+        recording["error"] = str(e)
+        raise
+    finally:
+        # A cancelled call has no outcome to record
+        if "response" in recording or "error" in recording:
+            recording["latency"] = round(time.monotonic() - started, 3)
+            _load().setdefault(key, []).append(recording)
+            _save()
+            metrics.incr("cassette.recorded")
+    return recording["response"]
@@ -1,13 +1,11 @@
-import os
-from groq import Groq
-from tavily import TavilyClient
-from dotenv import load_dotenv
+import asyncio
+from utils.llm import cached_completion
 from utils.scraper import scrape_website
+from utils.search_tools import search_results
 
-load_dotenv()
-
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+# Bump whenever GENERATOR_PROMPT or the user message changes; cached
+# profiles from earlier versions are then discarded
+PROMPT_VERSION = "1"
 
 GENERATOR_PROMPT = """
 You are a business analyst. You have been given content about a company from
@@ -62,7 +60,7 @@ def extract_company_name_from_url(url: str) -> str:
     name = name.split(".")[0].replace("-", " ").replace("_", " ").title()
     return name
 
-def search_external_info(company_name: str) -> str:
+async def search_external_info(company_name: str) -> str:
     """
     Uses Tavily to find what the world says about this company —
     news, descriptions, reviews, recent developments.
@@ -74,13 +72,9 @@ def search_external_info(company_name: str) -> str:
             f"{company_name} customers use case 2025"
         ]
 
-        for query in queries:
-            response = tavily_client.search(
-                query=query,
-                search_depth="basic",
-                max_results=3
-            )
-            for r in response.get("results", []):
+        responses = await asyncio.gather(*(search_results(query, max_results=3) for query in queries))
+        for response in responses:
+            for r in response:
                 content = r.get("content", "")[:300]
                 title = r.get("title", "")
                 source = r.get("url", "")
@@ -92,7 +86,7 @@ def search_external_info(company_name: str) -> str:
         print(f"  [DOC_GEN] Tavily search failed: {str(e)}")
         return ""
 
-def generate_client_info(url: str) -> str:
+async def generate_client_info(url: str) -> str:
     """
     Main function. Takes a company URL, scrapes it, searches
     external sources, and generates a structured client profile.
@@ -104,7 +98,7 @@ def generate_client_info(url: str) -> str:
 
     # Step 1: Scrape their own website
     print(f"  [DOC_GEN] Scraping {url}...")
-    scraped_content = scrape_website(url)
+    scraped_content = await scrape_website(url)
 
     if scraped_content:
         print(f"  [DOC_GEN] Website scraped successfully")
@@ -113,7 +107,7 @@ def generate_client_info(url: str) -> str:
 
     # Step 2: Search for external information
     print(f"  [DOC_GEN] Searching external sources for {company_name}...")
-    external_content = search_external_info(company_name)
+    external_content = await search_external_info(company_name)
 
     if external_content:
         print(f"  [DOC_GEN] External sources found")
@@ -137,7 +131,11 @@ def generate_client_info(url: str) -> str:
     # Step 5: Generate the structured document
     print(f"  [DOC_GEN] Generating client profile...")
 
-    response = groq_client.chat.completions.create(
+    document = await cached_completion(
+        agent="client_profile",
+        prompt_version=PROMPT_VERSION,
+        parse=str.strip,
+        provider="groq",
         model="llama-3.3-70b-versatile",
         messages=[
             {"role": "system", "content": GENERATOR_PROMPT},
@@ -152,9 +150,9 @@ def generate_client_info(url: str) -> str:
             }
         ],
         temperature=0.2,
-        max_tokens=1000
+        max_tokens=1000,
+        json_mode=False
     )
 
-    document = response.choices[0].message.content.strip()
     print(f"  [DOC_GEN] Client profile generated successfully")
     return document
\ No newline at end of file
@@ -48,13 +48,15 @@ def generate_dossier(
     bear_output: dict,
     detective_output: dict,
     orchestrator_output: dict,
-    track: str = "customer"   # "customer" or "partner"
+    track: str = "customer",  # "customer" or "partner"
+    output_path: str | None = None
 ) -> str:
     """
     Generate a full DOCX intelligence dossier for the given track.
     track="customer" focuses on the customer sales angle.
     track="partner"  focuses on the partnership angle.
-    Returns the saved filename inside the outputs/ directory.
+    Returns the saved filename inside the outputs/ directory, or
+    output_path when given, in which case the dossier is saved there.
     """
     doc = Document()
 
@@ -532,12 +534,15 @@ def generate_dossier(
     footer_para.runs[0].font.size = Pt(9)
 
     # ── Save ──
-    _outputs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs")
-    os.makedirs(_outputs_dir, exist_ok=True)
-    filename = (
-        f"ALLYVEX_{company_name.replace(' ', '_')}_{track_label}_Dossier_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
-    )
-    filepath = os.path.join(_outputs_dir, filename)
+    if output_path:
+        filename = filepath = output_path
+    else:
+        _outputs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs")
+        os.makedirs(_outputs_dir, exist_ok=True)
+        filename = (
+            f"ALLYVEX_{company_name.replace(' ', '_')}_{track_label}_Dossier_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
+        )
+        filepath = os.path.join(_outputs_dir, filename)
     doc.save(filepath)
     print(f"  [DOCUMENT] {track_label} Dossier saved: {filepath}")
     return filename
@@ -561,20 +566,25 @@ def generate_executive_summary_pdf(
     company_name: str,
     domain: str,
     orchestrator_output: dict,
-    track: str = "customer"   # "customer" or "partner"
+    track: str = "customer",  # "customer" or "partner"
+    output_path: str | None = None
 ) -> str:
     """
     Generate a polished Executive Summary PDF for the given track.
-    Returns the saved filename inside the outputs/ directory.
+    Returns the saved filename inside the outputs/ directory, or
+    output_path when given, in which case the PDF is saved there.
     """
     is_partner = track.lower() == "partner"
     track_label = "PARTNER" if is_partner else "CUSTOMER"
 
-    _outputs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs")
-    os.makedirs(_outputs_dir, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"ALLYVEX_{company_name.replace(' ', '_')}_{track_label}_ExecutiveSummary_{timestamp}.pdf"
-    filepath = os.path.join(_outputs_dir, filename)
+    if output_path:
+        filename = filepath = output_path
+    else:
+        _outputs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs")
+        os.makedirs(_outputs_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"ALLYVEX_{company_name.replace(' ', '_')}_{track_label}_ExecutiveSummary_{timestamp}.pdf"
+        filepath = os.path.join(_outputs_dir, filename)
 
     doc = SimpleDocTemplate(
         filepath,
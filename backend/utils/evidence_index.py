@@ -0,0 +1,200 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+from utils import metrics
+
+load_dotenv()
+
+# Every search result and scraped page is kept in a local SQLite FTS5 index.
+# A company's searches are answered from it while it holds enough fresh
+# matches, and go to the web only for gaps and stale data.
+# EVIDENCE_INDEX_MAX_AGE_DAYS=0 turns lookups off; results are still indexed.
+EVIDENCE_INDEX_PATH = os.getenv(
+    "EVIDENCE_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "evidence_index.sqlite3")
+)
+EVIDENCE_INDEX_MAX_AGE_DAYS = float(os.getenv("EVIDENCE_INDEX_MAX_AGE_DAYS", "7"))
+# An indexed snippet answers a query only if it has at least this share of
+# the query's words, besides the company name. Matching any one word let
+# generic snippets about the company answer unrelated questions.
+EVIDENCE_INDEX_MIN_TERM_SHARE = float(os.getenv("EVIDENCE_INDEX_MIN_TERM_SHARE", "0.6"))
+# Best bm25 matches read per lookup before the term share is checked
+EVIDENCE_INDEX_CANDIDATES = 50
+
+_lock = threading.Lock()
+_connection: sqlite3.Connection | None = None
+
+# Recent lookup durations in milliseconds, for index_stats()
+_query_ms = deque(maxlen=500)
+
+
+def _db() -> sqlite3.Connection:
+    global _connection
+    if _connection is None:
+        _connection = sqlite3.connect(EVIDENCE_INDEX_PATH, check_same_thread=False)
+        _connection.executescript("""
+            CREATE TABLE IF NOT EXISTS evidence (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                url TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                query TEXT,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                score REAL,
+                published_date TEXT,
+                fetched_at REAL NOT NULL,
+                UNIQUE (kind, url)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS evidence_fts USING fts5(
+                title, content, content='evidence', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS evidence_ai AFTER INSERT ON evidence BEGIN
+                INSERT INTO evidence_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS evidence_ad AFTER DELETE ON evidence BEGIN
+                INSERT INTO evidence_fts (evidence_fts, rowid, title, content)
+                VALUES ('delete', old.id, old.title, old.content);
+            END;
+        """)
+        _connection.commit()
+    return _connection
+
+
+def _domain(url: str) -> str:
+    return re.sub(r"^www\.", "", urlsplit(url if "//" in url else f"//{url}").netloc.lower())
+
+
+def _store(kind: str, url: str, query: str | None, title: str, content: str,
+           score: float | None = None, published_date: str | None = None):
+    # A refetched URL replaces its old row, so the index keeps the latest copy
+    db = _db()
+    db.execute("DELETE FROM evidence WHERE kind = ? AND url = ?", (kind, url))
+    db.execute(
+        """
+        INSERT INTO evidence (kind, url, domain, query, title, content, score, published_date, fetched_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (kind, url, _domain(url), query, title, content, score, published_date, time.time())
+    )
+
+
+def index_results(query: str, results: list[dict]):
+    """Adds fresh Tavily results to the index."""
+    with _lock:
+        for r in results:
+            if r.get("url") and r.get("content"):
+                _store(
+                    "snippet", r["url"], query, r.get("title", ""), r["content"],
+                    r.get("score"), r.get("published_date")
+                )
+        _db().commit()
+    metrics.incr("evidence_index.indexed", len(results))
+
+
+def index_page(url: str, content: str):
+    """Adds a scraped page's text to the index."""
+    if not content:
+        return
+    with _lock:
+        _store("page", url, None, "", content)
+        _db().commit()
+    metrics.incr("evidence_index.indexed")
+
+
+def _query_terms(query: str, subject: str) -> tuple[list[str], list[str]]:
+    """
+    The subject's words, and the other words of the query. Bare numbers such
+    as years are left out, as nearly every snippet has one.
+    """
+    subject_words = re.findall(r"\w+", subject.lower())
+    terms = [
+        w for w in dict.fromkeys(re.findall(r"\w+", query.lower()))
+        if w not in subject_words and not w.isdigit()
+    ]
+    return subject_words, terms
+
+
+def _match_expression(subject_words: list[str], terms: list[str]) -> str | None:
+    """FTS5 query for candidates: the subject as a phrase, and any of the terms."""
+    if not subject_words or not terms:
+        return None
+    return f'"{" ".join(subject_words)}" AND (' + " OR ".join(f'"{term}"' for term in terms) + ")"
+
+
+def _term_share(text: str, terms: list[str]) -> float:
+    words = set(re.findall(r"\w+", text.lower()))
+    return sum(1 for term in terms if term in words) / len(terms)
+
+
+def lookup_results(query: str, subject: str, limit: int) -> list[dict] | None:
+    """
+    Up to `limit` fresh indexed snippets that mention `subject` (the company
+    name) and at least EVIDENCE_INDEX_MIN_TERM_SHARE of the query's other
+    words, best first, shaped like Tavily results. None when the index has
+    fewer than `limit`, so the caller searches the web.
+    """
+    subject_words, terms = _query_terms(query, subject)
+    expression = _match_expression(subject_words, terms)
+    if EVIDENCE_INDEX_MAX_AGE_DAYS <= 0 or expression is None:
+        return None
+
+    started = time.perf_counter()
+    with _lock:
+        rows = _db().execute(
+            """
+            SELECT e.title, e.url, e.content, e.score, e.published_date
+            FROM evidence_fts JOIN evidence e ON e.id = evidence_fts.rowid
+            WHERE evidence_fts MATCH ? AND e.kind = 'snippet' AND e.fetched_at >= ?
+            ORDER BY bm25(evidence_fts) LIMIT ?
+            """,
+            (expression, time.time() - EVIDENCE_INDEX_MAX_AGE_DAYS * 86400, max(limit, EVIDENCE_INDEX_CANDIDATES))
+        ).fetchall()
+    rows = [
+        row for row in rows if _term_share(f"{row[0]} {row[2]}", terms) >= EVIDENCE_INDEX_MIN_TERM_SHARE
+    ][:limit]
+    _query_ms.append((time.perf_counter() - started) * 1000)
+
+    if len(rows) < limit:
+        metrics.incr("evidence_index.miss")
+        return None
+    metrics.incr("evidence_index.hit")
+    return [
+        {"title": title, "url": url, "content": content, "score": score, "published_date": published_date}
+        for title, url, content, score, published_date in rows
+    ]
+
+
+def lookup_page(url: str) -> str | None:
+    """A scraped page's text while it is fresh, else None."""
+    if EVIDENCE_INDEX_MAX_AGE_DAYS <= 0:
+        return None
+    started = time.perf_counter()
+    with _lock:
+        row = _db().execute(
+            "SELECT content FROM evidence WHERE kind = 'page' AND url = ? AND fetched_at >= ?",
+            (url, time.time() - EVIDENCE_INDEX_MAX_AGE_DAYS * 86400)
+        ).fetchone()
+    _query_ms.append((time.perf_counter() - started) * 1000)
+    metrics.incr("evidence_index.hit" if row else "evidence_index.miss")
+    return row[0] if row else None
+
+
+def index_stats() -> dict:
+    with _lock:
+        counts = dict(_db().execute("SELECT kind, COUNT(*) FROM evidence GROUP BY kind").fetchall())
+    samples = sorted(_query_ms)
+    return {
+        "snippets": counts.get("snippet", 0),
+        "pages": counts.get("page", 0),
+        "sizeBytes": os.path.getsize(EVIDENCE_INDEX_PATH),
+        "maxAgeDays": EVIDENCE_INDEX_MAX_AGE_DAYS,
+        "sampledQueries": len(samples),
+        "queryMsAvg": round(sum(samples) / len(samples), 2) if samples else None,
+        "queryMsP95": round(samples[int(len(samples) * 0.95) - 1], 2) if samples else None
+    }
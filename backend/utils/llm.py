@@ -0,0 +1,167 @@
+import time
+from groq import AsyncGroq
+from mistralai import Mistral
+from mistralai.utils import BackoffStrategy, RetryConfig
+from dotenv import load_dotenv
+from utils.rate_limit import throttle
+from utils.tracing import span
+from utils.single_flight import single_flight, flight_key
+from utils.resilience import resilient_call
+from utils.cassette import cassette, cassette_active, api_key
+from utils import llm_cache, metrics
+
+load_dotenv()
+
+# Async SDK clients shared by every agent — calls never block the event loop.
+# The SDKs' own retries are off: resilient_call retries behind the circuit
+# breaker, and SDK retries inside it would multiply the attempts
+groq_client = AsyncGroq(api_key=api_key("GROQ_API_KEY"), max_retries=0)
+mistral_client = Mistral(
+    api_key=api_key("MISTRAL_API_KEY"),
+    retry_config=RetryConfig("none", BackoffStrategy(0, 0, 0, 0), retry_connection_errors=False)
+)
+
+
+async def chat_completion(
+    provider: str,
+    model: str,
+    messages: list[dict],
+    temperature: float,
+    max_tokens: int,
+    json_mode: bool = True,
+    stream_to=None
+) -> str:
+    """
+    Runs a single chat completion against Groq or Mistral and returns
+    the raw message content. json_mode requests a JSON object response.
+    Identical concurrent requests — same model, prompts and evidence —
+    share one provider call.
+
+    With stream_to, an object with feed(chunk) and reset() such as a
+    JsonStreamParser, the completion is streamed and each chunk fed to it
+    as it arrives; reset() is called before a retried attempt. A request
+    that joins another caller's in-flight call gets no chunks.
+    """
+    key = flight_key(provider, model, messages, temperature, max_tokens, json_mode)
+    return await single_flight(
+        "llm", key,
+        lambda: _complete(provider, model, messages, temperature, max_tokens, json_mode, stream_to)
+    )
+
+
+async def cached_completion(
+    agent: str,
+    prompt_version: str,
+    parse,
+    provider: str,
+    model: str,
+    messages: list[dict],
+    temperature: float,
+    max_tokens: int,
+    json_mode: bool = True,
+    stream_to=None
+):
+    """
+    chat_completion followed by parse(raw), with the reply served from the
+    LLM cache when the same model, prompt version, sampling settings, system
+    prompt and user content were seen before. Only replies that parse are cached. The cache
+    is left out while recording or replaying a cassette. A cache hit streams
+    nothing to stream_to.
+    """
+    key = llm_cache.cache_key(model, prompt_version, messages, temperature, max_tokens, json_mode)
+    if not cassette_active():
+        cached = llm_cache.get_cached(key)
+        if cached is not None:
+            print(f"  [LLM_CACHE] Reusing cached {agent} reply")
+            return parse(cached)
+
+    reply = await chat_completion(
+        provider, model, messages, temperature, max_tokens, json_mode, stream_to
+    )
+    output = parse(reply)
+    if not cassette_active():
+        llm_cache.put_cached(key, agent, prompt_version, reply)
+    return output
+
+
+async def _complete(
+    provider: str,
+    model: str,
+    messages: list[dict],
+    temperature: float,
+    max_tokens: int,
+    json_mode: bool,
+    stream_to=None
+) -> str:
+    kwargs = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }
+    if json_mode:
+        kwargs["response_format"] = {"type": "json_object"}
+    if provider not in ("groq", "mistral"):
+        raise ValueError(f"Unknown LLM provider: {provider}")
+
+    async def attempt() -> str:
+        await throttle(provider)
+        with span(f"{provider}.chat", "llm", provider=provider, model=model, maxTokens=max_tokens) as s:
+            if stream_to is not None:
+                stream_to.reset()
+                content, usage = await _stream(provider, kwargs, stream_to, s)
+            elif provider == "groq":
+                response = await groq_client.chat.completions.create(**kwargs)
+                content, usage = response.choices[0].message.content, getattr(response, "usage", None)
+            else:
+                response = await mistral_client.chat.complete_async(**kwargs)
+                content, usage = response.choices[0].message.content, getattr(response, "usage", None)
+
+            if usage:
+                s.attributes["promptTokens"] = usage.prompt_tokens
+                s.attributes["completionTokens"] = usage.completion_tokens
+                # A reply that used every token was most likely cut off mid-JSON
+                if usage.completion_tokens >= max_tokens:
+                    s.attributes["truncated"] = True
+                    metrics.incr(f"llm.{provider}.truncated")
+                    print(f"  [LLM] {model} reply hit max_tokens={max_tokens} and is probably truncated")
+        return content
+
+    return await cassette("llm", {"provider": provider, **kwargs}, lambda: resilient_call(
+        provider, attempt, hedge=stream_to is None
+    ))
+
+
+async def _stream(provider: str, kwargs: dict, stream_to, s) -> tuple[str, object]:
+    """
+    Streams a completion into stream_to and returns the full content and the
+    token usage, which both providers report on the last chunk. The time to
+    the first chunk is recorded on the span.
+    """
+    started = time.perf_counter()
+    parts = []
+    usage = None
+    if provider == "groq":
+        stream = await groq_client.chat.completions.create(**kwargs, stream=True)
+        chunks = (
+            (chunk.choices[0].delta.content if chunk.choices else None,
+             getattr(getattr(chunk, "x_groq", None), "usage", None))
+            async for chunk in stream
+        )
+    else:
+        stream = await mistral_client.chat.stream_async(**kwargs)
+        chunks = (
+            (event.data.choices[0].delta.content if event.data.choices else None,
+             getattr(event.data, "usage", None))
+            async for event in stream
+        )
+
+    async for delta, chunk_usage in chunks:
+        usage = chunk_usage or usage
+        if not delta:
+            continue
+        if not parts:
+            s.attributes["firstChunkMs"] = round((time.perf_counter() - started) * 1000, 1)
+        parts.append(delta)
+        stream_to.feed(delta)
+    return "".join(parts), usage
@@ -0,0 +1,142 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+import contextvars
+from dotenv import load_dotenv
+from utils import metrics
+
+load_dotenv()
+
+# Agent and profile replies are cached on disk, so re-analysing a domain
+# with the same evidence and client profile skips the model call. The reply
+# text is stored and decoded again on a hit, so callers get the same typed
+# output either way. LLM_CACHE_TTL_SECONDS=0 disables the cache.
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "llm_cache.sqlite3")
+)
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+
+# Set for a forced-fresh run: reads skip the cache, fresh replies still refresh it
+bypass_llm_cache = contextvars.ContextVar("bypass_llm_cache", default=False)
+
+_lock = threading.Lock()
+_connection: sqlite3.Connection | None = None
+
+
+def _db() -> sqlite3.Connection:
+    global _connection
+    if _connection is None:
+        _connection = sqlite3.connect(LLM_CACHE_PATH, check_same_thread=False)
+        # Earlier versions stored parsed outputs rather than replies
+        columns = {row[1] for row in _connection.execute("PRAGMA table_info(llm_cache)")}
+        if columns and "reply" not in columns:
+            _connection.execute("DROP TABLE llm_cache")
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                agent TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                reply TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            )
+        """)
+        _connection.execute("CREATE INDEX IF NOT EXISTS llm_cache_used_at ON llm_cache (used_at)")
+        _connection.commit()
+    return _connection
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(
+    model: str,
+    prompt_version: str,
+    messages: list[dict],
+    temperature: float,
+    max_tokens: int,
+    json_mode: bool
+) -> str:
+    """
+    Model, prompt template version, sampling settings, system prompt hash and
+    user content hash. A reply written under the reduced max_tokens of a
+    degraded or track-sharded run is only served to calls with the same one.
+    """
+    system = "".join(m["content"] for m in messages if m["role"] == "system")
+    user = "".join(m["content"] for m in messages if m["role"] != "system")
+    mode = "json" if json_mode else "text"
+    return f"{model}:{prompt_version}:{temperature}:{max_tokens}:{mode}:{_hash(system)}:{_hash(user)}"
+
+
+def get_cached(key: str) -> str | None:
+    """The cached reply text, or None on a miss, expiry or bypass."""
+    if LLM_CACHE_TTL_SECONDS <= 0:
+        return None
+    if bypass_llm_cache.get():
+        metrics.incr("llm.cache.bypassed")
+        return None
+
+    now = time.time()
+    with _lock:
+        row = _db().execute("SELECT reply, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row and now - row[1] <= LLM_CACHE_TTL_SECONDS:
+            _db().execute("UPDATE llm_cache SET used_at = ? WHERE key = ?", (now, key))
+            _db().commit()
+            metrics.incr("llm.cache.hit")
+            return row[0]
+
+    metrics.incr("llm.cache.miss")
+    return None
+
+
+def put_cached(key: str, agent: str, prompt_version: str, reply: str):
+    """
+    Stores a reply that parsed and trims the least recently used entries. Entries
+    of the same agent from any other prompt version are dropped, so bumping
+    an agent's PROMPT_VERSION invalidates everything cached under the old one.
+    """
+    if LLM_CACHE_TTL_SECONDS <= 0:
+        return
+    now = time.time()
+    with _lock:
+        db = _db()
+        db.execute(
+            """
+            INSERT OR REPLACE INTO llm_cache (key, agent, prompt_version, reply, created_at, used_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (key, agent, prompt_version, reply, now, now)
+        )
+        invalidated = db.execute(
+            "DELETE FROM llm_cache WHERE agent = ? AND prompt_version != ?", (agent, prompt_version)
+        ).rowcount
+        db.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - LLM_CACHE_TTL_SECONDS,))
+        evicted = db.execute(
+            """
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (LLM_CACHE_MAX_ENTRIES,)
+        ).rowcount
+        db.commit()
+    if invalidated > 0:
+        metrics.incr("llm.cache.invalidated", invalidated)
+    if evicted > 0:
+        metrics.incr("llm.cache.evicted", evicted)
+
+
+def invalidate(agent: str | None = None) -> int:
+    """Drops the cached replies of one agent, or of every agent. Returns how many."""
+    with _lock:
+        if agent is None:
+            removed = _db().execute("DELETE FROM llm_cache").rowcount
+        else:
+            removed = _db().execute("DELETE FROM llm_cache WHERE agent = ?", (agent,)).rowcount
+        _db().commit()
+    return removed
@@ -0,0 +1,12 @@
+from collections import defaultdict
+
+# Process-wide counters, exposed by GET /api/metrics
+counters: dict[str, int] = defaultdict(int)
+
+
+def incr(name: str, amount: int = 1):
+    counters[name] += amount
+
+
+def snapshot() -> dict:
+    return dict(sorted(counters.items()))
@@ -1,11 +1,105 @@
 # utils/parser.py
 import json
 import re
+from utils.tracing import span
 
 def parse_json(raw_text: str) -> dict:
     try:
-        cleaned = re.sub(r'```json|```', '', raw_text).strip()
-        return json.loads(cleaned)
+        with span("parse_json", "parse", chars=len(raw_text)):
+            cleaned = re.sub(r'```json|```', '', raw_text).strip()
+            return json.loads(cleaned)
     except json.JSONDecodeError as e:
         print(f"Failed to parse agent output: {raw_text}")
-        raise ValueError(f"Agent returned malformed JSON: {e}")
\ No newline at end of file
+        raise ValueError(f"Agent returned malformed JSON: {e}")
+
+class JsonStreamParser:
+    """
+    Parses a JSON object as it streams in. Each object element of a top-level
+    array is passed to on_element(key, index, element) as soon as it closes,
+    e.g. ("customerSignals", 0, {...}) while the rest of the reply is still
+    being generated. Anything before the opening brace, such as a code fence,
+    is skipped. The complete reply is still decoded once it has arrived.
+    """
+
+    def __init__(self, on_element):
+        self.on_element = on_element
+        # Survives reset(), so a retried completion does not repeat elements
+        self.emitted = set()
+        self.reset()
+
+    def reset(self):
+        """Starts over for a new completion of the same reply."""
+        self.buffer = ""
+        self.position = 0
+        self.depth = 0
+        self.started = False
+        self.finished = False
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.last_string = None
+        self.key = None
+        self.array_key = None
+        self.element_start = None
+        self.index = 0
+
+    def feed(self, chunk: str):
+        self.buffer += chunk
+        while self.position < len(self.buffer) and not self.finished:
+            self._step(self.buffer[self.position])
+            self.position += 1
+
+    def _step(self, char: str):
+        if self.in_string:
+            if self.escape:
+                self.escape = False
+            elif char == "\\":
+                self.escape = True
+            elif char == '"':
+                self.in_string = False
+                if self.string_start is not None:
+                    self.last_string = json.loads(self.buffer[self.string_start:self.position + 1])
+                    self.string_start = None
+            return
+
+        if not self.started:
+            if char == "{":
+                self.started = True
+                self.depth = 1
+            return
+
+        if char == '"':
+            self.in_string = True
+            # Only top-level strings can be keys
+            if self.depth == 1:
+                self.string_start = self.position
+        elif char == ":" and self.depth == 1:
+            self.key = self.last_string
+        elif char in "{[":
+            if self.depth == 1 and char == "[":
+                self.array_key = self.key
+                self.index = 0
+            elif self.depth == 2 and self.array_key is not None and char == "{":
+                self.element_start = self.position
+            self.depth += 1
+        elif char in "}]":
+            self.depth -= 1
+            if self.depth == 0:
+                self.finished = True
+            elif self.depth == 1:
+                self.array_key = None
+            elif self.depth == 2 and self.element_start is not None:
+                self._emit(self.buffer[self.element_start:self.position + 1])
+                self.element_start = None
+
+    def _emit(self, text: str):
+        key, index = self.array_key, self.index
+        self.index += 1
+        if (key, index) in self.emitted:
+            return
+        try:
+            element = json.loads(text)
+        except json.JSONDecodeError:
+            return
+        self.emitted.add((key, index))
+        self.on_element(key, index, element)
@@ -0,0 +1,50 @@
+import os
+import time
+import asyncio
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Requests per minute allowed for each external provider — shared by every
+# concurrent analysis in this process. Set to 0 to disable a limit.
+PROVIDER_RPM = {
+    "tavily": int(os.getenv("TAVILY_RPM", "100")),
+    "groq": int(os.getenv("GROQ_RPM", "30")),
+    "mistral": int(os.getenv("MISTRAL_RPM", "60"))
+}
+
+
+class RateLimiter:
+    """
+    Token bucket allowing `rpm` requests per minute with bursts up to `rpm`.
+    Waiters are served in arrival order.
+    """
+
+    def __init__(self, rpm: int):
+        self.rpm = rpm
+        self.tokens = float(rpm)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rpm <= 0:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rpm, self.tokens + (now - self.updated_at) * self.rpm / 60)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) * 60 / self.rpm)
+
+
+rate_limiters = {provider: RateLimiter(rpm) for provider, rpm in PROVIDER_RPM.items()}
+
+
+async def throttle(provider: str):
+    """Waits until the provider's rate limit allows one more request."""
+    limiter = rate_limiters.get(provider)
+    if limiter:
+        await limiter.acquire()
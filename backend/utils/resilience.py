@@ -0,0 +1,186 @@
+import os
+import time
+import random
+import asyncio
+from collections import deque
+import httpx
+from groq import APIConnectionError
+from tavily import errors as tavily_errors
+from dotenv import load_dotenv
+from utils import metrics
+
+load_dotenv()
+
+# Retries with exponential backoff and full jitter, for errors that may
+# clear up on their own: rate limits, 5xx responses, timeouts, dropped
+# connections. A plan or quota limit such as Tavily's usage limit does not,
+# so it fails fast and does not count against the circuit
+RETRY_MAX_ATTEMPTS = max(1, int(os.getenv("RETRY_MAX_ATTEMPTS", "3")))
+RETRY_BASE_DELAY_SECONDS = float(os.getenv("RETRY_BASE_DELAY_SECONDS", "0.5"))
+RETRY_MAX_DELAY_SECONDS = float(os.getenv("RETRY_MAX_DELAY_SECONDS", "8"))
+
+# After this many retryable failures in a row a provider's circuit opens and
+# calls fail fast until BREAKER_RESET_SECONDS have passed. Then one trial call
+# is let through (HALF_OPEN) while the rest keep failing fast; its outcome
+# closes or re-opens the circuit
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+
+# Hedging sends a duplicate request when a call runs past the provider's p95
+# latency and keeps whichever answers first. It costs extra provider calls,
+# so it is off unless enabled per provider, e.g. HEDGE_PROVIDERS=tavily
+HEDGE_PROVIDERS = {p.strip() for p in os.getenv("HEDGE_PROVIDERS", "").split(",") if p.strip()}
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    TimeoutError,
+    ConnectionError,
+    httpx.TimeoutException,
+    httpx.TransportError,
+    APIConnectionError,
+    tavily_errors.TimeoutError
+)
+NON_RETRYABLE_ERRORS = (tavily_errors.UsageLimitExceededError,)
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while its circuit is open."""
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, NON_RETRYABLE_ERRORS):
+        return False
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status in RETRYABLE_STATUS_CODES
+
+
+class CircuitBreaker:
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "CLOSED"
+        if time.monotonic() - self.opened_at >= BREAKER_RESET_SECONDS:
+            return "HALF_OPEN"
+        return "OPEN"
+
+    def before_call(self):
+        state = self.state
+        if state == "OPEN" or state == "HALF_OPEN" and self.trial_running:
+            metrics.incr(f"resilience.{self.provider}.rejected")
+            raise CircuitOpenError(f"{self.provider} circuit is open after repeated failures")
+        if state == "HALF_OPEN":
+            self.trial_running = True
+
+    def end_trial(self):
+        """Lets another trial call through after one that ended without an outcome."""
+        self.trial_running = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_running = False
+        # A failed trial call while HALF_OPEN re-opens the circuit straight away
+        if self.state == "HALF_OPEN" or self.failures >= BREAKER_FAILURE_THRESHOLD:
+            if self.state != "OPEN":
+                print(f"  [RESILIENCE] {self.provider} circuit opened after {self.failures} failures")
+                metrics.incr(f"resilience.{self.provider}.circuit_opened")
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Recent successful call durations, for the hedging threshold."""
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def p95(self) -> float | None:
+        if len(self.samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+
+breakers: dict[str, CircuitBreaker] = {}
+latencies: dict[str, LatencyTracker] = {}
+
+
+async def _hedged(provider: str, call, delay: float):
+    """Starts call(), and a duplicate if the first has not finished after `delay`."""
+    first = asyncio.create_task(call())
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            metrics.incr(f"resilience.{provider}.hedged")
+            tasks.add(asyncio.create_task(call()))
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        winner = done.pop()
+        if winner is not first:
+            metrics.incr(f"resilience.{provider}.hedge_won")
+        return winner.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def resilient_call(provider: str, call, hedge: bool = True):
+    """
+    Awaits call() — a zero-argument coroutine function making one provider
+    request — retrying retryable errors with jittered exponential backoff
+    behind the provider's circuit breaker. Non-retryable errors are raised
+    straight away and do not count against the circuit. hedge=False never
+    sends a duplicate request, e.g. for calls that stream into a sink.
+    """
+    breaker = breakers.setdefault(provider, CircuitBreaker(provider))
+    tracker = latencies.setdefault(provider, LatencyTracker())
+
+    for attempt in range(1, RETRY_MAX_ATTEMPTS + 1):
+        breaker.before_call()
+        started = time.monotonic()
+        try:
+            # A HALF_OPEN trial is a single request, so it is never hedged
+            p95 = tracker.p95() if hedge and provider in HEDGE_PROVIDERS and breaker.state == "CLOSED" else None
+            result = await (_hedged(provider, call, p95) if p95 else call())
+        except asyncio.CancelledError:
+            breaker.end_trial()
+            raise
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.end_trial()
+                raise
+            breaker.record_failure()
+            metrics.incr(f"resilience.{provider}.failures")
+            if attempt == RETRY_MAX_ATTEMPTS:
+                raise
+            delay = random.uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1)))
+            print(f"  [RESILIENCE] {provider} call failed ({e}) — retry {attempt} in {delay:.1f}s")
+            metrics.incr(f"resilience.{provider}.retries")
+            await asyncio.sleep(delay)
+            continue
+
+        breaker.record_success()
+        tracker.record(time.monotonic() - started)
+        return result
+
+
+def breaker_states() -> dict:
+    return {provider: breaker.state for provider, breaker in breakers.items()}
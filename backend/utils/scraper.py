@@ -1,13 +1,21 @@
 import httpx
 from bs4 import BeautifulSoup
+from utils.tracing import span
+from utils.cassette import cassette, cassette_active
+from utils.evidence_index import index_page, lookup_page
 
-def scrape_website(url: str) -> str:
+async def scrape_website(url: str) -> str:
     """
     Fetches a company URL and returns clean readable text.
     Returns empty string if scraping fails — doc_generator handles fallback.
+    A page scraped recently is served from the evidence index.
     """
     if not url.startswith("http"):
         url = "https://" + url
+    if not cassette_active():
+        indexed = lookup_page(url)
+        if indexed is not None:
+            return indexed
 
     headers = {
         "User-Agent": (
@@ -17,16 +25,21 @@ def scrape_website(url: str) -> str:
         )
     }
 
-    try:
-        response = httpx.get(
-            url,
+    async def fetch() -> str:
+        async with httpx.AsyncClient(
             headers=headers,
             timeout=15,
             follow_redirects=True
-        )
+        ) as http_client:
+            with span("scrape", "scrape", url=url):
+                response = await http_client.get(url)
         response.raise_for_status()
+        return response.text
+
+    try:
+        html = await cassette("scrape", {"url": url}, fetch)
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = BeautifulSoup(html, "html.parser")
 
         # Remove all noise
         for tag in soup(["script", "style", "nav", "footer",
@@ -38,7 +51,10 @@ def scrape_website(url: str) -> str:
         lines = [line.strip() for line in text.splitlines() if line.strip()]
 
         # Cap at 200 lines to stay within token limits
-        return "\n".join(lines[:200])
+        text = "\n".join(lines[:200])
+        if not cassette_active():
+            index_page(url, text)
+        return text
 
     except Exception as e:
         print(f"  [SCRAPER] Failed to scrape {url}: {str(e)}")
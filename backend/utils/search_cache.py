@@ -0,0 +1,113 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+import contextvars
+from dotenv import load_dotenv
+from utils import metrics
+
+load_dotenv()
+
+# Tavily results are cached on disk so re-analysing an account within the
+# TTL reuses its searches. SEARCH_CACHE_TTL_SECONDS=0 disables the cache.
+SEARCH_CACHE_PATH = os.getenv(
+    "SEARCH_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "search_cache.sqlite3")
+)
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+
+# Set for a forced-fresh run: reads skip the cache, fresh results still refresh it
+bypass_search_cache = contextvars.ContextVar("bypass_search_cache", default=False)
+
+_lock = threading.Lock()
+_connection: sqlite3.Connection | None = None
+
+
+def _db() -> sqlite3.Connection:
+    global _connection
+    if _connection is None:
+        _connection = sqlite3.connect(SEARCH_CACHE_PATH, check_same_thread=False)
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                results TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            )
+        """)
+        _connection.execute("CREATE INDEX IF NOT EXISTS search_cache_used_at ON search_cache (used_at)")
+        _connection.commit()
+    return _connection
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+
+def _cache_key(query: str, max_results: int) -> str:
+    return f"{max_results}:{normalize_query(query)}"
+
+
+def get_cached(query: str, max_results: int) -> list[dict] | None:
+    """Cached results for the query, or None on a miss, expiry or bypass."""
+    if SEARCH_CACHE_TTL_SECONDS <= 0:
+        return None
+    if bypass_search_cache.get():
+        metrics.incr("search.cache.bypassed")
+        return None
+
+    key = _cache_key(query, max_results)
+    now = time.time()
+    with _lock:
+        row = _db().execute(
+            "SELECT results, created_at FROM search_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row and now - row[1] <= SEARCH_CACHE_TTL_SECONDS:
+            _db().execute("UPDATE search_cache SET used_at = ? WHERE key = ?", (now, key))
+            _db().commit()
+            metrics.incr("search.cache.hit")
+            return json.loads(row[0])
+
+    metrics.incr("search.cache.miss")
+    return None
+
+
+def put_cached(query: str, max_results: int, results: list[dict]):
+    """Stores fresh results and trims the least recently used entries."""
+    if SEARCH_CACHE_TTL_SECONDS <= 0:
+        return
+    now = time.time()
+    with _lock:
+        db = _db()
+        db.execute(
+            "INSERT OR REPLACE INTO search_cache (key, results, created_at, used_at) VALUES (?, ?, ?, ?)",
+            (_cache_key(query, max_results), json.dumps(results), now, now)
+        )
+        db.execute("DELETE FROM search_cache WHERE created_at < ?", (now - SEARCH_CACHE_TTL_SECONDS,))
+        evicted = db.execute(
+            """
+            DELETE FROM search_cache WHERE key IN (
+                SELECT key FROM search_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (SEARCH_CACHE_MAX_ENTRIES,)
+        ).rowcount
+        db.commit()
+    if evicted > 0:
+        metrics.incr("search.cache.evicted", evicted)
+
+
+def cache_stats() -> dict:
+    if SEARCH_CACHE_TTL_SECONDS <= 0:
+        return {"enabled": False}
+    with _lock:
+        entries = _db().execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+    return {
+        "enabled": True,
+        "entries": entries,
+        "maxEntries": SEARCH_CACHE_MAX_ENTRIES,
+        "ttlSeconds": SEARCH_CACHE_TTL_SECONDS
+    }
@@ -1,18 +1,86 @@
 import os
-from tavily import TavilyClient
+import asyncio
+import httpx
+from tavily import AsyncTavilyClient
 from dotenv import load_dotenv
+from utils.rate_limit import throttle
+from utils.tracing import span
+from utils.search_cache import get_cached, put_cached, normalize_query, bypass_search_cache
+from utils.evidence_index import index_results, lookup_results
+from utils.single_flight import single_flight, flight_key
+from utils.resilience import resilient_call, CircuitOpenError
+from utils.cassette import cassette, cassette_active, api_key
 
 load_dotenv()
-tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 
-def web_search(query: str, max_results: int = 3) -> str:
+# Per-query timeout, so one slow search cannot hold up an agent's fan-out
+SEARCH_TIMEOUT_SECONDS = float(os.getenv("SEARCH_TIMEOUT_SECONDS", "15"))
+# Keep-alive connections to Tavily shared by every search in the process
+SEARCH_MAX_CONNECTIONS = int(os.getenv("SEARCH_MAX_CONNECTIONS", "20"))
+
+tavily_http_client = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_connections=SEARCH_MAX_CONNECTIONS,
+        max_keepalive_connections=SEARCH_MAX_CONNECTIONS
+    )
+)
+tavily_client = AsyncTavilyClient(api_key=api_key("TAVILY_API_KEY"), client=tavily_http_client)
+
+async def search_results(query: str, max_results: int = 3, subject: str | None = None) -> list[dict]:
+    """
+    Raw Tavily results for the query, served from the search cache while fresh.
+    With a subject (the company searched for), the evidence index is tried
+    next and answers if it has enough fresh matches. Both are left out while
+    recording or replaying a cassette.
+    """
+    if not cassette_active():
+        cached = get_cached(query, max_results)
+        if cached is not None:
+            return cached
+        if subject and not bypass_search_cache.get():
+            indexed = lookup_results(query, subject, max_results)
+            if indexed is not None:
+                return indexed
+    # Concurrent runs asking the same question share one Tavily call
+    return await single_flight(
+        "search",
+        flight_key(normalize_query(query), max_results),
+        lambda: _fetch_results(query, max_results)
+    )
+
+
+async def _fetch_results(query: str, max_results: int) -> list[dict]:
+    async def attempt() -> list[dict]:
+        await throttle("tavily")
+        with span("tavily.search", "search", query=query, maxResults=max_results) as s:
+            response = await tavily_client.search(
+                query=query,
+                search_depth="basic",
+                max_results=max_results,
+                timeout=SEARCH_TIMEOUT_SECONDS
+            )
+            results = response.get("results", [])
+            s.attributes["results"] = len(results)
+        return results
+
+    results = await cassette(
+        "search", {"query": query, "maxResults": max_results},
+        lambda: resilient_call("tavily", attempt)
+    )
+    if not cassette_active():
+        put_cached(query, max_results, results)
+        index_results(query, results)
+    return results
+
+
+async def web_search(query: str, max_results: int = 3) -> str:
+    """
+    The results formatted for an agent prompt. A failed search reads as
+    "Search failed"; an open Tavily circuit is raised as CircuitOpenError
+    instead, so callers see that searching is down rather than one gap.
+    """
     try:
-        response = tavily_client.search(
-            query=query,
-            search_depth="basic",
-            max_results=max_results
-        )
-        results = response.get("results", [])
+        results = await search_results(query, max_results)
         if not results:
             return "No results found."
 
@@ -26,13 +94,17 @@ def web_search(query: str, max_results: int = 3) -> str:
 
         return formatted.strip()
 
+    except CircuitOpenError:
+        raise
     except Exception as e:
         return f"Search failed: {str(e)}"
 
 
-def multi_search(queries: list[str]) -> str:
+async def multi_search(queries: list[str], max_results: int = 2) -> str:
+    """Runs all queries at once; the output keeps the order of `queries`."""
+    results = await asyncio.gather(*(web_search(query, max_results=max_results) for query in queries))
     all_results = ""
-    for query in queries:
+    for query, result in zip(queries, results):
         all_results += f"\n=== {query} ===\n"
-        all_results += web_search(query, max_results=2)  # Reduced to 2 per query
+        all_results += result
     return all_results.strip()
\ No newline at end of file
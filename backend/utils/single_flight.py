@@ -0,0 +1,57 @@
+import copy
+import json
+import asyncio
+import hashlib
+from utils import metrics
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+# Calls in progress, by namespace and key, shared by every run in the process
+_flights: dict[str, _Flight] = {}
+
+
+def _forget(flight_id: str, flight: _Flight):
+    if _flights.get(flight_id) is flight:
+        del _flights[flight_id]
+
+
+def flight_key(*parts) -> str:
+    """Stable hash of the arguments that make two calls identical."""
+    encoded = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+async def single_flight(namespace: str, key: str, call):
+    """
+    Awaits call() — or, if an identical call is already in flight, its result.
+    Every caller after the first gets a deep copy, so runs never share mutable
+    results. The call is cancelled only once every caller has gone away.
+    """
+    flight_id = f"{namespace}:{key}"
+    flight = _flights.get(flight_id)
+    if flight is None:
+        flight = _Flight(asyncio.create_task(call()))
+        _flights[flight_id] = flight
+        flight.task.add_done_callback(lambda _: _forget(flight_id, flight))
+        leader = True
+        metrics.incr(f"singleflight.{namespace}.calls")
+    else:
+        leader = False
+        metrics.incr(f"singleflight.{namespace}.collapsed")
+
+    flight.waiters += 1
+    try:
+        result = await asyncio.shield(flight.task)
+    except asyncio.CancelledError:
+        if flight.waiters == 1 and not flight.task.done():
+            _forget(flight_id, flight)
+            flight.task.cancel()
+        raise
+    finally:
+        flight.waiters -= 1
+    return result if leader else copy.deepcopy(result)
@@ -0,0 +1,9 @@
+import math
+
+# Prompt sizes are budgeted with an estimate rather than a tokenizer: English
+# text averages about four characters per token for the Llama and Mistral models
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import uuid
+import contextvars
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# The trace and phase of the run currently executing. Tasks spawned by the
+# war room inherit both, so spans land in the right run and phase.
+current_trace = contextvars.ContextVar("current_trace", default=None)
+current_phase = contextvars.ContextVar("current_phase", default=None)
+current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(self, name: str, category: str, trace_id: str, parent_id: str | None, attributes: dict):
+        self.name = name
+        self.category = category
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.phase = current_phase.get()
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns or time.time_ns()
+        return round((end_ns - self.start_ns) / 1_000_000, 1)
+
+    def to_otel(self) -> dict:
+        """Span in the OpenTelemetry JSON shape, one object per line."""
+        attributes = {"allyvex.category": self.category, **self.attributes}
+        if self.phase:
+            attributes["allyvex.phase"] = self.phase
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"}
+        }
+
+
+class Trace:
+    """All spans recorded for one War Room run."""
+
+    def __init__(self, run_key: str | None = None):
+        self.trace_id = uuid.uuid4().hex
+        self.run_key = run_key
+        self.start_ns = time.time_ns()
+        self.spans: list[Span] = []
+
+    def summary(self, phase: str | None = None) -> dict:
+        """
+        Timing breakdown for one phase, or the whole run when phase is None.
+        Durations are summed per category, so concurrent spans can add up to
+        more than the phase's wall-clock time.
+        """
+        spans = [s for s in self.spans if phase is None or s.phase == phase]
+        by_category = {}
+        for s in spans:
+            if s.category == "phase":
+                continue
+            bucket = by_category.setdefault(s.category, {"count": 0, "totalMs": 0.0})
+            bucket["count"] += 1
+            bucket["totalMs"] = round(bucket["totalMs"] + s.duration_ms, 1)
+            for key in ("promptTokens", "completionTokens"):
+                if isinstance(s.attributes.get(key), int):
+                    bucket[key] = bucket.get(key, 0) + s.attributes[key]
+
+        summary = {"byCategory": by_category}
+        if phase is None:
+            summary["wallMs"] = round((time.time_ns() - self.start_ns) / 1_000_000, 1)
+        else:
+            wall = [s for s in spans if s.category == "phase"]
+            if wall:
+                summary["wallMs"] = wall[0].duration_ms
+        summary["spans"] = [
+            {"name": s.name, "category": s.category, "phase": s.phase, "ms": s.duration_ms, **s.attributes}
+            for s in spans if s.category != "phase"
+        ]
+        return summary
+
+
+class SpanExporter:
+    """Receives every finished span. Subclass and pass to set_exporter()."""
+
+    def export(self, span: Span):
+        raise NotImplementedError
+
+
+class JsonlFileExporter(SpanExporter):
+    """Appends spans to a local file in OpenTelemetry's JSON span shape."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, span: Span):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(span.to_otel()) + "\n")
+
+
+_exporter: SpanExporter | None = (
+    JsonlFileExporter(os.getenv("ALLYVEX_TRACE_FILE")) if os.getenv("ALLYVEX_TRACE_FILE") else None
+)
+
+
+def set_exporter(exporter: SpanExporter | None):
+    global _exporter
+    _exporter = exporter
+
+
+@contextmanager
+def span(name: str, category: str, **attributes):
+    """
+    Times the enclosed block as a span of the current run. Callers can add
+    attributes (for example token counts) to the yielded span before it ends.
+    """
+    trace = current_trace.get()
+    parent = current_span.get()
+    s = Span(
+        name,
+        category,
+        trace.trace_id if trace else uuid.uuid4().hex,
+        parent.span_id if parent else None,
+        attributes
+    )
+    token = current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = str(e) or type(e).__name__
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        current_span.reset(token)
+        if trace:
+            trace.spans.append(s)
+        if _exporter:
+            try:
+                _exporter.export(s)
+            except Exception as e:
+                print(f"  [TRACING] Span export failed: {e}")
+
+
+async def in_phase(phase: str, coro):
+    """Awaits coro with every span inside it attributed to the given phase."""
+    token = current_phase.set(phase)
+    try:
+        with span(f"phase.{phase}", "phase"):
+            return await coro
+    finally:
+        current_phase.reset(token)
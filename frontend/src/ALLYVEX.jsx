@@ -3250,10 +3250,10 @@ const ResultsView = ({ result }) => {
     proposedNextSteps,
     documents,
   } = result;
-  const triggerDownload = (filename) => {
+  const triggerDownload = (path) => {
     const a = document.createElement("a");
-    a.href = `${BASE_URL}/api/download/${filename}`;
-    a.download = filename;
+    a.href = `${BASE_URL}${path}`;
+    a.download = "";
     document.body.appendChild(a);
     a.click();
     document.body.removeChild(a);
@@ -3576,6 +3576,7 @@ const WarRoom = ({ user, onNav }) => {
   const [appState, setAppState] = useState("IDLE");
   const [clientUrl, setClientUrl] = useState("");
   const [clientProfile, setClientProfile] = useState("");
+  const [profileId, setProfileId] = useState("");
   const [profileError, setProfileError] = useState("");
   const [targetDomain, setTargetDomain] = useState("");
   const [analyzeError, setAnalyzeError] = useState("");
@@ -3615,6 +3616,7 @@ const WarRoom = ({ user, onNav }) => {
       const data = await res.json();
       if (!res.ok) throw new Error(data.detail || "Profile generation failed");
       setClientProfile(data.clientProfile);
+      setProfileId(data.profileId);
       setAppState("READY");
     } catch (e) {
       setProfileError(e.message);
@@ -3644,7 +3646,7 @@ const WarRoom = ({ user, onNav }) => {
       const res = await fetch(`${BASE_URL}/api/analyze`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ domain, client_info: clientProfile }),
+        body: JSON.stringify({ domain, profile_id: profileId }),
       });
       if (!res.ok) {
         const d = await res.json();
@@ -3685,18 +3687,28 @@ const WarRoom = ({ user, onNav }) => {
     if (event.companyName) setCompanyName(event.companyName);
     const agentMap = {
       BULL_START: "bull",
+      BULL_PARTIAL: "bull",
       BULL_DONE: "bull",
       BEAR_START: "bear",
+      BEAR_PARTIAL: "bear",
       BEAR_DONE: "bear",
       DETECTIVE_START: "detective",
+      DETECTIVE_PARTIAL: "detective",
       DETECTIVE_DONE: "detective",
       ORCHESTRATOR_START: "orchestrator",
       ORCHESTRATOR_DONE: "orchestrator",
     };
-    if (phase.endsWith("_START")) {
+    if (phase.startsWith("EVIDENCE_")) {
+      // Shared evidence gathering runs before any agent starts
+      return;
+    } else if (phase.endsWith("_START")) {
       const a = agentMap[phase];
       setAgentStatus((s) => ({ ...s, [a]: "running" }));
       setAgentMessages((m) => ({ ...m, [a]: event.message || "" }));
+    } else if (phase.endsWith("_PARTIAL")) {
+      // Thoughts stream in one at a time; the DONE event replaces them
+      const a = agentMap[phase];
+      setAgentThinking((th) => ({ ...th, [a]: [...(th[a] || []), ...event.thinking] }));
     } else if (phase.endsWith("_DONE")) {
       const a = agentMap[phase];
       setAgentStatus((s) => ({ ...s, [a]: "done" }));
@@ -3706,6 +3718,8 @@ const WarRoom = ({ user, onNav }) => {
     } else if (phase === "COMPLETE") {
       setResult(event.result);
       setAppState("RESULTS");
+    } else if (phase === "DOCUMENTS_READY") {
+      setResult((r) => r && { ...r, documents: event.documents });
     } else if (phase === "ERROR") {
       const a = (event.agent || "").toLowerCase();
       if (a) setAgentStatus((s) => ({ ...s, [a]: "error" }));